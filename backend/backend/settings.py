@@ -207,6 +207,98 @@ ML_WORKSPACE_NAME = os.getenv("ML_WORKSPACE_NAME")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 print(f"GROQ_API_KEY loaded: {GROQ_API_KEY[:5]}...{GROQ_API_KEY[-4:]}") # Debug logging
 
+# Machine learning model settings
+# Load the transformer models in the background at startup instead of on the first request
+ML_WARMUP_ON_STARTUP = os.getenv("ML_WARMUP_ON_STARTUP", "False").lower() == "true"
+
+# Encoder precision on CPU: "fp32", or "int8" for dynamic quantization of the linear layers
+ML_INFERENCE_MODE = os.getenv("ML_INFERENCE_MODE", "fp32").lower()
+
+# Directory for derived model artifacts such as quantized weights
+ML_MODEL_CACHE_DIR = os.getenv("ML_MODEL_CACHE_DIR") or os.path.join(BASE_DIR, "model_cache")
+
+# Encoders to run as TorchScript traces per sequence length bucket, e.g. "bert-base-uncased"
+ML_TRACED_MODELS = [name.strip() for name in os.getenv("ML_TRACED_MODELS", "").split(",") if name.strip()]
+ML_TRACE_BUCKETS = [int(length) for length in os.getenv("ML_TRACE_BUCKETS", "16,32,64,128,256,512").split(",")]
+
+# Torch intra-op threads per worker; 0 splits the CPU cores between ML_WORKERS_PER_HOST workers
+ML_TORCH_THREADS = int(os.getenv("ML_TORCH_THREADS", "0"))
+ML_WORKERS_PER_HOST = int(os.getenv("ML_WORKERS_PER_HOST", "1"))
+
+# Number of short texts whose token ids are cached per encoder (0 disables the cache)
+ML_TOKEN_CACHE_SIZE = int(os.getenv("ML_TOKEN_CACHE_SIZE", "4096"))
+
+# Merge embedding requests from concurrent callers into shared forward passes
+ML_MICROBATCH_ENABLED = os.getenv("ML_MICROBATCH_ENABLED", "False").lower() == "true"
+ML_MICROBATCH_MAX_SIZE = int(os.getenv("ML_MICROBATCH_MAX_SIZE", "32"))
+ML_MICROBATCH_MAX_WAIT_MS = float(os.getenv("ML_MICROBATCH_MAX_WAIT_MS", "5"))
+# Longest wait in seconds for a micro-batched result, further capped by the request deadline
+ML_INFERENCE_TIMEOUT = float(os.getenv("ML_INFERENCE_TIMEOUT", "60"))
+
+# Optional standalone model server (python manage.py run_model_server), e.g. http://127.0.0.1:8765
+# Web workers fall back to in-process inference while it cannot be reached
+ML_MODEL_SERVER_URL = os.getenv("ML_MODEL_SERVER_URL", "")
+ML_MODEL_SERVER_TIMEOUT = float(os.getenv("ML_MODEL_SERVER_TIMEOUT", "10"))
+ML_MODEL_SERVER_POOL_SIZE = int(os.getenv("ML_MODEL_SERVER_POOL_SIZE", "10"))
+
+# Match interview keywords with BERT embeddings instead of plain string matching
+ML_BERT_KEYWORDS_ENABLED = os.getenv("ML_BERT_KEYWORDS_ENABLED", "False").lower() == "true"
+
+# Classify interview questions with the zero-shot bart-large-mnli model (about 1.6 GB of weights)
+ML_ZERO_SHOT_ENABLED = os.getenv("ML_ZERO_SHOT_ENABLED", "False").lower() == "true"
+
+# Map free-form key phrases to taxonomy skills through the taxonomy embedding index
+ML_SEMANTIC_SKILLS_ENABLED = os.getenv("ML_SEMANTIC_SKILLS_ENABLED", "False").lower() == "true"
+# Minimum centred similarity of a phrase to its skill (calibrate with: python manage.py calibrate_skill_threshold)
+ML_SEMANTIC_SKILLS_THRESHOLD = float(os.getenv("ML_SEMANTIC_SKILLS_THRESHOLD", "0.5"))
+
+# Asynchronous resume analysis jobs (processed by: python manage.py run_analysis_workers)
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+ANALYSIS_JOB_VISIBILITY_TIMEOUT = int(os.getenv("ANALYSIS_JOB_VISIBILITY_TIMEOUT", "300"))
+ANALYSIS_JOB_RETRY_BACKOFF = int(os.getenv("ANALYSIS_JOB_RETRY_BACKOFF", "10"))
+ANALYSIS_JOB_RETRY_BACKOFF_MAX = int(os.getenv("ANALYSIS_JOB_RETRY_BACKOFF_MAX", "600"))
+ANALYSIS_JOB_POLL_INTERVAL = int(os.getenv("ANALYSIS_JOB_POLL_INTERVAL", "2"))
+ANALYSIS_JOB_HEARTBEAT_INTERVAL = int(os.getenv("ANALYSIS_JOB_HEARTBEAT_INTERVAL", "30"))
+
+# Seconds a request may spend on Azure and Groq calls before its stages fall back to local alternatives
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "30"))
+
+# Analysis tiers (fast, standard, full) and the deadline of each in seconds;
+# an analysis about to miss its deadline degrades to the next cheaper tier
+ANALYSIS_DEFAULT_TIER = os.getenv("ANALYSIS_DEFAULT_TIER", "full").lower()
+ANALYSIS_TIER_DEADLINES = {
+    "fast": float(os.getenv("ANALYSIS_DEADLINE_FAST", "2")),
+    "standard": float(os.getenv("ANALYSIS_DEADLINE_STANDARD", "8")),
+    "full": float(os.getenv("ANALYSIS_DEADLINE_FULL", "30")),
+}
+
+# Ranking one resume against many saved job descriptions
+RANKING_MAX_JOBS = int(os.getenv("RANKING_MAX_JOBS", "100"))
+RANKING_DEFAULT_TOP_K = int(os.getenv("RANKING_DEFAULT_TOP_K", "5"))
+DOCUMENT_FEATURES_CACHE_TIMEOUT = int(os.getenv("DOCUMENT_FEATURES_CACHE_TIMEOUT", "86400"))
+
+# Document features are materialized lazily on first use, or on save when enabled
+# (backfill and re-featurize after analyzer upgrades with: python manage.py featurize_documents)
+DOCUMENT_FEATURES_ON_SAVE = os.getenv("DOCUMENT_FEATURES_ON_SAVE", "False").lower() == "true"
+
+# Seconds between checks for TF-IDF document frequencies newer than the loaded ones
+# (counted by: python manage.py build_tfidf_statistics)
+TFIDF_REFRESH_INTERVAL = int(os.getenv("TFIDF_REFRESH_INTERVAL", "300"))
+
+# Estimated Jaccard similarity of word shingles above which job descriptions are near-duplicates
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.95"))
+
+# Extra section header names, as "section:header|header" entries separated by commas,
+# e.g. "experience:career history|positions held,volunteering:volunteer work"
+SECTION_HEADERS_EXTRA = {
+    section.strip().lower(): [header.strip() for header in headers.split("|") if header.strip()]
+    for section, _, headers in (entry.partition(":") for entry in os.getenv("SECTION_HEADERS_EXTRA", "").split(","))
+    if section.strip()
+}
+
+# Recruiter mode: ranking all stored resumes against a job description
+RECRUITER_PAGE_SIZE = int(os.getenv("RECRUITER_PAGE_SIZE", "50"))
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
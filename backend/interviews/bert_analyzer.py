@@ -4,12 +4,14 @@ This module provides functions to analyze interview transcripts using BERT-based
 """
 import os
 import json
+from functools import lru_cache
 from typing import Dict, List, Any
 
+from django.conf import settings
+
 # Optional: Catch import errors to handle cases where transformers/torch aren't installed
 try:
     from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
-    from transformers import BertTokenizer, BertModel
     import torch
     import numpy as np
     TRANSFORMERS_AVAILABLE = True
@@ -19,6 +21,30 @@ except ImportError as e:
     print(f"Error importing transformers and torch: {str(e)}")
     print("BERT models will not be available. Using fallback text analysis methods.")
 
+from resume_api import model_registry
+
+# Shared BERT encoder, loaded lazily through the process-wide model registry
+BERT_MODEL_NAME = model_registry.BERT_BASE_UNCASED
+
+# Registry name of the precomputed embeddings of QUESTION_KEYWORDS
+KEYWORD_BANK_NAME = "interview-keyword-bank"
+
+# Match keywords with BERT embeddings instead of plain string matching
+BERT_KEYWORDS_ENABLED = getattr(settings, 'ML_BERT_KEYWORDS_ENABLED', False)
+
+# Optional zero-shot question classification, loaded lazily only when enabled
+ZERO_SHOT_ENABLED = getattr(settings, 'ML_ZERO_SHOT_ENABLED', False)
+ZERO_SHOT_MODEL_NAME = "facebook/bart-large-mnli"
+ZERO_SHOT_HYPOTHESIS_TEMPLATE = "This interview question is about {}."
+
+# Candidate labels used to classify questions, mapped to their question type
+QUESTION_TYPE_LABELS = {
+    'professional experience and background': 'experience',
+    'a challenge, difficulty or problem': 'challenge',
+    'strengths and skills': 'strength',
+    'general qualifications': 'general'
+}
+
 # Dictionary of question types and relevant keywords
 QUESTION_KEYWORDS = {
     'experience': ['professional background', 'expertise', 'work history', 'career path', 'professional journey', 'accomplishments'],
@@ -32,42 +58,40 @@ class BertAnalyzer:
     Class for analyzing interview transcripts using BERT-based models
     """
     def __init__(self):
-        self.model_loaded = False
-        self.tokenizer = None
-        self.model = None
-        self.zero_shot_classifier = None
-        
-        # Try to load models if transformers is available
-        if TRANSFORMERS_AVAILABLE:
-            try:
-                print("Attempting to load BERT models...")
-                # Load BERT model for embeddings
-                self.tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-                print("Tokenizer loaded successfully")
-                
-                self.model = BertModel.from_pretrained('bert-base-uncased')
-                print("BERT model loaded successfully")
-                
-                # Load zero-shot classification model for topic detection
-                self.zero_shot_classifier = pipeline(
-                    "zero-shot-classification",
-                    model="facebook/bart-large-mnli",
-                    device=0 if torch.cuda.is_available() else -1
-                )
-                print("Zero-shot classifier loaded successfully")
-                
-                self.model_loaded = True
-                print("All BERT models loaded successfully")
-            except Exception as e:
-                print(f"Error loading BERT models: {e}")
-                import traceback
-                print(traceback.format_exc())
-                print("Using fallback text analysis methods")
-        else:
+        if not TRANSFORMERS_AVAILABLE:
             print("Transformers not available. Using fallback text analysis methods.")
     
+    @property
+    def encoder(self):
+        """The shared BERT encoder, loaded on first use"""
+        if not TRANSFORMERS_AVAILABLE:
+            return None
+        return model_registry.get(BERT_MODEL_NAME)
+    
+    @property
+    def model_loaded(self) -> bool:
+        """Whether the BERT encoder has already been loaded, without loading it"""
+        return TRANSFORMERS_AVAILABLE and model_registry.is_loaded(BERT_MODEL_NAME)
+    
+    @property
+    def zero_shot_classifier(self):
+        """The zero-shot classifier, loaded on first use and only when enabled"""
+        if not TRANSFORMERS_AVAILABLE or not ZERO_SHOT_ENABLED:
+            return None
+        return model_registry.get(ZERO_SHOT_MODEL_NAME)
+    
     def _determine_question_type(self, question: str) -> str:
         """Determine the type of interview question asked"""
+        if self.zero_shot_classifier is not None and question.strip():
+            try:
+                return _classify_question(question)
+            except Exception as e:
+                print(f"Error in zero-shot question classification: {e}")
+        
+        return self._determine_question_type_by_keywords(question)
+    
+    def _determine_question_type_by_keywords(self, question: str) -> str:
+        """Determine the type of interview question from keyword rules"""
         question_lower = question.lower()
         
         if 'experience' in question_lower or 'background' in question_lower:
@@ -93,45 +117,36 @@ class BertAnalyzer:
     def _extract_keywords_with_bert(self, transcript: str, question_type: str) -> Dict[str, List[str]]:
         """Extract keywords from the transcript using BERT embeddings"""
         # If models aren't available, fall back to simple matching
-        if not self.model_loaded:
+        if self.encoder is None:
             print("Models not loaded. Using simple keyword extraction.")
             return self._extract_keywords_simple(transcript, question_type)
         
         try:
-            # For very long transcripts, truncate to avoid memory issues
-            if len(transcript) > 5000:
-                print(f"Transcript too long ({len(transcript)} chars). Truncating to 5000 chars for BERT analysis.")
-                transcript = transcript[:5000]
+            keyword_bank = model_registry.get(KEYWORD_BANK_NAME)
+            if keyword_bank is None:
+                print("Keyword bank not available. Using simple keyword extraction.")
+                return self._extract_keywords_simple(transcript, question_type)
             
-            # Get candidate keywords for this question type
-            candidate_keywords = QUESTION_KEYWORDS[question_type]
+            # Get candidate keywords and their precomputed, normalized embeddings
+            candidate_keywords, keyword_embeddings = keyword_bank[question_type]
             print(f"Analyzing transcript against {len(candidate_keywords)} candidate keywords for '{question_type}'")
             
-            # Encode the transcript
-            print("Encoding transcript with BERT tokenizer")
-            transcript_inputs = self.tokenizer(transcript, return_tensors="pt", padding=True, truncation=True, max_length=512)
-            with torch.no_grad():
-                transcript_output = self.model(**transcript_inputs)
-            transcript_embedding = transcript_output.last_hidden_state.mean(dim=1)
+            # Encode the whole transcript in overlapping windows with one batched pass
+            print("Encoding transcript with BERT")
+            transcript_embedding = self.encoder.embed_long(transcript)
+            transcript_embedding = transcript_embedding / max(np.linalg.norm(transcript_embedding), 1e-12)
             print("Transcript successfully encoded")
             
-            # Compute similarity with candidate keywords
+            # Cosine similarity with every candidate keyword in one matrix product
+            similarities = keyword_embeddings @ transcript_embedding
+            
             relevant_keywords = []
             missing_keywords = []
+            transcript_lower = transcript.lower()
             
-            print("Computing similarity with candidate keywords")
-            for keyword in candidate_keywords:
-                # Encode the keyword
-                keyword_inputs = self.tokenizer(keyword, return_tensors="pt", padding=True, truncation=True)
-                with torch.no_grad():
-                    keyword_output = self.model(**keyword_inputs)
-                keyword_embedding = keyword_output.last_hidden_state.mean(dim=1)
-                
-                # Calculate cosine similarity
-                cos_sim = torch.nn.functional.cosine_similarity(transcript_embedding, keyword_embedding).item()
-                
+            for keyword, cos_sim in zip(candidate_keywords, similarities):
                 # Determine if keyword is relevant based on similarity threshold
-                if cos_sim > 0.4 or keyword.lower() in transcript.lower():
+                if cos_sim > 0.4 or keyword.lower() in transcript_lower:
                     relevant_keywords.append(keyword)
                 else:
                     missing_keywords.append(keyword)
@@ -306,9 +321,11 @@ class BertAnalyzer:
         question_type = self._determine_question_type(question)
         transcript_context = self._determine_transcript_context(transcript)
         
-        # Extract keywords using simple string matching (not BERT)
-        # This reverts to the original approach as requested
-        keyword_results = self._extract_keywords_simple(transcript, question_type)
+        # Extract keywords using simple string matching, or BERT embeddings when enabled
+        if BERT_KEYWORDS_ENABLED:
+            keyword_results = self._extract_keywords_with_bert(transcript, question_type)
+        else:
+            keyword_results = self._extract_keywords_simple(transcript, question_type)
         
         # Generate suggestions and strengths (still using BERT contextual understanding)
         suggestions = self._generate_suggestions(transcript_context, question_type)
@@ -326,6 +343,47 @@ class BertAnalyzer:
             "improvementAreas": improvement_areas
         }
 
+def _load_keyword_bank():
+    """
+    Embed every candidate keyword once, in a single batched forward pass
+    
+    Returns:
+        Dictionary mapping each question type to its keywords and a stacked
+        matrix of their L2-normalized embeddings
+    """
+    encoder = model_registry.get(BERT_MODEL_NAME)
+    if encoder is None:
+        raise RuntimeError(f"{BERT_MODEL_NAME} is not available")
+    
+    all_keywords = [keyword for keywords in QUESTION_KEYWORDS.values() for keyword in keywords]
+    embeddings = encoder.embed(all_keywords, pooling="mean", max_length=32)
+    embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    
+    keyword_bank = {}
+    offset = 0
+    for question_type, keywords in QUESTION_KEYWORDS.items():
+        keyword_bank[question_type] = (keywords, embeddings[offset:offset + len(keywords)])
+        offset += len(keywords)
+    return keyword_bank
+
+if TRANSFORMERS_AVAILABLE and BERT_KEYWORDS_ENABLED:
+    model_registry.register(KEYWORD_BANK_NAME, _load_keyword_bank)
+
+def _load_question_classifier():
+    """Load the zero-shot classifier with the question type hypotheses pre-tokenized"""
+    classifier = model_registry.load_zero_shot_classifier(ZERO_SHOT_MODEL_NAME, ZERO_SHOT_HYPOTHESIS_TEMPLATE)
+    classifier.prepare_labels(list(QUESTION_TYPE_LABELS))
+    return classifier
+
+if TRANSFORMERS_AVAILABLE and ZERO_SHOT_ENABLED:
+    model_registry.register(ZERO_SHOT_MODEL_NAME, _load_question_classifier, remote_kind='zero_shot')
+
+@lru_cache(maxsize=256)
+def _classify_question(question: str) -> str:
+    """Classify a question with the zero-shot model, caching results for repeated questions"""
+    scores = model_registry.get(ZERO_SHOT_MODEL_NAME).classify(question, list(QUESTION_TYPE_LABELS))
+    return QUESTION_TYPE_LABELS[next(iter(scores))]
+
 # Singleton instance
 analyzer = BertAnalyzer()
 
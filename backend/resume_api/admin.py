@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Resume, JobDescription, ResumeAnalysis
+from .models import Resume, JobDescription, ResumeAnalysis, AnalysisJob, DocumentFeatures, SegmentFeatures
 
 @admin.register(Resume)
 class ResumeAdmin(admin.ModelAdmin):
@@ -18,3 +18,22 @@ class ResumeAnalysisAdmin(admin.ModelAdmin):
     list_display = ('resume', 'job_description', 'match_score', 'created_at')
     list_filter = ('created_at', 'match_score')
     search_fields = ('resume__title', 'job_description__title', 'user__username')
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'priority', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('id', 'user__username')
+
+@admin.register(DocumentFeatures)
+class DocumentFeaturesAdmin(admin.ModelAdmin):
+    list_display = ('id', 'resume', 'job_description', 'analyzer_version', 'updated_at')
+    list_filter = ('analyzer_version', 'updated_at')
+    exclude = ('embedding',)
+
+@admin.register(SegmentFeatures)
+class SegmentFeaturesAdmin(admin.ModelAdmin):
+    list_display = ('fingerprint', 'analyzer_version', 'sentiment', 'word_count', 'created_at')
+    list_filter = ('analyzer_version', 'sentiment')
+    search_fields = ('fingerprint',)
+    exclude = ('embedding',)
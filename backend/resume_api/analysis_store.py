@@ -0,0 +1,277 @@
+"""
+Persisted resume analyses, deduplicated by content hash.
+
+Every analysis is stored as a ResumeAnalysis row together with the SHA-256 of
+both uploaded files and the analyzer version that produced it. A repeat
+request for the same pair of files is answered from the stored row without
+extracting text or calling any model. Hashing the raw uploads rather than the
+extracted text means a cache hit also skips OCR.
+
+Results are keyed by content only, so a pair analyzed for one user is copied
+to another user who uploads the same files. A job description that is a
+near-duplicate of one analyzed before with the same resume reuses that
+analysis too. Bumping ANALYZER_VERSION makes every older row a miss and the
+analysis is recomputed.
+
+A resume edited in place is keyed by the hash of its text instead, and is
+rescored from its materialized features, which only re-analyze the
+paragraphs that changed.
+
+Every analysis records the tier that actually ran. A stored analysis only
+answers requests for the same or a cheaper tier, so a fast result is never
+served to a client that asked for a full analysis. An analysis in which a
+stage fell back to its local alternative because the request ran out of
+time is kept in the user's history but never reused.
+"""
+import hashlib
+
+from django.db import transaction
+from django.db.models import Q
+
+from . import analysis_tiers
+from . import document_features
+from . import document_segments
+from .models import Resume, JobDescription, ResumeAnalysis, DocumentFeatures
+from .resume_analyzer import ResumeAnalyzer, ANALYZER_VERSION
+
+
+def content_hash(content):
+    """Return the SHA-256 hex digest of an uploaded file's content"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def find_analysis(resume_hash, job_description_hash, user=None, tier=analysis_tiers.FULL):
+    """
+    Find the latest stored analysis of a resume and job description pair.
+    
+    Args:
+        resume_hash (str): Content hash of the resume file
+        job_description_hash (str): Content hash of the job description file
+        user (User, optional): Only return analyses owned by this user
+        tier (str): Only return analyses that ran at least this tier
+    
+    Returns:
+        ResumeAnalysis: The analysis computed by the current analyzer version, or None
+    """
+    # A blank hash identifies no document
+    if not resume_hash or not job_description_hash:
+        return None
+    
+    analyses = ResumeAnalysis.objects.filter(
+        resume_hash=resume_hash,
+        job_description_hash=job_description_hash,
+        analyzer_version=ANALYZER_VERSION,
+        tier__in=analysis_tiers.at_least(tier),
+        degraded=False
+    )
+    if user is not None:
+        analyses = analyses.filter(user=user)
+    return analyses.select_related('resume', 'job_description').order_by('-created_at').first()
+
+
+def _get_or_create_document(model, user, file_name, file_hash, text):
+    document = model.objects.filter(user=user, content_hash=file_hash).order_by('-created_at').first()
+    if document is None:
+        document = model.objects.create(
+            user=user,
+            title=file_name[:100],
+            file_name=file_name,
+            file_type=file_name.split('.')[-1].lower()[:10],
+            content=text,
+            content_hash=file_hash
+        )
+    return document
+
+
+@transaction.atomic
+def store_analysis(user, resume_file_name, resume_hash, resume_text,
+                   job_desc_file_name, job_desc_hash, job_desc_text, result):
+    """
+    Store an analysis result with the resume and job description it was computed from.
+    
+    Returns:
+        ResumeAnalysis: The stored analysis
+    """
+    resume = _get_or_create_document(Resume, user, resume_file_name, resume_hash, resume_text)
+    job_description = _get_or_create_document(JobDescription, user, job_desc_file_name, job_desc_hash, job_desc_text)
+    return _create_analysis(user, resume, job_description, result)
+
+
+def find_near_duplicate_analysis(user, resume_hash, job_description, tier=analysis_tiers.FULL):
+    """
+    Find a user's stored analysis of a resume against a near-duplicate of a job description.
+    
+    Only the user's own analyses that ran at least the given tier are considered,
+    so a near-duplicate posting never serves another user's result.
+    
+    Returns:
+        ResumeAnalysis: The latest analysis against any copy sharing the job's canonical copy, or None
+    """
+    canonical_id = job_description.canonical_id
+    if canonical_id is None:
+        return None
+    
+    return (ResumeAnalysis.objects
+            .filter(user=user, resume_hash=resume_hash, analyzer_version=ANALYZER_VERSION,
+                    tier__in=analysis_tiers.at_least(tier), degraded=False)
+            .filter(Q(job_description_id=canonical_id) | Q(job_description__canonical_id=canonical_id))
+            .exclude(job_description=job_description)
+            .order_by('-created_at').first())
+
+
+def _create_analysis(user, resume, job_description, result):
+    return ResumeAnalysis.objects.create(
+        user=user,
+        resume=resume,
+        job_description=job_description,
+        keywords_to_add=result.get('keywordsToAdd', []),
+        keywords_to_remove=result.get('keywordsToRemove', []),
+        format_suggestions=result.get('formatSuggestions', []),
+        content_suggestions=result.get('contentSuggestions', []),
+        match_score=result.get('matchScore', 0),
+        resume_hash=resume.content_hash,
+        job_description_hash=job_description.content_hash,
+        analyzer_version=ANALYZER_VERSION,
+        tier=result.get('tier', analysis_tiers.FULL),
+        degraded=bool(result.get('degraded')),
+        result=result
+    )
+
+
+def _analyze_documents(analyzer, resume, job_description, resume_features=None):
+    """Analyze a stored resume against a stored job description from their materialized features"""
+    if resume_features is None:
+        resume_features = document_features.features_for_document(resume, analyzer)
+    
+    # The resume sentiment is combined from its paragraphs, like its key phrases
+    if analyzer.tier_run.allows(analysis_tiers.FULL, 'sentiment'):
+        resume_features = dict(
+            resume_features,
+            sentiment=document_segments.document_sentiment(resume.content, resume_features["segments"])
+        )
+    return analyzer.analyze_resume_and_job_description(
+        resume.content, job_description.content,
+        resume_features=resume_features,
+        job_features=document_features.features_for_document(job_description, analyzer)
+    )
+
+
+def get_stored_analysis(user, resume_file_name, resume_hash, job_desc_file_name, job_desc_hash,
+                        tier=analysis_tiers.FULL):
+    """
+    Get the stored analysis of a pair of files for a user.
+    
+    An analysis another user stored for the same files is copied to this user.
+    Only analyses that ran at least the requested tier are returned.
+    
+    Returns:
+        ResumeAnalysis: The user's analysis, or None if the pair has not been analyzed
+    """
+    analysis = find_analysis(resume_hash, job_desc_hash, user=user, tier=tier)
+    if analysis is not None:
+        return analysis
+    
+    analysis = find_analysis(resume_hash, job_desc_hash, tier=tier)
+    if analysis is None:
+        return None
+    
+    return store_analysis(
+        user,
+        resume_file_name, resume_hash, analysis.resume.content,
+        job_desc_file_name, job_desc_hash, analysis.job_description.content,
+        analysis.result
+    )
+
+
+def analyze_and_store(user, resume_content, resume_file_name, job_desc_content, job_desc_file_name, force=False,
+                      tier=None):
+    """
+    Analyze a resume against a job description, reusing a stored analysis of the same files.
+    
+    Args:
+        user (User): The user requesting the analysis
+        resume_content (bytes): The content of the resume file
+        resume_file_name (str): The resume file name
+        job_desc_content (bytes): The content of the job description file
+        job_desc_file_name (str): The job description file name
+        force (bool): Recompute even if a stored analysis exists
+        tier (str, optional): Analysis tier to run within its deadline; a full
+            analysis bounded only by the request deadline if not given
+    
+    Returns:
+        tuple: The analysis result, the ResumeAnalysis it is stored in (None if
+            text extraction failed) and whether it was served from storage
+    """
+    resume_hash = content_hash(resume_content)
+    job_desc_hash = content_hash(job_desc_content)
+    
+    if not force:
+        analysis = get_stored_analysis(user, resume_file_name, resume_hash, job_desc_file_name, job_desc_hash,
+                                       tier=tier or analysis_tiers.FULL)
+        if analysis is not None:
+            return analysis.result, analysis, True
+    
+    # The tier's budget bounds extraction, featurization and every external call
+    with analysis_tiers.tier_deadline(tier):
+        analyzer = ResumeAnalyzer(tier)
+        resume_text = analyzer.extract_text_from_file(resume_content, resume_file_name.split('.')[-1])
+        job_desc_text = analyzer.extract_text_from_file(job_desc_content, job_desc_file_name.split('.')[-1])
+        
+        # Extraction errors may be transient, so they are not stored
+        if resume_text.startswith("Error:") or job_desc_text.startswith("Error:"):
+            return analyzer.analyze_resume_and_job_description(resume_text, job_desc_text), None, False
+        
+        with transaction.atomic():
+            resume = _get_or_create_document(Resume, user, resume_file_name, resume_hash, resume_text)
+            job_description = _get_or_create_document(JobDescription, user, job_desc_file_name, job_desc_hash,
+                                                      job_desc_text)
+        
+        # A near-duplicate of a job description analyzed with this resume gets the same result
+        if not force:
+            duplicate_analysis = find_near_duplicate_analysis(user, resume_hash, job_description,
+                                                              tier=tier or analysis_tiers.FULL)
+            if duplicate_analysis is not None:
+                analysis = _create_analysis(user, resume, job_description, duplicate_analysis.result)
+                return analysis.result, analysis, True
+        
+        # Documents analyzed before already have their features materialized
+        result = _analyze_documents(analyzer, resume, job_description)
+        return result, _create_analysis(user, resume, job_description, result), False
+
+
+def rescore(user, resume, job_description, force=False):
+    """
+    Analyze a stored resume against a job description after the resume was edited.
+    
+    The resume is compared paragraph by paragraph with the version its features
+    were last computed from, and only new paragraphs are sent to Azure and BERT.
+    
+    Args:
+        user (User): The user requesting the analysis
+        resume (Resume): The resume, with its current content
+        job_description (JobDescription): The job description to score it against
+        force (bool): Recompute even if a stored analysis of this version exists
+    
+    Returns:
+        tuple: The analysis result, the ResumeAnalysis it is stored in, whether it
+            was served from storage and the paragraph changes since the previous version
+    """
+    # Documents created before their hashes were kept have none, and would all share one key
+    for document in (resume, job_description):
+        if not document.content_hash:
+            document.content_hash = document_features.content_hash(document.content)
+            document.save(update_fields=['content_hash'])
+    
+    previous_segments = DocumentFeatures.objects.filter(resume=resume).values_list('segments', flat=True).first()
+    
+    analyzer = ResumeAnalyzer()
+    resume_features = document_features.features_for_document(resume, analyzer)
+    changes = document_segments.diff_segments(previous_segments or [], resume_features["segments"])
+    
+    if not force:
+        analysis = find_analysis(resume.content_hash, job_description.content_hash, user=user)
+        if analysis is not None:
+            return analysis.result, analysis, True, changes
+    
+    result = _analyze_documents(analyzer, resume, job_description, resume_features=resume_features)
+    return result, _create_analysis(user, resume, job_description, result), False, changes
@@ -0,0 +1,93 @@
+"""
+Analysis tiers and their latency budgets.
+
+Clients choose how much of the pipeline an analysis runs:
+
+- fast: local lexical matching only. Skills are extracted with the taxonomy
+  patterns and matched exactly or through the canonicalization tables, and
+  text similarity is TF-IDF. No network call and no model.
+- standard: adds BERT embeddings for skill matching, document embeddings and
+  the semantic checks of the content suggestions.
+- full: adds Azure key phrases, sentiment and OCR.
+
+Every tier has a deadline (ANALYSIS_TIER_DEADLINES). An analysis checks its
+tier before each stage, and once the remaining time only fits the budget of
+the next cheaper tier, it degrades to that tier so the rest can still finish
+in time. A degraded analysis never goes back up, and its result reports the
+tier it ended at. Stored features are read at any tier, since that costs
+only a database query.
+
+A tier's deadline never extends past the deadline of the request it runs
+in, and stages the requested tier would have run are reported as degraded.
+"""
+from django.conf import settings
+
+from . import deadlines
+
+FAST = 'fast'
+STANDARD = 'standard'
+FULL = 'full'
+
+# Cheapest first
+TIERS = [FAST, STANDARD, FULL]
+
+DEFAULT_DEADLINES = {FAST: 2.0, STANDARD: 8.0, FULL: 30.0}
+
+
+def budget(tier):
+    """Get the deadline of a tier in seconds"""
+    return getattr(settings, 'ANALYSIS_TIER_DEADLINES', {}).get(tier, DEFAULT_DEADLINES[tier])
+
+
+def tier_deadline(tier):
+    """Run a block of work within a tier's budget, or only the request deadline if the tier is None"""
+    return deadlines.request_deadline(budget(tier) if tier else None)
+
+
+def at_least(tier):
+    """Get the tiers that run at least everything a tier runs"""
+    return TIERS[TIERS.index(tier):]
+
+
+class TierRun:
+    """
+    The tier of one analysis, degraded as its deadline approaches.
+    
+    Args:
+        tier (str): The requested tier
+        deadline (Deadline, optional): Deadline of the analysis; without one, the
+            analysis is only bounded by the deadline of the request it runs in
+    """
+    
+    def __init__(self, tier=FULL, deadline=None):
+        self.requested = tier
+        self.tier = tier
+        self.deadline = deadline
+        self.degradations = []
+    
+    def check(self, stage):
+        """
+        Get the tier to run a stage at.
+        
+        Args:
+            stage (str): Name of the stage about to start, for logging
+        
+        Returns:
+            str: The current tier, degraded while the remaining time only fits a cheaper tier's budget
+        """
+        remaining = (self.deadline or deadlines.current()).remaining()
+        while remaining is not None and self.tier != FAST:
+            cheaper = TIERS[TIERS.index(self.tier) - 1]
+            if remaining > budget(cheaper):
+                break
+            print(f"Analysis deadline: {remaining:.1f} s left before {stage}, degrading from {self.tier} to {cheaper}")
+            self.degradations.append({"stage": stage, "from": self.tier, "to": cheaper})
+            self.tier = cheaper
+        return self.tier
+    
+    def allows(self, tier, stage):
+        """Whether a stage that needs a tier can run at it, recording the stage as degraded if the requested tier could"""
+        allowed = TIERS.index(self.check(stage)) >= TIERS.index(tier)
+        if not allowed and TIERS.index(self.requested) >= TIERS.index(tier):
+            deadlines.skip(stage)
+        return allowed
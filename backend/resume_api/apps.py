@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ResumeApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'resume_api'
+
+    def ready(self):
+        # Optionally load the ML models in the background so the process can
+        # report liveness right away and readiness once the models are loaded
+        if getattr(settings, 'ML_WARMUP_ON_STARTUP', False):
+            from . import model_registry
+            model_registry.start_warm_up()
+
+        # Index saved job descriptions for near-duplicate detection
+        from . import near_duplicates  # noqa: F401, registers the post_save receiver
+
+        # Materialize document features when resumes and job descriptions are saved
+        if getattr(settings, 'DOCUMENT_FEATURES_ON_SAVE', False):
+            from . import document_features  # noqa: F401, registers the post_save receivers
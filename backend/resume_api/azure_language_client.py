@@ -4,10 +4,14 @@ from azure.core.credentials import AzureKeyCredential
 from azure.ai.textanalytics import TextAnalyticsClient
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
-from transformers import AutoTokenizer, AutoModel
-import torch
 import re
 
+from . import canonicalization
+from . import deadlines
+from . import lexical_analyzer
+from . import model_registry
+from . import string_similarity
+
 # Load environment variables
 load_dotenv()
 
@@ -15,14 +19,8 @@ load_dotenv()
 key = os.getenv("AZURE_LANGUAGE_KEY")
 endpoint = os.getenv("AZURE_LANGUAGE_ENDPOINT")
 
-# Load BERT model for text similarity
-try:
-    tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
-    model = AutoModel.from_pretrained("bert-base-uncased")
-except Exception as e:
-    print(f"Error loading BERT model: {str(e)}")
-    tokenizer = None
-    model = None
+# BERT model for text similarity, loaded on first use from the shared registry
+BERT_MODEL_NAME = model_registry.BERT_BASE_UNCASED
 
 # Initialize Azure Language Text Analytics client
 def get_text_analytics_client():
@@ -37,6 +35,14 @@ def get_text_analytics_client():
         print(f"Error initializing Text Analytics client: {str(e)}")
         return None
 
+# Bound every call by the time left in the current request, see deadlines
+def _call_options():
+    """Per-call options of the Azure SDK that end a call, including its retries, when the request deadline passes"""
+    timeout = deadlines.remaining()
+    if timeout is None:
+        return {}
+    return {"timeout": timeout, "connection_timeout": timeout, "read_timeout": timeout}
+
 # Extract key phrases from text
 def extract_key_phrases(text):
     """
@@ -49,11 +55,11 @@ def extract_key_phrases(text):
         list: A list of extracted key phrases
     """
     client = get_text_analytics_client()
-    if not client:
+    if not client or not deadlines.check('key phrases'):
         return []
     
     try:
-        response = client.extract_key_phrases([text])[0]
+        response = client.extract_key_phrases([text], **_call_options())[0]
         
         if not response.is_error:
             return response.key_phrases
@@ -62,8 +68,56 @@ def extract_key_phrases(text):
             return []
     except Exception as e:
         print(f"Error calling key phrase extraction: {str(e)}")
+        deadlines.check('key phrases')
         return []
 
+# Maximum number of documents the Language service accepts in one request
+MAX_BATCH_DOCUMENTS = 10
+
+# Extract key phrases from several texts
+def extract_key_phrases_batch(texts):
+    """
+    Extract key phrases from several texts, sending up to MAX_BATCH_DOCUMENTS per request.
+    
+    Args:
+        texts (list): The texts to analyze
+    
+    Returns:
+        list: A list of extracted key phrases per text, empty for texts the service
+            rejected, and None for texts of failed calls or not analyzed before the
+            request deadline, which callers should retry later
+    """
+    results = [[] for _ in texts]
+    client = get_text_analytics_client()
+    if not client or not texts:
+        return results
+    
+    for offset in range(0, len(texts), MAX_BATCH_DOCUMENTS):
+        if not deadlines.check('key phrases'):
+            results[offset:] = [None] * (len(texts) - offset)
+            break
+        
+        try:
+            responses = client.extract_key_phrases(texts[offset:offset + MAX_BATCH_DOCUMENTS], **_call_options())
+        except Exception as e:
+            print(f"Error calling key phrase extraction: {str(e)}")
+            # A call cut off by the deadline leaves its texts unanalyzed as well
+            if not deadlines.check('key phrases'):
+                results[offset:] = [None] * (len(texts) - offset)
+                break
+            # Throttling and server errors are transient, so the batch is retried later
+            batch_end = min(offset + MAX_BATCH_DOCUMENTS, len(texts))
+            results[offset:batch_end] = [None] * (batch_end - offset)
+            continue
+        
+        for index, response in enumerate(responses, start=offset):
+            if not response.is_error:
+                results[index] = response.key_phrases
+            else:
+                print(f"Error extracting key phrases: {response.error}")
+    
+    return results
+
 # Analyze sentiment of text
 def analyze_sentiment(text):
     """
@@ -83,9 +137,11 @@ def analyze_sentiment(text):
     if not client:
         print("No client available for sentiment analysis")
         return default_result
+    if not deadlines.check('sentiment'):
+        return default_result
     
     try:
-        response = client.analyze_sentiment([text])[0]
+        response = client.analyze_sentiment([text], **_call_options())[0]
         
         if not response.is_error:
             # Format the response with only sentiment value
@@ -99,8 +155,45 @@ def analyze_sentiment(text):
             return default_result
     except Exception as e:
         print(f"Error calling sentiment analysis: {str(e)}")
+        deadlines.check('sentiment')
         return default_result
 
+# Analyze the sentiment of several texts
+def analyze_sentiment_batch(texts):
+    """
+    Analyze the sentiment of several texts, sending up to MAX_BATCH_DOCUMENTS per request.
+    
+    Args:
+        texts (list): The texts to analyze
+    
+    Returns:
+        list: The sentiment label of every text, or None for texts that could not be analyzed
+    """
+    results = [None] * len(texts)
+    client = get_text_analytics_client()
+    if not client or not texts:
+        return results
+    
+    for offset in range(0, len(texts), MAX_BATCH_DOCUMENTS):
+        # Texts not analyzed in time stay None and count as neutral
+        if not deadlines.check('sentiment'):
+            break
+        
+        try:
+            responses = client.analyze_sentiment(texts[offset:offset + MAX_BATCH_DOCUMENTS], **_call_options())
+        except Exception as e:
+            print(f"Error calling sentiment analysis: {str(e)}")
+            deadlines.check('sentiment')
+            continue
+        
+        for index, response in enumerate(responses, start=offset):
+            if not response.is_error:
+                results[index] = response.sentiment
+            else:
+                print(f"Error analyzing sentiment: {response.error}")
+    
+    return results
+
 # Detect language of text
 def detect_language(text):
     """
@@ -113,11 +206,11 @@ def detect_language(text):
         str: The detected language code
     """
     client = get_text_analytics_client()
-    if not client:
+    if not client or not deadlines.check('language detection'):
         return "en"
     
     try:
-        response = client.detect_language([text])[0]
+        response = client.detect_language([text], **_call_options())[0]
         
         if not response.is_error:
             return response.primary_language.iso6391_name
@@ -126,6 +219,7 @@ def detect_language(text):
             return "en"
     except Exception as e:
         print(f"Error calling language detection: {str(e)}")
+        deadlines.check('language detection')
         return "en"
 
 # Get BERT embeddings for text
@@ -139,26 +233,95 @@ def get_bert_embedding(text):
     Returns:
         numpy.ndarray: BERT embedding vector
     """
-    if tokenizer is None or model is None:
+    encoder = model_registry.get(BERT_MODEL_NAME)
+    if encoder is None:
         # Fallback to simple character-based embedding if BERT is not available
         return np.array([ord(c) for c in text[:20].ljust(20)])
     
     try:
-        # Tokenize and prepare for BERT
-        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=128)
-        
-        # Get BERT embeddings
-        with torch.no_grad():
-            outputs = model(**inputs)
-        
         # Use the [CLS] token embedding as the sentence embedding
-        embeddings = outputs.last_hidden_state[:, 0, :].numpy()
+        embeddings = encoder.embed([text], pooling="cls", max_length=128)
         return embeddings[0]  # Return the first (and only) embedding
     except Exception as e:
         print(f"Error getting BERT embedding: {str(e)}")
         # Fallback to simple character-based embedding
         return np.array([ord(c) for c in text[:20].ljust(20)])
 
+# Get BERT embeddings for a batch of texts
+def get_bert_embeddings(texts):
+    """
+    Get BERT embeddings for several texts with a single batched forward pass.
+    
+    Args:
+        texts (list): Texts to embed
+        
+    Returns:
+        numpy.ndarray: Matrix with one embedding row per input text
+    """
+    if not texts:
+        return np.zeros((0, 0))
+    
+    encoder = model_registry.get(BERT_MODEL_NAME)
+    if encoder is None:
+        # Fallback to simple character-based embeddings if BERT is not available
+        return np.array([[ord(c) for c in text[:20].ljust(20)] for text in texts])
+    
+    try:
+        # Embed the whole batch, padded to the longest text in it, using the
+        # [CLS] token embedding of every row as its sentence embedding
+        return encoder.embed(texts, pooling="cls", max_length=128)
+    except Exception as e:
+        print(f"Error getting batched BERT embeddings: {str(e)}")
+        return np.array([[ord(c) for c in text[:20].ljust(20)] for text in texts])
+
+# Get a BERT embedding of a whole document
+def get_document_embedding(text):
+    """
+    Get a BERT embedding of a document of any length.
+    
+    Long documents are split into overlapping windows whose mean-pooled
+    embeddings are averaged, so no part of the text is truncated away.
+    
+    Args:
+        text (str): Document text
+    
+    Returns:
+        numpy.ndarray: Document embedding vector, or None if BERT is not available
+    """
+    encoder = model_registry.get(BERT_MODEL_NAME)
+    if encoder is None:
+        return None
+    
+    try:
+        return encoder.embed_long(text)
+    except Exception as e:
+        print(f"Error getting BERT document embedding: {str(e)}")
+        return None
+
+# Get BERT embeddings of the paragraphs of a document
+def get_segment_embeddings(texts):
+    """
+    Get mean-pooled BERT embeddings of several document segments with one batched forward pass.
+    
+    Segments are paragraphs, so they fit a single 512-token window; longer
+    ones are truncated.
+    
+    Args:
+        texts (list): Segment texts
+    
+    Returns:
+        list: One embedding vector per segment, or None for every segment if BERT is not available
+    """
+    encoder = model_registry.get(BERT_MODEL_NAME) if texts else None
+    if encoder is None:
+        return [None] * len(texts)
+    
+    try:
+        return list(encoder.embed(texts, pooling="mean", max_length=512))
+    except Exception as e:
+        print(f"Error getting BERT segment embeddings: {str(e)}")
+        return [None] * len(texts)
+
 # Calculate contextual semantic similarity between texts using BERT
 def calculate_text_similarity(text1, text2, is_tech_skill=False):
     """
@@ -207,114 +370,104 @@ def calculate_text_similarity(text1, text2, is_tech_skill=False):
     
     return similarity
 
-def _normalize_tech_term(term):
-    """
-    Normalize a technical term by removing common prefixes/suffixes and standardizing format.
+# Calculate the similarity of every pair of texts from two lists
+def calculate_similarity_matrix(texts1, texts2, is_tech_skill=False, threshold=None):
     """
-    # Convert to lowercase for consistent comparison
-    normalized = term.lower()
+    Calculate calculate_text_similarity for every pair of texts from two lists.
     
-    # Remove common prefixes that don't affect the core meaning
-    prefixes = ['ms ', 'microsoft ', 'google ', 'apache ', 'aws ', 'azure ', 'ibm ']
-    for prefix in prefixes:
-        if normalized.startswith(prefix):
-            normalized = normalized[len(prefix):]
+    Each list is embedded with one batched forward pass and compared through
+    a single cosine similarity matrix. For technical skills, acronym and
+    variant matches are resolved through the canonicalization tables.
     
-    # Remove version numbers and common suffixes
-    normalized = re.sub(r'\s+\d+(\.\d+)*', '', normalized)  # Remove version numbers
-    normalized = re.sub(r'\s+(framework|library|language|platform)$', '', normalized)  # Remove common tech suffixes
+    Args:
+        texts1 (list): Texts for the rows
+        texts2 (list): Texts for the columns
+        is_tech_skill (bool): Whether this is a technical skill comparison that needs special handling
+        threshold (float, optional): Only scores above this value are used by the caller, so
+            partial matches are not computed for pairs that cannot reach it
+        
+    Returns:
+        numpy.ndarray: Similarity scores between 0 and 1, one row per text in texts1
+    """
+    if not texts1 or not texts2:
+        return np.zeros((len(texts1), len(texts2)))
     
-    # Remove special characters and extra spaces
-    normalized = re.sub(r'[^\w\s]', '', normalized)
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    similarity = cosine_similarity(get_bert_embeddings(texts1), get_bert_embeddings(texts2))
     
-    return normalized
+    if is_tech_skill:
+        # Weighted combination of BERT similarity and partial match; with a
+        # threshold, a pair needs at least this partial score to pass it
+        min_partial_scores = None if threshold is None else (threshold - 0.7 * similarity) / 0.3
+        partial_match_scores = string_similarity.partial_match_matrix(texts1, texts2, min_partial_scores)
+        similarity = 0.7 * similarity + 0.3 * partial_match_scores
+        _apply_canonical_matches(similarity, texts1, texts2)
+    
+    return np.clip(similarity, 0.0, 1.0)
 
-def _is_acronym_match(term1, term2):
-    """
-    Check if one term is an acronym of the other.
+# Calculate similarity without BERT, for analyses without the time budget for it
+def calculate_lexical_similarity_matrix(texts1, texts2, is_tech_skill=False):
     """
-    # If both are short, they need to match exactly
-    if len(term1) <= 5 and len(term2) <= 5:
-        return term1 == term2
+    Calculate the similarity of every pair of texts from the canonicalization tables only.
     
-    # Check if term1 is an acronym of term2
-    if len(term1) <= 5 and len(term2) > 5:
-        acronym = ''.join(word[0] for word in term2.split() if word)
-        return term1 == acronym.lower()
+    Technical skills that are acronyms of each other score 1.0 and variants
+    of each other 0.9; every other pair scores 0.
     
-    # Check if term2 is an acronym of term1
-    if len(term2) <= 5 and len(term1) > 5:
-        acronym = ''.join(word[0] for word in term1.split() if word)
-        return term2 == acronym.lower()
+    Args:
+        texts1 (list): Texts for the rows
+        texts2 (list): Texts for the columns
+        is_tech_skill (bool): Whether this is a technical skill comparison
     
-    return False
-
-def _are_tech_variants(term1, term2):
+    Returns:
+        numpy.ndarray: Similarity scores between 0 and 1, one row per text in texts1
     """
-    Check for common technology name variations.
+    similarity = np.zeros((len(texts1), len(texts2)))
+    if is_tech_skill and texts1 and texts2:
+        _apply_canonical_matches(similarity, texts1, texts2)
+    return similarity
+
+def _apply_canonical_matches(similarity, texts1, texts2):
+    """Set the similarity of acronym and variant pairs of technical skills in place"""
+    normalized1 = [_normalize_tech_term(text) for text in texts1]
+    normalized2 = [_normalize_tech_term(text) for text in texts2]
+    for row, term1 in enumerate(normalized1):
+        for column, term2 in enumerate(normalized2):
+            if _is_acronym_match(term1, term2):
+                similarity[row, column] = 1.0
+            elif _are_tech_variants(term1, term2):
+                similarity[row, column] = 0.9
+
+# Calculate the best semantic match of each text against a set of candidates
+def calculate_max_similarities(texts, candidates):
     """
-    # Technology name variants mapping
-    tech_variants = {
-        'javascript': ['js'],
-        'typescript': ['ts'],
-        'python': ['py'],
-        'react': ['reactjs', 'react.js'],
-        'node': ['nodejs', 'node.js'],
-        'angular': ['angularjs', 'angular.js'],
-        'vue': ['vuejs', 'vue.js'],
-        'dotnet': ['dot net', '.net', 'net framework'],
-        'csharp': ['c#', 'c sharp'],
-        'cplusplus': ['c++', 'cpp'],
-        'objective-c': ['objective c', 'objectivec'],
-        'machine learning': ['ml'],
-        'artificial intelligence': ['ai'],
-        'natural language processing': ['nlp'],
-        'kubernetes': ['k8s'],
-        'database': ['db'],
-    }
+    Calculate, for every text, its highest BERT similarity to any of the candidates.
     
-    # Normalize both terms further
-    t1 = term1.replace('-', '').replace('.', '').replace(' ', '')
-    t2 = term2.replace('-', '').replace('.', '').replace(' ', '')
+    Both lists are embedded with one batched forward pass each and compared
+    through a single cosine similarity matrix.
     
-    # Check direct mapping first
-    for base, variants in tech_variants.items():
-        base_norm = base.replace('-', '').replace('.', '').replace(' ', '')
+    Args:
+        texts (list): Texts to score
+        candidates (list): Texts to compare against
         
-        # If term1 is the base or a variant
-        if t1 == base_norm or t1 in [v.replace('-', '').replace('.', '').replace(' ', '') for v in variants]:
-            # Check if term2 is also the base or a variant
-            if t2 == base_norm or t2 in [v.replace('-', '').replace('.', '').replace(' ', '') for v in variants]:
-                return True
-    
-    return False
-
-def _calculate_partial_match_score(text1, text2):
-    """
-    Calculate a score based on partial string matching, useful for technical terms.
+    Returns:
+        numpy.ndarray: One similarity score between 0 and 1 per text
     """
-    # Convert to lowercase for comparison
-    s1 = text1.lower()
-    s2 = text2.lower()
+    if not texts or not candidates:
+        return np.zeros(len(texts))
     
-    # If either string is a substring of the other, assign a high score
-    if s1 in s2 or s2 in s1:
-        return 0.85
+    text_embeddings = get_bert_embeddings(texts)
+    candidate_embeddings = get_bert_embeddings(candidates)
     
-    # Calculate Levenshtein (edit) distance
-    try:
-        import Levenshtein as lev
-        max_len = max(len(s1), len(s2))
-        if max_len == 0:
-            return 0
-        edit_distance = lev.distance(s1, s2)
-        return 1.0 - (edit_distance / max_len)
-    except ImportError:
-        # Fallback if Levenshtein library is not available
-        # Use SequenceMatcher from difflib (built-in)
-        from difflib import SequenceMatcher
-        return SequenceMatcher(None, s1, s2).ratio()
+    similarity_matrix = cosine_similarity(text_embeddings, candidate_embeddings)
+    return np.clip(similarity_matrix.max(axis=1), 0.0, 1.0)
+
+# Canonicalization tables are built once at import, so these checks are cheap
+# enough to run over the full cross-product of two skill lists
+_normalize_tech_term = canonicalization.normalize_tech_term
+_is_acronym_match = canonicalization.is_acronym_match
+_are_tech_variants = canonicalization.are_tech_variants
+
+# Partial string matching, batched over term lists in string_similarity
+_calculate_partial_match_score = string_similarity.partial_match_score
 
 # Analyze text quality including passive voice detection
 def analyze_text_quality(text):
@@ -332,58 +485,9 @@ def analyze_text_quality(text):
         return {"passive_voice_ratio": 0, "passive_examples": []}
     
     try:
-        # First, split text into sentences for analysis
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        
-        # Initialize counters and result containers
-        total_sentences = len(sentences)
-        passive_sentences = 0
-        passive_examples = []
-        
-        # Common passive voice indicators
-        passive_indicators = [
-            r'\b(?:am|is|are|was|were|be|being|been)\s+\w+ed\b',
-            r'\b(?:has|have|had)\s+been\s+\w+ed\b',
-            r'\b(?:will|shall|should|would|could|might|must)\s+be\s+\w+ed\b'
-        ]
-        
-        for sentence in sentences:
-            # Skip very short sentences
-            if len(sentence.split()) < 3:
-                total_sentences -= 1
-                continue
-                
-            # Check for passive voice patterns
-            is_passive = any(re.search(pattern, sentence, re.IGNORECASE) for pattern in passive_indicators)
-            
-            if is_passive:
-                passive_sentences += 1
-                
-                # Generate an active voice alternative if possible
-                if len(passive_examples) < 3:  # Limit examples to avoid large result
-                    # Find the passive part of the sentence
-                    for pattern in passive_indicators:
-                        match = re.search(pattern, sentence, re.IGNORECASE)
-                        if match:
-                            passive_part = match.group(0)
-                            
-                            # Simple conversion of common passive phrases (very basic)
-                            active_suggestion = sentence.replace(passive_part, "actively did")
-                            
-                            passive_examples.append({
-                                "original": sentence,
-                                "suggestion": active_suggestion
-                            })
-                            break
-        
-        # Calculate passive voice ratio
-        passive_ratio = passive_sentences / total_sentences if total_sentences > 0 else 0
-        
-        return {
-            "passive_voice_ratio": passive_ratio,
-            "passive_examples": passive_examples
-        }
+        # Sentences and passive voice matches come from the shared token stream
+        return lexical_analyzer.analyze_text(text).passive_voice_statistics()
         
     except Exception as e:
         print(f"Error analyzing text quality: {str(e)}")
-        return {"passive_voice_ratio": 0, "passive_examples": []} 
\ No newline at end of file
+        return {"passive_voice_ratio": 0, "passive_examples": []}
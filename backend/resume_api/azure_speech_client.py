@@ -9,6 +9,8 @@ from io import BytesIO
 from dotenv import load_dotenv
 import azure.cognitiveservices.speech as speechsdk
 
+from . import lexical_analyzer
+
 # Load environment variables
 load_dotenv()
 
@@ -460,49 +462,11 @@ def detect_filler_words(transcript):
         transcript (str): The transcribed text
         
     Returns:
-        dict: Statistics about filler words
+        dict: Statistics about filler words, including their character offsets
     """
-    # Common filler words to detect
-    filler_words = [
-        "um", "uh", "ah", "er", "like", "you know", "so", "actually", 
-        "basically", "literally", "kind of", "sort of", "i mean"
-    ]
-    
-    # Normalize transcript
-    normalized = transcript.lower()
-    
-    # Find all occurrences of filler words
-    filler_counts = {}
-    total_count = 0
-    
-    for word in filler_words:
-        # Count non-overlapping occurrences
-        count = 0
-        start = 0
-        while True:
-            start = normalized.find(f" {word} ", start)
-            if start == -1:
-                break
-            count += 1
-            start += len(word) + 1
-        
-        # Add boundary cases (start/end of text)
-        if normalized.startswith(f"{word} "):
-            count += 1
-        if normalized.endswith(f" {word}"):
-            count += 1
-            
-        # Store count if any found
-        if count > 0:
-            filler_counts[word] = count
-            total_count += count
-    
-    # Calculate word count (rough approximation)
-    words = transcript.split()
-    word_count = len(words)
-    
-    # Calculate filler word percentage
-    filler_percentage = (total_count / max(1, word_count)) * 100
+    # Match filler words on the shared token stream of the transcript
+    filler_analysis = lexical_analyzer.analyze_text(transcript).filler_statistics()
+    filler_percentage = filler_analysis["percentage"]
     
     # Determine category
     category = "low"
@@ -511,9 +475,5 @@ def detect_filler_words(transcript):
     elif filler_percentage > 5:
         category = "moderate"
     
-    return {
-        "filler_words": filler_counts,
-        "total_count": total_count,
-        "percentage": filler_percentage,
-        "category": category
-    } 
+    filler_analysis["category"] = category
+    return filler_analysis
@@ -7,6 +7,8 @@ from azure.cognitiveservices.vision.computervision import ComputerVisionClient
 from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
 from msrest.authentication import CognitiveServicesCredentials
 
+from . import deadlines
+
 # Load environment variables
 load_dotenv()
 
@@ -26,6 +28,11 @@ def get_vision_client():
         print(f"Error initializing Computer Vision client: {str(e)}")
         return None
 
+def _call_options():
+    """Per-call options of the Computer Vision client that bound a call by the time left in the current request"""
+    timeout = deadlines.remaining()
+    return {} if timeout is None else {"timeout": timeout}
+
 def extract_text_from_image(image_data):
     """
     Extract text from an image using Azure Computer Vision's OCR.
@@ -39,10 +46,12 @@ def extract_text_from_image(image_data):
     client = get_vision_client()
     if not client:
         return "Error: Could not initialize Computer Vision client"
+    if not deadlines.check('ocr'):
+        return "Error: No time left for text recognition"
     
     try:
         # Call the API for text recognition (OCR)
-        read_response = client.read_in_stream(io.BytesIO(image_data), raw=True)
+        read_response = client.read_in_stream(io.BytesIO(image_data), raw=True, **_call_options())
 
         # Get the operation location (URL with an ID at the end)
         operation_location = read_response.headers["Operation-Location"]
@@ -56,9 +65,15 @@ def extract_text_from_image(image_data):
         retry_count = 0
         
         while retry_count < max_retry:
-            read_result = client.get_read_result(operation_id)
+            read_result = client.get_read_result(operation_id, **_call_options())
             if read_result.status not in [OperationStatusCodes.running, OperationStatusCodes.not_started]:
                 break
+            
+            # Stop polling when the request deadline passes before the next poll
+            remaining = deadlines.remaining()
+            if remaining is not None and remaining <= retry_delay:
+                deadlines.skip('ocr')
+                return "Error extracting text: Operation did not finish before the request deadline"
             time.sleep(retry_delay)
             retry_count += 1
         
@@ -72,6 +87,7 @@ def extract_text_from_image(image_data):
         else:
             return f"Error extracting text: Operation did not succeed, status: {read_result.status}"
     except Exception as e:
+        deadlines.check('ocr')
         return f"Error extracting text: {str(e)}"
 
 def extract_text_from_pdf(pdf_data):
@@ -0,0 +1,110 @@
+"""
+Canonical forms of technical terms, built once at import.
+
+Skill matching compares every job skill against every resume skill, so the
+per-pair checks have to be cheap. Normalization is memoized, technology name
+variants resolve to a canonical id through one hash table keyed by their
+squashed form, and the acronym of each term is computed once and memoized
+instead of being recomputed for every comparison.
+"""
+import re
+from functools import lru_cache
+
+from .skill_taxonomy import TECH_VARIANTS
+
+# Prefixes that don't affect the core meaning of a technology name
+TECH_PREFIXES = ['ms ', 'microsoft ', 'google ', 'apache ', 'aws ', 'azure ', 'ibm ']
+
+VERSION_PATTERN = re.compile(r'\s+\d+(\.\d+)*')
+SUFFIX_PATTERN = re.compile(r'\s+(framework|library|language|platform)$')
+SPECIAL_CHARACTER_PATTERN = re.compile(r'[^\w\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Terms up to this length are treated as possible acronyms
+MAX_ACRONYM_LENGTH = 5
+
+
+def squash(term):
+    """Remove hyphens, dots and spaces, so "react.js" and "reactjs" compare equal"""
+    return term.replace('-', '').replace('.', '').replace(' ', '')
+
+
+def acronym_of(term):
+    """Return the lowercase initials of the words in a term"""
+    return ''.join(word[0] for word in term.split() if word).lower()
+
+
+def _build_variant_ids(variants):
+    """Map the squashed form of every name and variant to its canonical id"""
+    variant_ids = {}
+    for base, names in variants.items():
+        for name in [base] + names:
+            variant_ids.setdefault(squash(name), base)
+    return variant_ids
+
+
+# Squashed technology name or variant -> canonical id, e.g. "reactjs" -> "react"
+VARIANT_IDS = _build_variant_ids(TECH_VARIANTS)
+
+
+@lru_cache(maxsize=8192)
+def normalize_tech_term(term):
+    """
+    Normalize a technical term by removing common prefixes/suffixes and standardizing format.
+    """
+    # Convert to lowercase for consistent comparison
+    normalized = term.lower()
+    
+    # Remove common prefixes that don't affect the core meaning
+    for prefix in TECH_PREFIXES:
+        if normalized.startswith(prefix):
+            normalized = normalized[len(prefix):]
+    
+    # Remove version numbers and common suffixes
+    normalized = VERSION_PATTERN.sub('', normalized)
+    normalized = SUFFIX_PATTERN.sub('', normalized)
+    
+    # Remove special characters and extra spaces
+    normalized = SPECIAL_CHARACTER_PATTERN.sub('', normalized)
+    normalized = WHITESPACE_PATTERN.sub(' ', normalized).strip()
+    
+    return normalized
+
+
+@lru_cache(maxsize=8192)
+def _cached_acronym(term):
+    return acronym_of(term)
+
+
+def canonical_id(term):
+    """Return the canonical technology id of a normalized term, or None if it has no known variants"""
+    return VARIANT_IDS.get(squash(term))
+
+
+def canonical_skill(term):
+    """Return the key a skill is indexed under: its canonical technology id, or its normalized form"""
+    normalized = normalize_tech_term(term)
+    return canonical_id(normalized) or normalized
+
+
+def is_acronym_match(term1, term2):
+    """
+    Check if one term is an acronym of the other.
+    """
+    # If both are short, they need to match exactly
+    if len(term1) <= MAX_ACRONYM_LENGTH and len(term2) <= MAX_ACRONYM_LENGTH:
+        return term1 == term2
+    
+    short, long = (term1, term2) if len(term1) <= MAX_ACRONYM_LENGTH else (term2, term1)
+    if len(short) > MAX_ACRONYM_LENGTH:
+        return False
+    
+    return short == _cached_acronym(long)
+
+
+def are_tech_variants(term1, term2):
+    """
+    Check for common technology name variations.
+    """
+    variant_id = canonical_id(term1)
+    return variant_id is not None and variant_id == canonical_id(term2)
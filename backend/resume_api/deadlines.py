@@ -0,0 +1,132 @@
+"""
+Time budgets for analysis requests.
+
+A Deadline is a point in time on the monotonic clock. Stages of an analysis
+check how much time remains before they start expensive work, and switch to
+a cheaper alternative when the remainder no longer fits it.
+
+Views set a deadline for the whole request (REQUEST_DEADLINE), and the
+analysis job workers one per job. It is held in a context variable, so the
+analyzer, the Azure and Groq clients and the chatbot read it without passing
+it through every call. Every external call is bounded by the remaining time.
+A stage that cannot finish in time uses its local alternative instead, such
+as PyPDF2 instead of OCR or a neutral sentiment, and is recorded as
+degraded. Responses list the degraded stages in their "degraded" field.
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+class Deadline:
+    """
+    A point in time by which work has to finish.
+    
+    Args:
+        seconds (float, optional): Time budget from now, or None for no limit
+    """
+    
+    def __init__(self, seconds=None):
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+    
+    def remaining(self):
+        """Seconds left before the deadline, or None if it has no limit"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def expired(self):
+        """Whether the deadline has passed"""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+
+_deadline = ContextVar('deadline', default=None)
+_degraded = ContextVar('degraded', default=None)
+
+
+@contextmanager
+def request_deadline(seconds):
+    """
+    Run a block of work within a deadline, collecting the stages it degrades.
+    
+    Nested within another deadline, the block ends no later than the outer
+    one and its degraded stages are added to the outer list.
+    
+    Args:
+        seconds (float): Time budget from now, or None for no limit
+    """
+    deadline_token = _deadline.set(within(seconds))
+    degraded_token = _degraded.set([]) if _degraded.get() is None else None
+    try:
+        yield
+    finally:
+        _deadline.reset(deadline_token)
+        if degraded_token is not None:
+            _degraded.reset(degraded_token)
+
+
+def current():
+    """Get the deadline of the current request, without a limit outside of one"""
+    return _deadline.get() or Deadline()
+
+
+def within(seconds):
+    """Get a deadline a number of seconds from now, but no later than the current request's"""
+    deadline = Deadline(seconds)
+    request_expires_at = current().expires_at
+    if request_expires_at is not None and (deadline.expires_at is None or request_expires_at < deadline.expires_at):
+        deadline.expires_at = request_expires_at
+    return deadline
+
+
+def remaining():
+    """Seconds left in the current request, or None if it has no deadline; used as the timeout of external calls"""
+    return current().remaining()
+
+
+def skip(stage):
+    """Record that a stage of the current request fell back to its local alternative"""
+    degraded_stages = _degraded.get()
+    if degraded_stages is not None and stage not in degraded_stages:
+        print(f"Request deadline: degraded {stage}")
+        degraded_stages.append(stage)
+
+
+def check(stage):
+    """
+    Check whether the current request has time left for a stage.
+    
+    Also called after a failed external call, where an expired deadline means
+    the call timed out.
+    
+    Args:
+        stage (str): Name of the stage, as listed in the degraded response field
+    
+    Returns:
+        bool: True if time is left; otherwise the stage is recorded as degraded
+    """
+    if current().expired():
+        skip(stage)
+        return False
+    return True
+
+
+def degraded():
+    """Get the stages of the current request that fell back to their local alternative"""
+    return list(_degraded.get() or [])
+
+
+def bounded(view):
+    """Run a view within the REQUEST_DEADLINE and add the degraded stages to its response"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with request_deadline(getattr(settings, 'REQUEST_DEADLINE', None)):
+            response = view(*args, **kwargs)
+            if isinstance(getattr(response, 'data', None), dict):
+                response.data['degraded'] = degraded()
+            return response
+    return wrapper
@@ -0,0 +1,325 @@
+"""
+Materialized per-document features.
+
+The key phrases, skills, word set, section and paragraph spans and embedding
+of a resume or job description do not depend on the document it is compared
+with, and documents rarely change. They are computed once and stored as a
+DocumentFeatures record next to the document, tagged with the content hash and
+analyzer version they were computed from. A record whose document was edited
+or whose analyzer version is outdated is stale and recomputed on next use.
+Key phrases and embeddings are recombined from per-paragraph results, so only
+the paragraphs changed by an edit are sent to Azure and BERT again.
+
+A job description linked to a canonical near-duplicate copy reuses the key
+phrases and embedding of that copy, the features that need Azure and BERT.
+Its skills and words are still extracted from its own text, since a small
+edit can add or drop a skill.
+
+Records are created lazily on first use, or on save when
+DOCUMENT_FEATURES_ON_SAVE is enabled. The featurize_documents management
+command backfills them and re-featurizes after analyzer upgrades. Texts that
+are not stored as documents, such as uploaded files, reuse the record of any
+document with the same content and are otherwise kept in the Django cache.
+
+Analyses below the full tier do not call Azure, so a document without
+current stored features gets local features instead: the same features
+without key phrases and embedding. They are neither stored nor cached, and
+the next full analysis of the document computes its complete features.
+"""
+import hashlib
+import re
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.db import transaction
+from django.dispatch import receiver
+
+from . import analysis_tiers
+from . import canonicalization
+from . import deadlines
+from . import document_segments
+from . import section_index
+from .models import Resume, JobDescription, DocumentFeatures
+from .resume_analyzer import ResumeAnalyzer, ANALYZER_VERSION
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+
+def content_hash(text):
+    """Return the SHA-256 hex digest of a document's text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def compute_features(text, analyzer=None):
+    """
+    Compute the features of a document.
+    
+    Args:
+        text (str): The text content of a resume or job description
+        analyzer (ResumeAnalyzer, optional): Analyzer used to extract the skills
+    
+    Returns:
+        dict: Key phrases, technical and soft skills, canonical skill ids, the
+            document's word set, its section and paragraph spans and its
+            embedding (None if BERT is not available)
+    """
+    return _compute_features(text, analyzer)[0]
+
+
+def _compute_features(text, analyzer=None):
+    """Compute the features of a document, and whether the key phrases of all its paragraphs were extracted"""
+    analyzer = analyzer or ResumeAnalyzer()
+    sections = section_index.build(text)
+    segments = document_segments.split_segments(text, sections)
+    
+    # Only paragraphs not seen before are sent to Azure and BERT
+    records = document_segments.segment_records(text, segments)
+    key_phrases, embedding = document_segments.combine(segments, records)
+    features = _assemble_features(text, analyzer, sections, segments, key_phrases, embedding)
+    return features, document_segments.is_complete(records)
+
+
+def local_features(text, analyzer):
+    """
+    Compute the features of a document without Azure or BERT, for analyses below the full tier.
+    
+    Args:
+        text (str): The text content of a resume or job description
+        analyzer (ResumeAnalyzer): Analyzer used to extract the skills
+    
+    Returns:
+        dict: The document features, see compute_features(), without key phrases and embedding
+    """
+    sections = section_index.build(text)
+    segments = document_segments.split_segments(text, sections)
+    return _assemble_features(text, analyzer, sections, segments, [], None)
+
+
+def _assemble_features(text, analyzer, sections, segments, key_phrases, embedding):
+    features = analyzer.featurize(text, key_phrases=key_phrases)
+    features["skill_ids"] = sorted(set(canonicalization.canonical_skill(skill)
+                                       for skill in features["technical_skills"]))
+    features["words"] = sorted(set(WORD_PATTERN.findall(text.lower())))
+    features["sections"] = sections.spans
+    features["segments"] = segments
+    features["embedding"] = embedding
+    return features
+
+
+def _record_to_features(record):
+    return {
+        "key_phrases": record.key_phrases,
+        "technical_skills": record.technical_skills,
+        "soft_skills": record.soft_skills,
+        "skill_ids": record.skill_ids,
+        "words": record.words,
+        "sections": record.sections,
+        "segments": record.segments,
+        "embedding": np.frombuffer(bytes(record.embedding), dtype=np.float32) if record.embedding else None
+    }
+
+
+def _is_current(record, text_hash):
+    return record.content_hash == text_hash and record.analyzer_version == ANALYZER_VERSION
+
+
+def _document_field(document):
+    if isinstance(document, Resume):
+        return 'resume'
+    if isinstance(document, JobDescription):
+        return 'job_description'
+    raise TypeError(f"Cannot featurize {type(document).__name__} instances")
+
+
+def materialize(document, analyzer=None, text_hash=None):
+    """
+    Compute the features of a document and store them.
+    
+    Args:
+        document (Resume | JobDescription): The document to featurize
+        analyzer (ResumeAnalyzer, optional): Analyzer used to extract the skills
+        text_hash (str, optional): Content hash of the document, if already known
+    
+    Returns:
+        dict: The document features, see compute_features()
+    """
+    features, complete = _compute_features(document.content, analyzer)
+    embedding = features["embedding"]
+    
+    # Calls that failed or were cut off by the request deadline leave the features incomplete,
+    # so they are computed again next time
+    if not complete or deadlines.current().expired():
+        return features
+    
+    DocumentFeatures.objects.update_or_create(
+        **{_document_field(document): document},
+        defaults={
+            "content_hash": text_hash or content_hash(document.content),
+            "analyzer_version": ANALYZER_VERSION,
+            "key_phrases": features["key_phrases"],
+            "technical_skills": features["technical_skills"],
+            "soft_skills": features["soft_skills"],
+            "skill_ids": features["skill_ids"],
+            "words": features["words"],
+            "sections": features["sections"],
+            "segments": features["segments"],
+            "embedding": embedding.tobytes() if embedding is not None else None
+        }
+    )
+    return features
+
+
+def _reuse_canonical_features(document, text_hash, analyzer):
+    """Featurize a job description with the key phrases and embedding of its canonical copy, if it has them"""
+    if not isinstance(document, JobDescription) or document.canonical_id is None:
+        return None
+    
+    record = (DocumentFeatures.objects.select_related('job_description')
+              .filter(job_description_id=document.canonical_id, analyzer_version=ANALYZER_VERSION).first())
+    if record is None or not _is_current(record, content_hash(record.job_description.content)):
+        return None
+    
+    # Skills, words and spans come from the document's own text, which differs slightly from the canonical copy
+    sections = section_index.build(document.content)
+    segments = document_segments.split_segments(document.content, sections)
+    canonical_features = _record_to_features(record)
+    features = _assemble_features(document.content, analyzer, sections, segments,
+                                  canonical_features["key_phrases"], canonical_features["embedding"])
+    
+    DocumentFeatures.objects.update_or_create(
+        job_description=document,
+        defaults={
+            "content_hash": text_hash,
+            "analyzer_version": ANALYZER_VERSION,
+            "key_phrases": features["key_phrases"],
+            "technical_skills": features["technical_skills"],
+            "soft_skills": features["soft_skills"],
+            "skill_ids": features["skill_ids"],
+            "words": features["words"],
+            "sections": features["sections"],
+            "segments": features["segments"],
+            "embedding": record.embedding
+        }
+    )
+    return features
+
+
+def features_for_documents(documents, analyzer=None):
+    """
+    Get the features of several documents of one kind, computing only missing and stale ones.
+    
+    Args:
+        documents (list): Resume or JobDescription instances
+        analyzer (ResumeAnalyzer, optional): Analyzer used to extract the skills
+    
+    Returns:
+        list: The features of every document, in order
+    """
+    if not documents:
+        return []
+    
+    field = _document_field(documents[0])
+    records = {
+        getattr(record, f"{field}_id"): record
+        for record in DocumentFeatures.objects.filter(**{f"{field}__in": documents})
+    }
+    
+    analyzer = analyzer or ResumeAnalyzer()
+    features = []
+    for document in documents:
+        record = records.get(document.pk)
+        text_hash = content_hash(document.content)
+        if record is not None and _is_current(record, text_hash):
+            features.append(_record_to_features(record))
+            continue
+        
+        canonical_features = _reuse_canonical_features(document, text_hash, analyzer)
+        if canonical_features is not None:
+            features.append(canonical_features)
+        elif analyzer.tier_run.allows(analysis_tiers.FULL, 'features'):
+            features.append(materialize(document, analyzer, text_hash))
+        else:
+            features.append(local_features(document.content, analyzer))
+    return features
+
+
+def stale_documents(documents):
+    """
+    Find the documents whose stored features are missing, or outdated by an edit or analyzer upgrade.
+    
+    Args:
+        documents (list): Resume or JobDescription instances of one kind
+    
+    Returns:
+        list: The documents that need to be featurized
+    """
+    if not documents:
+        return []
+    
+    field = _document_field(documents[0])
+    current = {
+        getattr(record, f"{field}_id"): (record.content_hash, record.analyzer_version)
+        for record in DocumentFeatures.objects.filter(**{f"{field}__in": documents}).only(
+            f"{field}_id", "content_hash", "analyzer_version")
+    }
+    return [document for document in documents
+            if current.get(document.pk) != (content_hash(document.content), ANALYZER_VERSION)]
+
+
+def features_for_document(document, analyzer=None):
+    """Get the features of a Resume or JobDescription, computing them if missing or stale"""
+    return features_for_documents([document], analyzer)[0]
+
+
+def get_features(text, analyzer=None):
+    """
+    Get the features of a text that is not necessarily stored as a document.
+    
+    The stored features of any document with the same content are reused;
+    otherwise the features are computed and kept in the Django cache, or
+    computed locally below the full tier.
+    
+    Args:
+        text (str): The text content of a resume or job description
+        analyzer (ResumeAnalyzer, optional): Analyzer used to extract the skills
+    
+    Returns:
+        dict: The document features, see compute_features()
+    """
+    text_hash = content_hash(text)
+    record = DocumentFeatures.objects.filter(content_hash=text_hash, analyzer_version=ANALYZER_VERSION).first()
+    if record is not None:
+        return _record_to_features(record)
+    
+    key = f"document-features:{ANALYZER_VERSION}:{text_hash}"
+    features = cache.get(key)
+    if features is not None:
+        return features
+    
+    analyzer = analyzer or ResumeAnalyzer()
+    if not analyzer.tier_run.allows(analysis_tiers.FULL, 'features'):
+        return local_features(text, analyzer)
+    
+    features, complete = _compute_features(text, analyzer)
+    if complete and not deadlines.current().expired():
+        cache.set(key, features, getattr(settings, 'DOCUMENT_FEATURES_CACHE_TIMEOUT', 86400))
+    return features
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_save, sender=JobDescription)
+def featurize_on_save(sender, instance, **kwargs):
+    """Featurize a saved document once its transaction commits, if enabled"""
+    if not getattr(settings, 'DOCUMENT_FEATURES_ON_SAVE', False):
+        return
+    
+    def featurize():
+        try:
+            features_for_document(instance)
+        except Exception as e:
+            # Features are recomputed lazily on first use, so the save must not fail
+            print(f"Error featurizing {sender.__name__} {instance.pk}: {str(e)}")
+    
+    transaction.on_commit(featurize)
@@ -0,0 +1,238 @@
+"""
+Paragraph-level features for incremental re-analysis.
+
+Users typically edit one bullet of a resume and analyze it again, and most
+of the document is unchanged. A document is therefore split into segments:
+the paragraphs of its sections, separated by section headers and blank
+lines. Every segment is fingerprinted by the SHA-256 of its
+whitespace-normalized text, and its key phrases, embedding and sentiment are
+stored once per fingerprint as a SegmentFeatures record, shared by every
+document that contains the same paragraph.
+
+A new version of a document only sends the segments whose fingerprints were
+never seen before to Azure and BERT. The document-level features are then
+recombined from the segment records:
+
+- Key phrases: the union of the segment key phrases, in document order.
+- Embedding: the mean of the segment embeddings, weighted by word count.
+- Sentiment: combined the way the Language service combines sentence
+  sentiments into a document sentiment.
+
+Skills, word sets and the match score are computed locally from the
+recombined features and the full text, which takes milliseconds.
+"""
+import hashlib
+import re
+
+import numpy as np
+
+from . import azure_language_client
+from .models import SegmentFeatures
+from .resume_analyzer import ANALYZER_VERSION
+
+PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+
+def fingerprint(text):
+    """Return the SHA-256 hex digest of a segment's whitespace-normalized text"""
+    return hashlib.sha256(WHITESPACE_PATTERN.sub(' ', text).strip().encode('utf-8')).hexdigest()
+
+
+def _paragraph_spans(text, start, end):
+    """Yield the (start, end) spans of the non-blank paragraphs in a region of text, without surrounding whitespace"""
+    breaks = [match.span() for match in PARAGRAPH_BREAK.finditer(text, start, end)]
+    boundaries = [(start, start)] + breaks + [(end, end)]
+    for (_, paragraph_start), (paragraph_end, _) in zip(boundaries, boundaries[1:]):
+        paragraph = text[paragraph_start:paragraph_end]
+        stripped = paragraph.lstrip()
+        if not stripped:
+            continue
+        paragraph_start += len(paragraph) - len(stripped)
+        yield paragraph_start, paragraph_start + len(stripped.rstrip())
+
+
+def split_segments(text, sections):
+    """
+    Split a document into paragraph segments.
+    
+    Args:
+        text (str): The text content of a resume or job description
+        sections (SectionIndex): The sections of the text
+    
+    Returns:
+        list: [fingerprint, section, start, end] of every non-blank paragraph, in
+            document order; text before the first section header has no section
+    """
+    # Header lines are left out, so renaming a header does not change any segment
+    regions = [[None, 0, sections.preamble_end]] + [[name, start, end] for name, _, start, end in sections.spans]
+    
+    return [
+        [fingerprint(text[start:end]), name, start, end]
+        for name, region_start, region_end in regions
+        for start, end in _paragraph_spans(text, region_start, region_end)
+    ]
+
+
+def _load_records(fingerprints):
+    return {
+        record.fingerprint: record
+        for record in SegmentFeatures.objects.filter(fingerprint__in=fingerprints, analyzer_version=ANALYZER_VERSION)
+    }
+
+
+def segment_records(text, segments):
+    """
+    Get the features of a document's segments, analyzing only segments that were not seen before.
+    
+    Args:
+        text (str): The text content of the document
+        segments (list): split_segments() output for the text
+    
+    Returns:
+        dict: Fingerprint mapped to the SegmentFeatures record of every segment;
+            records whose key phrases could not be extracted have None key phrases
+            and are not stored
+    """
+    texts = {segment[0]: text[segment[2]:segment[3]] for segment in segments}
+    records = _load_records(list(texts))
+    reused = len(records)
+    
+    new_records = [
+        SegmentFeatures(fingerprint=segment_fingerprint, analyzer_version=ANALYZER_VERSION,
+                        word_count=len(WORD_PATTERN.findall(segment_text)))
+        for segment_fingerprint, segment_text in texts.items() if segment_fingerprint not in records
+    ]
+    key_phrases = azure_language_client.extract_key_phrases_batch([texts[record.fingerprint] for record in new_records])
+    for record, phrases in zip(new_records, key_phrases):
+        record.key_phrases = phrases
+        records[record.fingerprint] = record
+    
+    # Segments whose key phrases were not extracted, because of the request deadline or a failed call,
+    # are analyzed again next time
+    new_records = [record for record, phrases in zip(new_records, key_phrases) if phrases is not None]
+    
+    # Segments stored while BERT was unavailable get their embedding once it is available
+    unembedded = [record for record in records.values() if record.embedding is None]
+    embeddings = azure_language_client.get_segment_embeddings([texts[record.fingerprint] for record in unembedded])
+    for record, embedding in zip(unembedded, embeddings):
+        if embedding is not None:
+            record.embedding = np.asarray(embedding, dtype=np.float32).tobytes()
+    
+    # A concurrent request may have stored the same segment, which then wins
+    SegmentFeatures.objects.bulk_create(new_records, ignore_conflicts=True)
+    embedded = [record for record in unembedded if record.pk is not None and record.embedding is not None]
+    if embedded:
+        SegmentFeatures.objects.bulk_update(embedded, ['embedding'])
+    
+    if new_records:
+        print(f"Segment features: analyzed {len(new_records)} new segments, reused {reused}")
+    return records
+
+
+def is_complete(records):
+    """Whether the key phrases of every segment were extracted"""
+    return all(record.key_phrases is not None for record in records.values())
+
+
+def combine(segments, records):
+    """
+    Recombine the key phrases and embedding of a document from its segments.
+    
+    Args:
+        segments (list): split_segments() output for the document
+        records (dict): segment_records() output for the document
+    
+    Returns:
+        tuple: The document key phrases, and its float32 embedding or None if
+            any segment has no embedding
+    """
+    key_phrases = list(dict.fromkeys(phrase for segment in segments
+                                     for phrase in records[segment[0]].key_phrases or []))
+    
+    segment_records_in_order = [records[segment[0]] for segment in segments]
+    if not segment_records_in_order or any(record.embedding is None for record in segment_records_in_order):
+        return key_phrases, None
+    
+    embeddings = np.stack([np.frombuffer(bytes(record.embedding), dtype=np.float32)
+                           for record in segment_records_in_order])
+    weights = np.array([max(record.word_count, 1) for record in segment_records_in_order], dtype=np.float32)
+    return key_phrases, (embeddings * weights[:, None]).sum(axis=0) / weights.sum()
+
+
+def combine_sentiments(labels):
+    """
+    Combine segment sentiments into a document sentiment.
+    
+    Like the Language service does for sentences: positive and negative parts
+    make the document mixed, otherwise any positive or negative part decides it.
+    """
+    labels = set(label for label in labels if label)
+    if 'mixed' in labels or {'positive', 'negative'} <= labels:
+        return 'mixed'
+    if 'positive' in labels:
+        return 'positive'
+    if 'negative' in labels:
+        return 'negative'
+    return 'neutral'
+
+
+def document_sentiment(text, segments):
+    """
+    Get the sentiment of a document from the sentiment of its segments.
+    
+    Segment sentiments are analyzed on first use and stored with the segment,
+    so an edited document only sends its changed paragraphs.
+    
+    Args:
+        text (str): The text content of the document
+        segments (list): split_segments() output for the text
+    
+    Returns:
+        dict: A dictionary containing the sentiment value
+    """
+    texts = {segment[0]: text[segment[2]:segment[3]] for segment in segments}
+    records = _load_records(list(texts))
+    sentiments = {segment_fingerprint: record.sentiment for segment_fingerprint, record in records.items()}
+    
+    unanalyzed = [segment_fingerprint for segment_fingerprint in texts if not sentiments.get(segment_fingerprint)]
+    labels = azure_language_client.analyze_sentiment_batch([texts[key] for key in unanalyzed])
+    
+    analyzed = []
+    for segment_fingerprint, label in zip(unanalyzed, labels):
+        # Failed segments are retried next time and count as neutral until then
+        if label:
+            sentiments[segment_fingerprint] = label
+            if segment_fingerprint in records:
+                records[segment_fingerprint].sentiment = label
+                analyzed.append(records[segment_fingerprint])
+    if analyzed:
+        SegmentFeatures.objects.bulk_update(analyzed, ['sentiment'])
+    
+    return {"sentiment": combine_sentiments(sentiments.get(segment[0]) for segment in segments)}
+
+
+def diff_segments(previous, current):
+    """
+    Compare the segments of two versions of a document.
+    
+    Args:
+        previous (list): split_segments() output for the previous version
+        current (list): split_segments() output for the current version
+    
+    Returns:
+        dict: The number of changed, reused and removed segments, and the
+            sections they belong to
+    """
+    previous_fingerprints = set(segment[0] for segment in previous)
+    current_fingerprints = set(segment[0] for segment in current)
+    changed = [segment for segment in current if segment[0] not in previous_fingerprints]
+    removed = [segment for segment in previous if segment[0] not in current_fingerprints]
+    
+    return {
+        "changedSegments": len(changed),
+        "reusedSegments": len(current) - len(changed),
+        "removedSegments": len(removed),
+        "changedSections": list(dict.fromkeys(segment[1] for segment in changed + removed))
+    }
@@ -4,6 +4,8 @@ import uuid
 import traceback
 from groq import Groq
 
+from . import deadlines
+
 # Configure Groq client with the API key
 api_key = settings.GROQ_API_KEY
 print(f"Groq API Key: {api_key[:5]}...{api_key[-4:]}")  # Print first 5 and last 4 chars for debugging
@@ -94,6 +96,10 @@ class InterviewChatbot:
     
     def get_response(self, user_message, session_messages=None):
         """Get a response from the Groq chatbot using Llama 3"""
+        # Without time left in the request, answer from the predefined responses right away
+        if not deadlines.check('chat'):
+            return self.get_fallback_response(user_message)
+        
         # Try Groq/Llama3 first as our primary method
         try:
             print(f"Attempting to call Groq API with message: {user_message}")
@@ -111,8 +117,10 @@ class InterviewChatbot:
             # Add the current user message
             messages.append({"role": "user", "content": user_message})
             
-            # Call Groq API using Llama 3
-            response = client.chat.completions.create(
+            # Call Groq API using Llama 3, within the time left in the request and without retries
+            timeout = deadlines.remaining()
+            api_client = client if timeout is None else client.with_options(timeout=timeout, max_retries=0)
+            response = api_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=0.7,
@@ -128,14 +136,18 @@ class InterviewChatbot:
             error_details = traceback.format_exc()
             print(f"Error calling Groq API: {str(e)}")
             print(f"Error details: {error_details}")
-            
-            # If Groq fails, try predefined answers
-            predefined = self.get_predefined_answer(user_message)
-            if predefined:
-                print(f"Falling back to predefined answer due to API error")
-                return predefined
-                
-            # If no predefined answer, use the smart default response
-            smart_default = self.get_smart_default_response(user_message)
-            print("Falling back to smart default response due to API error")
-            return smart_default 
\ No newline at end of file
+            deadlines.check('chat')
+            return self.get_fallback_response(user_message)
+    
+    def get_fallback_response(self, user_message):
+        """Answer without the Groq API, from the predefined answers or the smart default response"""
+        # If Groq fails, try predefined answers
+        predefined = self.get_predefined_answer(user_message)
+        if predefined:
+            print("Falling back to predefined answer")
+            return predefined
+            
+        # If no predefined answer, use the smart default response
+        smart_default = self.get_smart_default_response(user_message)
+        print("Falling back to smart default response")
+        return smart_default 
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+Dynamic micro-batching for model inference.
+
+Callers on any thread submit single items and get a Future back. A background
+worker collects items for up to max_wait_ms, or until max_batch_size items are
+waiting, runs them through the batch function in one call and hands every
+caller its own result. This trades a few milliseconds of latency for much
+better throughput than running batches of one.
+
+Callers that stop waiting cancel their futures; cancelled items still in the
+queue are dropped from the next batch. A batch function that returns fewer
+or more results than it was given fails every item of the batch, since the
+results can no longer be matched to their items.
+"""
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+
+class _Request:
+    """An item waiting to be batched, with its future and submission time"""
+    __slots__ = ('item', 'future', 'submitted_at')
+    
+    def __init__(self, item):
+        self.item = item
+        self.future = Future()
+        self.submitted_at = time.perf_counter()
+
+
+class MicroBatchScheduler:
+    """
+    Collect items submitted from many threads into batches for one batch function.
+    
+    Args:
+        batch_fn (callable): Takes a list of items and returns a list of results
+            in the same order
+        max_batch_size (int): Maximum number of items per batch
+        max_wait_ms (float): How long the first item of a batch waits for others
+        name (str): Name used for the worker thread and in statistics
+    """
+    
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_ms=5, name="scheduler"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+        
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._latencies = deque(maxlen=1000)
+        self._items_processed = 0
+    
+    def submit(self, item):
+        """
+        Submit one item for batched processing.
+        
+        Args:
+            item: Input accepted by the batch function
+        
+        Returns:
+            concurrent.futures.Future: Resolves to the result for this item
+        """
+        self._ensure_worker()
+        request = _Request(item)
+        self._queue.put(request)
+        return request.future
+    
+    def submit_many(self, items):
+        """Submit several items and return one Future per item, in order"""
+        return [self.submit(item) for item in items]
+    
+    def _ensure_worker(self):
+        """Start the worker thread on first use, and again in forked worker processes"""
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        
+        with self._start_lock:
+            if self._worker is None or self._worker_pid != os.getpid():
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name=f"{self.name}-worker", daemon=True)
+                self._worker.start()
+    
+    def _collect_batch(self):
+        """Block for the first request, then gather more until the batch is full or the wait expires"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _run(self):
+        """Worker loop: collect a batch, run it and scatter the results"""
+        while True:
+            # Items whose callers gave up while they were queued are not run
+            batch = [request for request in self._collect_batch() if request.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            
+            try:
+                results = self.batch_fn([request.item for request in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: batch function returned {len(results)} results "
+                                       f"for {len(batch)} items")
+                for request, result in zip(batch, results):
+                    request.future.set_result(result)
+            except Exception as e:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+            
+            finished_at = time.perf_counter()
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._items_processed += len(batch)
+                self._latencies.extend((finished_at - request.submitted_at) * 1000 for request in batch)
+    
+    def stats(self):
+        """
+        Report queue depth, batch sizes and per-item latency.
+        
+        Returns:
+            dict: Current queue depth, number of batches and items processed,
+                a histogram of batch sizes and latency percentiles in milliseconds
+                over the most recent items
+        """
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            batch_sizes = dict(sorted(self._batch_sizes.items()))
+            items_processed = self._items_processed
+        
+        def percentile(fraction):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+        
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": sum(batch_sizes.values()),
+            "items": items_processed,
+            "batch_size_histogram": batch_sizes,
+            "latency_ms": {
+                "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99)
+            }
+        }
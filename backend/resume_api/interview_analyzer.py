@@ -4,6 +4,7 @@ import time
 import json
 from . import azure_language_client
 from . import azure_speech_client
+from . import lexical_analyzer
 
 class InterviewAnalyzer:
     """Class for analyzing mock interviews using Azure AI services"""
@@ -88,7 +89,7 @@ class InterviewAnalyzer:
         
         # If job description provided, analyze relevance
         if job_description:
-            relevance_score = self._analyze_relevance(transcript, job_description)
+            relevance_score = self._analyze_relevance(transcript, job_description, key_phrases)
             content_analysis["relevance_score"] = relevance_score
         
         # Analyze clarity
@@ -97,39 +98,43 @@ class InterviewAnalyzer:
         
         return content_analysis
     
-    def _analyze_relevance(self, transcript, job_description):
+    def _analyze_relevance(self, transcript, job_description, interview_phrases=None):
         """
         Analyze how relevant the interview responses are to the job description
         
         Args:
             transcript (str): The transcribed interview text
             job_description (str): The job description
+            interview_phrases (list, optional): Key phrases already extracted from the transcript
             
         Returns:
             dict: Relevance analysis results
         """
-        # Extract key phrases from both texts
-        interview_phrases = azure_language_client.extract_key_phrases(transcript)
+        # Extract key phrases, reusing the transcript phrases from the content analysis
+        if interview_phrases is None:
+            interview_phrases = azure_language_client.extract_key_phrases(transcript)
         job_phrases = azure_language_client.extract_key_phrases(job_description)
         
         # Calculate semantic similarity
         similarity = azure_language_client.calculate_text_similarity(transcript, job_description)
         
+        # Best semantic match of every interview phrase against all job phrases,
+        # computed from one batched embedding of each phrase set
+        best_similarities = azure_language_client.calculate_max_similarities(interview_phrases, job_phrases)
+        
         # Find matching keywords
         matching_keywords = []
+        job_phrases_lower = [job_phrase.lower() for job_phrase in job_phrases]
         
-        for phrase in interview_phrases:
-            for job_phrase in job_phrases:
-                # Check for exact or partial matches
-                if phrase.lower() in job_phrase.lower() or job_phrase.lower() in phrase.lower():
-                    matching_keywords.append(phrase)
-                    break
-                
-                # Check for semantic similarity between phrases
-                phrase_similarity = azure_language_client.calculate_text_similarity(phrase, job_phrase)
-                if phrase_similarity > 0.8:  # High similarity threshold
-                    matching_keywords.append(phrase)
-                    break
+        for phrase, best_similarity in zip(interview_phrases, best_similarities):
+            phrase_lower = phrase.lower()
+            
+            # Check for exact or partial matches
+            if any(phrase_lower in job_phrase or job_phrase in phrase_lower for job_phrase in job_phrases_lower):
+                matching_keywords.append(phrase)
+            # Check for semantic similarity with the closest job phrase
+            elif best_similarity > 0.8:  # High similarity threshold
+                matching_keywords.append(phrase)
         
         # Calculate match percentage
         match_percentage = (len(matching_keywords) / max(1, len(job_phrases))) * 100
@@ -158,22 +163,20 @@ class InterviewAnalyzer:
         Returns:
             dict: Clarity analysis results
         """
-        # Split into sentences
-        sentences = re.split(r'[.!?]+', transcript)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        # Read sentence lengths from the shared token stream of the transcript
+        sentence_stats = lexical_analyzer.analyze_text(transcript).sentence_length_statistics()
         
-        if not sentences:
+        if not sentence_stats["sentence_count"]:
             return {"category": "poor", "score": 0.0}
         
-        # Calculate average sentence length
-        avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences)
+        avg_sentence_length = sentence_stats["avg_sentence_length"]
         
         # Count very short (<3 words) and very long (>25 words) sentences
-        short_sentences = sum(1 for s in sentences if len(s.split()) < 3)
-        long_sentences = sum(1 for s in sentences if len(s.split()) > 25)
+        short_sentences = sentence_stats["short_sentences_count"]
+        long_sentences = sentence_stats["long_sentences_count"]
         
         # Calculate percentage of problematic sentences
-        problem_percentage = ((short_sentences + long_sentences) / len(sentences)) * 100
+        problem_percentage = ((short_sentences + long_sentences) / sentence_stats["sentence_count"]) * 100
         
         # Calculate clarity score (0-1 scale)
         length_score = 0.0
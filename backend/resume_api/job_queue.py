@@ -0,0 +1,324 @@
+"""
+Durable, database-backed queue for resume analyses.
+
+The analyze endpoint can enqueue an AnalysisJob instead of running OCR, the
+Azure calls and BERT inference inside the HTTP request. Background workers
+started by the run_analysis_workers management command claim jobs in priority
+order and store the result on the job, where clients poll for it.
+
+Claims are optimistic: a worker picks a candidate and takes it with a
+conditional UPDATE that only succeeds if nobody else changed the job in the
+meantime, so several worker processes can share the queue without row locks.
+A claimed job is leased for a visibility timeout, and a heartbeat thread
+extends the lease while the worker is still processing it. If its worker
+dies, the heartbeat stops, the lease expires and another worker picks the job
+up again. Failed attempts are retried with exponential backoff until
+max_attempts is reached.
+"""
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AnalysisJob
+from . import analysis_store
+from . import analysis_tiers
+from . import deadlines
+
+
+def _upload_dir():
+    return os.path.join(settings.MEDIA_ROOT, 'analysis_jobs')
+
+
+def _save_upload(uploaded_file):
+    """Save an uploaded file for the worker and return its path"""
+    os.makedirs(_upload_dir(), exist_ok=True)
+    path = os.path.join(_upload_dir(), f"{uuid.uuid4().hex}_{os.path.basename(uploaded_file.name)}")
+    with open(path, 'wb') as f:
+        for chunk in uploaded_file.chunks():
+            f.write(chunk)
+    return path
+
+
+def _remove_uploads(job):
+    for path in (job.resume_file_path, job.job_desc_file_path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def enqueue_analysis(user, resume_file, job_desc_file, priority=0, force=False, tier=None):
+    """
+    Store the uploaded files and queue an analysis job.
+    
+    Args:
+        user (User): The user requesting the analysis
+        resume_file (UploadedFile): The resume file
+        job_desc_file (UploadedFile): The job description file
+        priority (int): Higher priorities are processed first
+        force (bool): Recompute even if a stored analysis of the same files exists
+        tier (str, optional): Analysis tier, full by default
+    
+    Returns:
+        AnalysisJob: The queued job
+    """
+    return AnalysisJob.objects.create(
+        user=user,
+        priority=priority,
+        resume_file_name=resume_file.name,
+        resume_file_path=_save_upload(resume_file),
+        job_desc_file_name=job_desc_file.name,
+        job_desc_file_path=_save_upload(job_desc_file),
+        force=force,
+        tier=tier or analysis_tiers.FULL,
+        max_attempts=getattr(settings, 'ANALYSIS_JOB_MAX_ATTEMPTS', 3),
+        available_at=timezone.now()
+    )
+
+
+def claim_job(worker_id):
+    """
+    Claim the next available job for a worker.
+    
+    Queued jobs whose backoff has passed are eligible, as well as running
+    jobs whose lease expired because their worker stopped responding.
+    
+    Args:
+        worker_id (str): Identifier of the claiming worker
+    
+    Returns:
+        AnalysisJob: The claimed job, or None if no job is available
+    """
+    now = timezone.now()
+    visibility_timeout = getattr(settings, 'ANALYSIS_JOB_VISIBILITY_TIMEOUT', 300)
+    
+    candidates = AnalysisJob.objects.filter(
+        Q(status=AnalysisJob.STATUS_QUEUED, available_at__lte=now) |
+        Q(status=AnalysisJob.STATUS_RUNNING, locked_until__lt=now)
+    ).order_by('-priority', 'available_at')[:10]
+    
+    for candidate in candidates:
+        if candidate.status == AnalysisJob.STATUS_RUNNING and candidate.attempts >= candidate.max_attempts:
+            # The last attempt never reported back; give up on the job
+            AnalysisJob.objects.filter(
+                id=candidate.id, status=AnalysisJob.STATUS_RUNNING, locked_until=candidate.locked_until
+            ).update(
+                status=AnalysisJob.STATUS_FAILED,
+                error=f"Worker lease expired after {candidate.attempts} attempts",
+                locked_by='',
+                locked_until=None,
+                finished_at=now
+            )
+            _remove_uploads(candidate)
+            continue
+        
+        # Only succeeds if no other worker claimed or changed the job since we read it
+        claimed = AnalysisJob.objects.filter(
+            id=candidate.id,
+            status=candidate.status,
+            attempts=candidate.attempts,
+            locked_until=candidate.locked_until
+        ).update(
+            status=AnalysisJob.STATUS_RUNNING,
+            attempts=candidate.attempts + 1,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            started_at=now
+        )
+        if claimed:
+            return AnalysisJob.objects.get(id=candidate.id)
+    
+    return None
+
+
+def complete_job(job, worker_id, result):
+    """Store the result of a job, unless the worker's lease was taken over"""
+    updated = AnalysisJob.objects.filter(
+        id=job.id, status=AnalysisJob.STATUS_RUNNING, locked_by=worker_id
+    ).update(
+        status=AnalysisJob.STATUS_SUCCEEDED,
+        result=result,
+        error='',
+        locked_by='',
+        locked_until=None,
+        finished_at=timezone.now()
+    )
+    if updated:
+        _remove_uploads(job)
+    return bool(updated)
+
+
+def fail_job(job, worker_id, error):
+    """
+    Record a failed attempt, retrying with exponential backoff while attempts remain.
+    
+    Returns:
+        bool: True if the job will be retried, False if it failed permanently or
+            the worker's lease was taken over
+    """
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        base_delay = getattr(settings, 'ANALYSIS_JOB_RETRY_BACKOFF', 10)
+        max_delay = getattr(settings, 'ANALYSIS_JOB_RETRY_BACKOFF_MAX', 600)
+        delay = min(max_delay, base_delay * 2 ** (job.attempts - 1))
+        updated = AnalysisJob.objects.filter(
+            id=job.id, status=AnalysisJob.STATUS_RUNNING, locked_by=worker_id
+        ).update(
+            status=AnalysisJob.STATUS_QUEUED,
+            error=error,
+            locked_by='',
+            locked_until=None,
+            available_at=now + timedelta(seconds=delay)
+        )
+        return bool(updated)
+    
+    updated = AnalysisJob.objects.filter(
+        id=job.id, status=AnalysisJob.STATUS_RUNNING, locked_by=worker_id
+    ).update(
+        status=AnalysisJob.STATUS_FAILED,
+        error=error,
+        locked_by='',
+        locked_until=None,
+        finished_at=now
+    )
+    if updated:
+        _remove_uploads(job)
+    return False
+
+
+def extend_lease(job, worker_id):
+    """
+    Extend the lease of a running job by the visibility timeout.
+    
+    Returns:
+        bool: False if the worker no longer holds the lease
+    """
+    visibility_timeout = getattr(settings, 'ANALYSIS_JOB_VISIBILITY_TIMEOUT', 300)
+    updated = AnalysisJob.objects.filter(
+        id=job.id, status=AnalysisJob.STATUS_RUNNING, locked_by=worker_id
+    ).update(locked_until=timezone.now() + timedelta(seconds=visibility_timeout))
+    return bool(updated)
+
+
+def _renew_lease(job, worker_id, stop_event, interval):
+    """Extend a job's lease every interval seconds until the stop event is set or the lease is lost"""
+    try:
+        while not stop_event.wait(interval):
+            if not extend_lease(job, worker_id):
+                print(f"[{worker_id}] Lost the lease on job {job.id}; stopping its heartbeat")
+                return
+    except Exception as e:
+        print(f"[{worker_id}] Error extending the lease on job {job.id}: {str(e)}")
+    finally:
+        connection.close()
+
+
+@contextmanager
+def lease_heartbeat(job, worker_id):
+    """Keep extending a job's lease in a background thread while the block runs"""
+    interval = getattr(settings, 'ANALYSIS_JOB_HEARTBEAT_INTERVAL', 30)
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=_renew_lease,
+        args=(job, worker_id, stop_event, interval),
+        name=f"analysis-lease-{job.id}",
+        daemon=True
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop_event.set()
+        thread.join()
+
+
+def process_job(job):
+    """
+    Run the resume analysis of a job and store it with the user's analyses.
+    
+    Returns:
+        dict: The analysis result
+    """
+    with open(job.resume_file_path, 'rb') as f:
+        resume_content = f.read()
+    with open(job.job_desc_file_path, 'rb') as f:
+        job_desc_content = f.read()
+    
+    # The tier's deadline starts now, so time spent waiting in the queue does not degrade the analysis;
+    # external calls end within one visibility timeout even though the heartbeat keeps extending the lease
+    with deadlines.request_deadline(getattr(settings, 'ANALYSIS_JOB_VISIBILITY_TIMEOUT', 300)):
+        result, analysis, cached = analysis_store.analyze_and_store(
+            job.user, resume_content, job.resume_file_name, job_desc_content, job.job_desc_file_name, force=job.force,
+            tier=job.tier
+        )
+    return result
+
+
+def run_worker(worker_id, stop_event, poll_interval=1.0, once=False):
+    """
+    Claim and process jobs until the stop event is set.
+    
+    Args:
+        worker_id (str): Identifier of this worker, stored on claimed jobs
+        stop_event (threading.Event): Set to stop the worker after its current job
+        poll_interval (float): Seconds to wait when the queue is empty
+        once (bool): Stop as soon as the queue is empty
+    """
+    while not stop_event.is_set():
+        close_old_connections()
+        job = claim_job(worker_id)
+        
+        if job is None:
+            if once:
+                return
+            stop_event.wait(poll_interval)
+            continue
+        
+        print(f"[{worker_id}] Processing analysis job {job.id} (attempt {job.attempts}/{job.max_attempts})")
+        start = time.perf_counter()
+        try:
+            with lease_heartbeat(job, worker_id):
+                result = process_job(job)
+            if complete_job(job, worker_id, result):
+                print(f"[{worker_id}] Finished job {job.id} in {time.perf_counter() - start:.1f} s")
+            else:
+                print(f"[{worker_id}] Lease on job {job.id} expired before it finished; result discarded")
+        except Exception as e:
+            print(f"[{worker_id}] Error processing job {job.id}: {str(e)}")
+            print(traceback.format_exc())
+            retried = fail_job(job, worker_id, str(e))
+            print(f"[{worker_id}] Job {job.id} {'will be retried' if retried else 'failed permanently'}")
+
+
+def start_workers(count, poll_interval=1.0, once=False):
+    """
+    Start a pool of worker threads in this process.
+    
+    Threads share the process-wide model registry, so the models are loaded once.
+    
+    Returns:
+        tuple: The worker threads and the event that stops them
+    """
+    stop_event = threading.Event()
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    threads = []
+    for index in range(count):
+        thread = threading.Thread(
+            target=run_worker,
+            args=(f"{prefix}-{index}", stop_event, poll_interval, once),
+            name=f"analysis-worker-{index}",
+            daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+    return threads, stop_event
@@ -0,0 +1,125 @@
+"""
+Rank many job descriptions against one resume.
+
+The resume is featurized once and every job's features come from the
+materialized feature store, so only new or edited jobs are sent to Azure and
+BERT. All jobs are then scored
+together:
+
+- Skill overlap: the skills of all jobs are collected into one vocabulary and
+  compared with the resume skills in a single similarity matrix. A job's
+  coverage is then a product of its skill indicator rows with the vector of
+  covered vocabulary skills, which gives the same counts as analyzing each
+  pair on its own.
+- Text similarity: one sparse product of the TF-IDF vectors of the jobs with
+  the resume's, the same score the analyzer uses. Raw BERT embeddings are not
+  used here, since any two documents score a cosine similarity close to 1.
+
+The weights follow ResumeAnalyzer._calculate_match_score. Only the top K jobs
+get a full analysis with suggestions.
+"""
+import numpy as np
+
+from . import document_features
+from . import document_segments
+from . import tfidf_index
+from .resume_analyzer import ResumeAnalyzer
+
+TECH_WEIGHT = 0.5
+SOFT_WEIGHT = 0.2
+TEXT_WEIGHT = 0.3
+
+
+def _skill_coverage(analyzer, resume_skills, job_skill_lists):
+    """
+    Calculate the percentage of each job's skills that the resume covers.
+    
+    Returns:
+        numpy.ndarray: Coverage from 0-100 per job, or -1 for jobs that list no skills
+    """
+    vocabulary = {}
+    for skills in job_skill_lists:
+        for skill in skills:
+            vocabulary.setdefault(skill, len(vocabulary))
+    
+    job_skills = np.zeros((len(job_skill_lists), len(vocabulary)))
+    for row, skills in enumerate(job_skill_lists):
+        job_skills[row, [vocabulary[skill] for skill in skills]] = 1
+    
+    # One comparison of every distinct job skill with the resume skills
+    covered = analyzer._find_similar_terms(list(vocabulary), resume_skills).any(axis=1)
+    
+    skill_counts = job_skills.sum(axis=1)
+    matched_counts = job_skills @ covered.astype(float)
+    coverage = np.floor(100 * matched_counts / np.maximum(skill_counts, 1))
+    return np.where(skill_counts > 0, np.minimum(coverage, 100), -1)
+
+
+def _text_similarity(resume_text, jobs):
+    """Calculate the TF-IDF text similarity from 0-100 of the resume with each job"""
+    return tfidf_index.similarity_matrix([job.content for job in jobs], [resume_text])[:, 0] * 100
+
+
+def rank_jobs(resume_text, jobs, top_k=5, resume_features=None):
+    """
+    Rank job descriptions by how well a resume matches them.
+    
+    Args:
+        resume_text (str): The text content of the resume
+        jobs (list): JobDescription instances to rank
+        top_k (int): Number of top jobs to return a full analysis for
+        resume_features (dict, optional): Features of the resume, if it is a stored document
+    
+    Returns:
+        list: One dict per job with its score breakdown, best match first
+    """
+    if not jobs:
+        return []
+    
+    analyzer = ResumeAnalyzer()
+    if resume_features is None:
+        resume_features = document_features.get_features(resume_text, analyzer)
+    job_features_list = document_features.features_for_documents(jobs, analyzer)
+    
+    tech_coverage = _skill_coverage(analyzer, resume_features["technical_skills"],
+                                    [features["technical_skills"] for features in job_features_list])
+    soft_coverage = _skill_coverage(analyzer, resume_features["soft_skills"],
+                                    [features["soft_skills"] for features in job_features_list])
+    text_similarity = _text_similarity(resume_text, jobs)
+    
+    # Jobs without skills of a kind get the full weight for it, like in the analyzer
+    scores = (np.where(tech_coverage >= 0, tech_coverage * TECH_WEIGHT, 100 * TECH_WEIGHT) +
+              np.where(soft_coverage >= 0, soft_coverage * SOFT_WEIGHT, 100 * SOFT_WEIGHT) +
+              np.floor(text_similarity) * TEXT_WEIGHT)
+    scores = np.clip(scores.astype(int), 0, 100)
+    
+    # Stable sort keeps the requested order between equal scores
+    order = np.argsort(-scores, kind='stable')
+    
+    if top_k > 0:
+        # The resume sentiment is the same for every job, so combine it from its paragraphs once
+        resume_features = dict(resume_features, sentiment=document_segments.document_sentiment(
+            resume_text, resume_features["segments"]))
+    
+    ranking = []
+    for rank, index in enumerate(order):
+        job = jobs[index]
+        entry = {
+            "jobId": job.id,
+            "title": job.title,
+            "company": job.company,
+            "matchScore": int(scores[index]),
+            "scoreBreakdown": {
+                "technicalSkills": int(tech_coverage[index]) if tech_coverage[index] >= 0 else None,
+                "softSkills": int(soft_coverage[index]) if soft_coverage[index] >= 0 else None,
+                "textSimilarity": int(text_similarity[index])
+            }
+        }
+        if rank < top_k:
+            entry["analysis"] = analyzer.analyze_resume_and_job_description(
+                resume_text, job.content,
+                resume_features=resume_features, job_features=job_features_list[index]
+            )
+        ranking.append(entry)
+    
+    return ranking
@@ -0,0 +1,153 @@
+"""
+Keyword-in-context snippets of a job description.
+
+Content suggestions quote the sentence of the job description that mentions a
+missing skill. Instead of lowercasing and searching the whole text once per
+keyword, the text is tokenized once with the shared lexical analyzer. Every
+lowercase word is then mapped to the positions where it occurs, and every
+token to the sentence that contains it. Finding a keyword means looking up
+the postings of its first word and checking the following tokens, and its
+snippet is the precomputed sentence of the match. Looking up every skill of
+the job therefore costs about the same as looking up one.
+
+Matching is case-insensitive and ignores punctuation between words, so
+"Problem-Solving" finds "problem solving". Keywords containing symbols, such
+as "C++" or "Node.js", must also appear with those symbols, and keywords
+without them do not match the start of such a name: "C" does not find "C++"
+or "C#", and "Node" does not find "Node.js".
+"""
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+from . import lexical_analyzer
+
+# Sentences longer than this are narrowed to the keyword's line or a window of words around it
+MAX_SNIPPET_LENGTH = 240
+WINDOW_WORDS = 15
+
+KEYWORD_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+(?:['’][A-Za-z]+)*")
+WORD_CHARACTERS_PATTERN = re.compile(r"^[\w\s'’-]*$")
+
+# Symbols that continue a technology name after its last word, as in "C++", "C#" or "Node.js"
+NAME_SUFFIX_PATTERN = re.compile(r"[+#]|\.\w")
+
+
+class KeywordIndex:
+    """
+    Token positions and sentences of a text, for keyword-in-context lookups.
+    
+    Args:
+        text (str): The text to index
+    """
+    
+    def __init__(self, text):
+        self.text = text
+        self.analysis = lexical_analyzer.analyze_text(text)
+        tokens = self.analysis.tokens
+        
+        self.token_starts = [token.start for token in tokens]
+        self.postings = {}
+        for position, token in enumerate(tokens):
+            self.postings.setdefault(token.lower, []).append(position)
+        
+        self.token_sentences = [0] * len(tokens)
+        for index, sentence in enumerate(self.analysis.sentences):
+            self.token_sentences[sentence.first_token:sentence.last_token] = \
+                [index] * (sentence.last_token - sentence.first_token)
+    
+    def find(self, keyword):
+        """
+        Find the first occurrence of a keyword.
+        
+        Args:
+            keyword (str): A word or phrase
+        
+        Returns:
+            tuple: The positions of its first and last token, or None if the text does not contain it
+        """
+        words = [word.lower() for word in KEYWORD_TOKEN_PATTERN.findall(keyword)]
+        if not words:
+            return None
+        
+        tokens = self.analysis.tokens
+        # Symbols such as "++" or "." are not tokens, so those keywords must also match literally
+        literal = None if WORD_CHARACTERS_PATTERN.match(keyword) else keyword.lower()
+        
+        for first in self.postings.get(words[0], []):
+            last = first + len(words) - 1
+            if last >= len(tokens) or any(tokens[first + offset].lower != word
+                                          for offset, word in enumerate(words[1:], start=1)):
+                continue
+            start = tokens[first].start
+            if literal is not None:
+                if self.text[start:start + len(literal)].lower() != literal:
+                    continue
+            elif NAME_SUFFIX_PATTERN.match(self.text, tokens[last].end):
+                continue
+            return first, last
+        return None
+    
+    def snippet(self, keyword):
+        """
+        Get the sentence of the text in which a keyword first occurs.
+        
+        Args:
+            keyword (str): A word or phrase
+        
+        Returns:
+            str: The sentence, narrowed to the keyword's line or the words around
+                it if it is long, or None if the text does not contain the keyword
+        """
+        match = self.find(keyword)
+        if match is None:
+            return None
+        return self._sentence_snippet(*match)
+    
+    def snippets(self, keywords):
+        """Get the snippet of every keyword the text contains, keyed by keyword"""
+        snippets = {}
+        for keyword in keywords:
+            snippet = self.snippet(keyword)
+            if snippet is not None:
+                snippets[keyword] = snippet
+        return snippets
+    
+    def _sentence_snippet(self, first, last):
+        tokens = self.analysis.tokens
+        sentence = self.analysis.sentences[self.token_sentences[first]]
+        text = ' '.join(self.text[sentence.start:sentence.end].split())
+        if len(text) <= MAX_SNIPPET_LENGTH:
+            return text
+        
+        # Bullet lists without punctuation read as one long sentence, so try the keyword's line
+        line_start = max(sentence.start, self.text.rfind('\n', 0, tokens[first].start) + 1)
+        line_end = self.text.find('\n', tokens[last].end)
+        line_end = sentence.end if line_end == -1 else min(line_end, sentence.end)
+        text = ' '.join(self.text[line_start:line_end].split())
+        if len(text) <= MAX_SNIPPET_LENGTH:
+            return text
+        
+        # Whole words around the keyword, without leaving its line
+        line_first = bisect_left(self.token_starts, line_start)
+        line_last = bisect_left(self.token_starts, line_end) - 1
+        window_first = max(line_first, first - WINDOW_WORDS)
+        window_last = min(line_last, last + WINDOW_WORDS)
+        text = ' '.join(self.text[tokens[window_first].start:tokens[window_last].end].split())
+        prefix = '...' if window_first > line_first else ''
+        suffix = '...' if window_last < line_last else ''
+        return f"{prefix}{text}{suffix}"
+
+
+@lru_cache(maxsize=32)
+def build(text):
+    """
+    Index a text once for keyword-in-context lookups.
+    
+    Args:
+        text (str): The text to index, usually a job description
+    
+    Returns:
+        KeywordIndex: The shared index of the text
+    """
+    return KeywordIndex(text or "")
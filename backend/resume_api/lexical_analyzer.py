@@ -0,0 +1,265 @@
+"""
+Lexical analysis shared by the filler word, clarity and passive voice checks.
+
+A text is tokenized once into a stream of word tokens and sentence spans.
+Filler words are matched on that stream with a token trie, and passive voice
+constructions are found with precompiled patterns in a single scan.
+"""
+import re
+from bisect import bisect_right
+from functools import lru_cache
+
+# Words and sentence-ending punctuation runs; everything else separates tokens
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+(?:['’][A-Za-z]+)*|[.!?]+")
+
+# Common filler words and phrases to detect in spoken transcripts
+FILLER_WORDS = [
+    "um", "uh", "ah", "er", "like", "you know", "so", "actually",
+    "basically", "literally", "kind of", "sort of", "i mean"
+]
+
+# Common passive voice indicators, checked in order for the example phrase
+PASSIVE_PATTERNS = [
+    re.compile(r'\b(?:am|is|are|was|were|be|being|been)\s+\w+ed\b', re.IGNORECASE),
+    re.compile(r'\b(?:has|have|had)\s+been\s+\w+ed\b', re.IGNORECASE),
+    re.compile(r'\b(?:will|shall|should|would|could|might|must)\s+be\s+\w+ed\b', re.IGNORECASE),
+]
+
+# Every passive construction above contains a form of "be" followed by a
+# past participle, so a single scan with the first pattern finds them all
+PASSIVE_SCAN_PATTERN = PASSIVE_PATTERNS[0]
+
+
+def _build_filler_trie(phrases):
+    """Build a token trie where each node maps the next word to a child node"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for word in phrase.split():
+            node = node.setdefault(word, {})
+        node[None] = phrase
+    return trie
+
+
+FILLER_TRIE = _build_filler_trie(FILLER_WORDS)
+
+
+class Token:
+    """A word token with its character offsets in the original text"""
+    __slots__ = ('text', 'lower', 'start', 'end')
+    
+    def __init__(self, text, start, end):
+        self.text = text
+        self.lower = text.lower()
+        self.start = start
+        self.end = end
+
+
+class Sentence:
+    """A sentence span and the range of word tokens it contains"""
+    __slots__ = ('start', 'end', 'first_token', 'last_token', 'passive_matches')
+    
+    def __init__(self, start, end, first_token, last_token):
+        self.start = start
+        self.end = end
+        self.first_token = first_token
+        self.last_token = last_token
+        self.passive_matches = []
+    
+    @property
+    def word_count(self):
+        return self.last_token - self.first_token
+
+
+class LexicalAnalysis:
+    """
+    Token and sentence stream for a text, with filler and passive voice hits.
+    
+    Build it through analyze_text() so that several analyses of the same text
+    share one tokenizer pass.
+    """
+    
+    def __init__(self, text):
+        self.text = text
+        self.tokens = []
+        self.sentences = []
+        self._tokenize()
+        self.filler_matches = self._match_fillers()
+        self._match_passive_voice()
+    
+    def _tokenize(self):
+        """Split the text into word tokens and sentence spans in one pass"""
+        sentence_start = None
+        first_token = 0
+        
+        for match in TOKEN_PATTERN.finditer(self.text):
+            value = match.group(0)
+            
+            if value[0] in '.!?':
+                # A punctuation run closes the current sentence, unless it sits
+                # inside a word such as a decimal number or a file extension
+                next_char = self.text[match.end():match.end() + 1]
+                if sentence_start is not None and (not next_char or next_char.isspace()):
+                    self.sentences.append(Sentence(sentence_start, match.end(), first_token, len(self.tokens)))
+                    sentence_start = None
+                continue
+            
+            if sentence_start is None:
+                sentence_start = match.start()
+                first_token = len(self.tokens)
+            self.tokens.append(Token(value, match.start(), match.end()))
+        
+        if sentence_start is not None:
+            self.sentences.append(Sentence(sentence_start, len(self.text), first_token, len(self.tokens)))
+    
+    def _match_fillers(self):
+        """Find non-overlapping filler words, preferring the longest phrase at each position"""
+        matches = []
+        tokens = self.tokens
+        position = 0
+        
+        while position < len(tokens):
+            node = FILLER_TRIE
+            longest = None
+            cursor = position
+            
+            while cursor < len(tokens) and tokens[cursor].lower in node:
+                node = node[tokens[cursor].lower]
+                cursor += 1
+                if None in node:
+                    longest = (node[None], cursor)
+            
+            if longest:
+                phrase, end_index = longest
+                matches.append((phrase, tokens[position].start, tokens[end_index - 1].end))
+                position = end_index
+            else:
+                position += 1
+        
+        return matches
+    
+    def _match_passive_voice(self):
+        """Assign passive voice matches to the sentences they start in"""
+        sentence_starts = [sentence.start for sentence in self.sentences]
+        
+        for match in PASSIVE_SCAN_PATTERN.finditer(self.text):
+            index = bisect_right(sentence_starts, match.start()) - 1
+            if index < 0:
+                continue
+            sentence = self.sentences[index]
+            if match.end() <= sentence.end:
+                sentence.passive_matches.append(match)
+    
+    @property
+    def word_count(self):
+        return len(self.tokens)
+    
+    def sentence_text(self, sentence):
+        """Return the text of a sentence span"""
+        return self.text[sentence.start:sentence.end]
+    
+    def filler_statistics(self):
+        """
+        Summarize filler word usage.
+        
+        Returns:
+            dict: Counts per filler word, character offsets, total count and percentage
+        """
+        filler_counts = {}
+        offsets = []
+        for phrase, start, end in self.filler_matches:
+            filler_counts[phrase] = filler_counts.get(phrase, 0) + 1
+            offsets.append({"word": phrase, "start": start, "end": end})
+        
+        total_count = len(self.filler_matches)
+        return {
+            "filler_words": filler_counts,
+            "offsets": offsets,
+            "total_count": total_count,
+            "percentage": (total_count / max(1, self.word_count)) * 100
+        }
+    
+    def sentence_length_statistics(self, short_limit=3, long_limit=25):
+        """
+        Summarize sentence lengths in words.
+        
+        Args:
+            short_limit (int): Sentences with fewer words are counted as short
+            long_limit (int): Sentences with more words are counted as long
+        
+        Returns:
+            dict: Sentence count, average length and counts of short and long sentences
+        """
+        sentence_count = 0
+        total_words = 0
+        short_sentences = 0
+        long_sentences = 0
+        
+        for sentence in self.sentences:
+            words = sentence.word_count
+            if words == 0:
+                continue
+            sentence_count += 1
+            total_words += words
+            if words < short_limit:
+                short_sentences += 1
+            elif words > long_limit:
+                long_sentences += 1
+        
+        return {
+            "sentence_count": sentence_count,
+            "avg_sentence_length": total_words / sentence_count if sentence_count else 0,
+            "short_sentences_count": short_sentences,
+            "long_sentences_count": long_sentences
+        }
+    
+    def passive_voice_statistics(self, min_words=3, max_examples=3):
+        """
+        Summarize passive voice usage.
+        
+        Args:
+            min_words (int): Sentences with fewer words are ignored
+            max_examples (int): Maximum number of example rewrites to return
+        
+        Returns:
+            dict: Passive voice ratio and example rewrites
+        """
+        total_sentences = 0
+        passive_sentences = 0
+        passive_examples = []
+        
+        for sentence in self.sentences:
+            if sentence.word_count < min_words:
+                continue
+            total_sentences += 1
+            
+            if not sentence.passive_matches:
+                continue
+            passive_sentences += 1
+            
+            if len(passive_examples) < max_examples:
+                original = self.sentence_text(sentence)
+                passive_part = sentence.passive_matches[0].group(0)
+                passive_examples.append({
+                    "original": original,
+                    "suggestion": original.replace(passive_part, "actively did")
+                })
+        
+        return {
+            "passive_voice_ratio": passive_sentences / total_sentences if total_sentences > 0 else 0,
+            "passive_examples": passive_examples
+        }
+
+
+@lru_cache(maxsize=32)
+def analyze_text(text):
+    """
+    Tokenize a text once and return its shared lexical analysis.
+    
+    Args:
+        text (str): The text to analyze
+    
+    Returns:
+        LexicalAnalysis: Token stream, sentences, filler and passive voice hits
+    """
+    return LexicalAnalysis(text or "")
@@ -0,0 +1,51 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from resume_api import model_registry
+from resume_api.management.commands.benchmark_relevance import PHRASE_VOCABULARY
+
+
+def _percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(fraction * len(timings)))]
+
+
+class Command(BaseCommand):
+    help = 'Compare eager and traced encoder execution on first-request and steady-state latency'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=model_registry.BERT_BASE_UNCASED, help='Encoder model name')
+        parser.add_argument('--requests', type=int, default=200, help='Number of timed requests per mode')
+        parser.add_argument('--seed', type=int, default=13, help='Random seed for text generation')
+    
+    def handle(self, *args, **options):
+        if not model_registry.TRANSFORMERS_AVAILABLE:
+            raise CommandError('transformers and torch are required for the encoder benchmark')
+        
+        rng = random.Random(options['seed'])
+        # Mix of skill-sized phrases and sentence-sized texts, like the analyzers send
+        texts = [
+            ' '.join(rng.choice(PHRASE_VOCABULARY) for _ in range(rng.choice([1, 2, 4, 8, 16])))
+            for _ in range(options['requests'])
+        ]
+        
+        for mode in ('eager', 'traced'):
+            start = time.perf_counter()
+            encoder = model_registry.load_encoder(options['model'], use_scheduler=False, mode=mode)
+            load_time = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            encoder.embed([texts[0]])
+            first_request = (time.perf_counter() - start) * 1000
+            
+            timings = []
+            for text in texts:
+                start = time.perf_counter()
+                encoder.embed([text])
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            
+            self.stdout.write(f"{mode:>6}: load {load_time:.1f} s, first request {first_request:.1f} ms, "
+                              f"p50 {_percentile(timings, 0.50):.1f} ms, p99 {_percentile(timings, 0.99):.1f} ms "
+                              f"over {len(timings)} requests")
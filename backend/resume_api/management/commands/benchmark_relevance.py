@@ -0,0 +1,90 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from resume_api import azure_language_client
+
+
+# Vocabulary used to build reproducible interview and job phrases
+PHRASE_VOCABULARY = [
+    'python', 'django', 'rest api', 'machine learning', 'data pipeline', 'cloud deployment',
+    'team leadership', 'stakeholder communication', 'unit testing', 'code review',
+    'customer experience', 'agile delivery', 'database design', 'performance tuning',
+    'product roadmap', 'incident response', 'mentoring', 'microservices', 'analytics',
+    'project planning'
+]
+
+
+def legacy_matching(interview_phrases, job_phrases):
+    """Nested loop matching with one pairwise similarity call per phrase pair"""
+    matching_keywords = []
+    for phrase in interview_phrases:
+        for job_phrase in job_phrases:
+            if phrase.lower() in job_phrase.lower() or job_phrase.lower() in phrase.lower():
+                matching_keywords.append(phrase)
+                break
+            
+            phrase_similarity = azure_language_client.calculate_text_similarity(phrase, job_phrase)
+            if phrase_similarity > 0.8:
+                matching_keywords.append(phrase)
+                break
+    return matching_keywords
+
+
+def batched_matching(interview_phrases, job_phrases):
+    """Batched embeddings with a single cosine matrix and a row-wise max"""
+    best_similarities = azure_language_client.calculate_max_similarities(interview_phrases, job_phrases)
+    job_phrases_lower = [job_phrase.lower() for job_phrase in job_phrases]
+    
+    matching_keywords = []
+    for phrase, best_similarity in zip(interview_phrases, best_similarities):
+        phrase_lower = phrase.lower()
+        if any(phrase_lower in job_phrase or job_phrase in phrase_lower for job_phrase in job_phrases_lower):
+            matching_keywords.append(phrase)
+        elif best_similarity > 0.8:
+            matching_keywords.append(phrase)
+    return matching_keywords
+
+
+class Command(BaseCommand):
+    help = 'Benchmark pairwise versus batched relevance matching used by the interview analyzer'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--phrases', type=int, default=40, help='Number of phrases on each side')
+        parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs per approach')
+        parser.add_argument('--seed', type=int, default=13, help='Random seed for phrase generation')
+    
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        count = options['phrases']
+        
+        interview_phrases = [f"{rng.choice(PHRASE_VOCABULARY)} experience {i}" for i in range(count)]
+        job_phrases = [f"strong {rng.choice(PHRASE_VOCABULARY)} skills {i}" for i in range(count)]
+        
+        self.stdout.write(f"Matching {count} interview phrases against {count} job phrases")
+        
+        results = {}
+        for name, matcher in [('legacy', legacy_matching), ('batched', batched_matching)]:
+            timings = []
+            matches = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                matches = matcher(interview_phrases, job_phrases)
+                timings.append(time.perf_counter() - start)
+            
+            results[name] = (min(timings), matches)
+            self.stdout.write(f"{name:>8}: best {min(timings) * 1000:.1f} ms, "
+                              f"mean {sum(timings) / len(timings) * 1000:.1f} ms, "
+                              f"{len(matches)} matching keywords")
+        
+        legacy_time, legacy_matches = results['legacy']
+        batched_time, batched_matches = results['batched']
+        
+        self.stdout.write(f"Speedup: {legacy_time / max(batched_time, 1e-9):.1f}x")
+        if set(legacy_matches) != set(batched_matches):
+            self.stdout.write(self.style.WARNING(
+                f"Matching keywords differ: {len(set(legacy_matches) ^ set(batched_matches))} phrases"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("Both approaches found the same matching keywords"))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from resume_api import model_registry, skill_taxonomy
+
+
+class Command(BaseCommand):
+    help = 'Build or update the persisted taxonomy embedding index and optionally look up phrases'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('phrases', nargs='*', help='Phrases to map to their nearest canonical skills')
+        parser.add_argument('--top-k', type=int, default=5, help='Number of canonical skills per phrase')
+    
+    def handle(self, *args, **options):
+        if not model_registry.TRANSFORMERS_AVAILABLE:
+            raise CommandError('transformers and torch are required to build the taxonomy index')
+        
+        start = time.perf_counter()
+        index = model_registry.get(skill_taxonomy.TAXONOMY_INDEX_NAME)
+        if index is None:
+            raise CommandError('The taxonomy index could not be built, see the log above')
+        
+        embeddings_path, _, _ = skill_taxonomy._index_paths()
+        self.stdout.write(self.style.SUCCESS(
+            f"Taxonomy index ready with {len(index)} entries in {time.perf_counter() - start:.1f} s: {embeddings_path}"
+        ))
+        
+        for phrase in options['phrases']:
+            matches = skill_taxonomy.nearest_skills(phrase, top_k=options['top_k'])
+            formatted = ', '.join(f"{skill} ({score:.3f})" for skill, score in matches)
+            self.stdout.write(f"{phrase}: {formatted}")
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from resume_api import tfidf_index
+
+
+class Command(BaseCommand):
+    help = 'Count stored resumes and job descriptions into the TF-IDF document frequencies used for text similarity'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Documents counted per batch')
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep running and refresh the statistics every this many seconds')
+    
+    def handle(self, *args, **options):
+        while True:
+            start = time.perf_counter()
+            statistics, counted, removed = tfidf_index.refresh(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"TF-IDF statistics: counted {counted} new or edited documents, removed {removed}, "
+                f"{statistics.document_count} in total in {time.perf_counter() - start:.1f} s"
+            ))
+            
+            if not options['interval']:
+                return
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,109 @@
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from resume_api import model_registry, skill_taxonomy
+
+
+# Key phrases as Azure extracts them from resumes and job descriptions, with the
+# canonical skill they should map to, or None if they name no taxonomy skill
+PHRASE_SKILL_PAIRS = [
+    ('rest api development', 'rest'),
+    ('restful web services', 'restful'),
+    ('react front end', 'react'),
+    ('single page applications in react', 'react'),
+    ('postgres database', 'postgresql'),
+    ('relational databases', 'rdbms'),
+    ('container orchestration', 'kubernetes'),
+    ('docker containers', 'docker'),
+    ('infrastructure as code', 'terraform'),
+    ('continuous integration pipelines', 'ci/cd'),
+    ('amazon cloud infrastructure', 'aws'),
+    ('google cloud platform', 'gcp'),
+    ('deep neural networks', 'deep learning'),
+    ('predictive modeling', 'machine learning'),
+    ('text classification models', 'natural language processing'),
+    ('data visualization dashboards', 'tableau'),
+    ('python scripting', 'python'),
+    ('django web framework', 'django'),
+    ('spring microservices', 'spring boot'),
+    ('source control', 'version control'),
+    ('agile ceremonies', 'agile'),
+    ('sprint planning', 'scrum'),
+    ('customer service', None),
+    ('team leadership', None),
+    ('budget planning', None),
+    ('stakeholder communication', None),
+    ('sales targets', None),
+    ('years of experience', None),
+    ('fast paced environment', None),
+    ('bachelor degree', None),
+    ('written communication', None),
+    ('problem solving skills', None),
+    ('inventory management', None),
+    ('patient care', None),
+]
+
+
+def _decisions(best_skills, best_scores, threshold):
+    """Count the correct and wrong mappings of the labelled pairs at a threshold"""
+    true_positives = false_positives = false_negatives = 0
+    for (_, expected), skill, score in zip(PHRASE_SKILL_PAIRS, best_skills, best_scores):
+        mapped = skill if score >= threshold else None
+        if mapped is not None and mapped == expected:
+            true_positives += 1
+        elif mapped is not None:
+            false_positives += 1
+        if expected is not None and mapped != expected:
+            false_negatives += 1
+    return true_positives, false_positives, false_negatives
+
+
+class Command(BaseCommand):
+    help = 'Calibrate ML_SEMANTIC_SKILLS_THRESHOLD on labelled key phrase and skill pairs'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--min-precision', type=float, default=0.9,
+                            help='Lowest acceptable share of mapped phrases that map to the right skill')
+    
+    def handle(self, *args, **options):
+        if not model_registry.TRANSFORMERS_AVAILABLE:
+            raise CommandError('transformers and torch are required to calibrate the threshold')
+        
+        index = model_registry.get(skill_taxonomy.TAXONOMY_INDEX_NAME)
+        if index is None:
+            raise CommandError('The taxonomy index could not be built, see the log above')
+        
+        # Score every phrase against the index once, then sweep the threshold
+        phrases = [phrase for phrase, _ in PHRASE_SKILL_PAIRS]
+        scores = index.centre(skill_taxonomy._embed_entries(phrases)) @ index.embeddings.T
+        best_rows = scores.argmax(axis=1)
+        best_skills = [index.canonical[row] for row in best_rows]
+        best_scores = scores[np.arange(len(phrases)), best_rows]
+        
+        for (phrase, expected), skill, score in zip(PHRASE_SKILL_PAIRS, best_skills, best_scores):
+            self.stdout.write(f"{score:.3f}  {phrase} -> {skill} (expected {expected})")
+        
+        best = None
+        for threshold in np.arange(0.20, 0.96, 0.01):
+            true_positives, false_positives, false_negatives = _decisions(best_skills, best_scores, threshold)
+            precision = true_positives / max(true_positives + false_positives, 1)
+            recall = true_positives / max(true_positives + false_negatives, 1)
+            if precision >= options['min_precision'] and (best is None or recall > best[2]):
+                best = (threshold, precision, recall)
+        
+        current = getattr(settings, 'ML_SEMANTIC_SKILLS_THRESHOLD', skill_taxonomy.DEFAULT_SEMANTIC_SKILLS_THRESHOLD)
+        true_positives, false_positives, false_negatives = _decisions(best_skills, best_scores, current)
+        self.stdout.write(
+            f"Current threshold {current:.2f}: {true_positives} correct, {false_positives} wrong, "
+            f"{false_negatives} missed"
+        )
+        if best is None:
+            self.stdout.write(self.style.WARNING(
+                f"No threshold reaches a precision of {options['min_precision']:.2f} on these pairs"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Recommended ML_SEMANTIC_SKILLS_THRESHOLD={best[0]:.2f} "
+                f"(precision {best[1]:.2f}, recall {best[2]:.2f})"
+            ))
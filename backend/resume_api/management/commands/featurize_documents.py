@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from resume_api import document_features
+from resume_api.models import Resume, JobDescription
+from resume_api.resume_analyzer import ResumeAnalyzer, ANALYZER_VERSION
+
+
+class Command(BaseCommand):
+    help = 'Materialize the features of stored resumes and job descriptions that are missing or stale'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=['all', 'resumes', 'jobs'], default='all',
+                            help='Which documents to featurize')
+        parser.add_argument('--force', action='store_true', help='Re-featurize documents whose features are current')
+        parser.add_argument('--batch-size', type=int, default=100, help='Documents loaded per batch')
+    
+    def handle(self, *args, **options):
+        models = {'resumes': [Resume], 'jobs': [JobDescription], 'all': [Resume, JobDescription]}[options['kind']]
+        analyzer = ResumeAnalyzer()
+        self.stdout.write(f"Featurizing with analyzer version {ANALYZER_VERSION}")
+        
+        for model in models:
+            start = time.perf_counter()
+            ids = list(model.objects.order_by('id').values_list('id', flat=True))
+            featurized = 0
+            
+            for offset in range(0, len(ids), options['batch_size']):
+                documents = list(model.objects.filter(id__in=ids[offset:offset + options['batch_size']]))
+                if not options['force']:
+                    documents = document_features.stale_documents(documents)
+                
+                for document in documents:
+                    try:
+                        document_features.materialize(document, analyzer)
+                        featurized += 1
+                    except Exception as e:
+                        self.stderr.write(f"Error featurizing {model.__name__} {document.pk}: {str(e)}")
+                
+                self.stdout.write(f"{model.__name__}: {min(offset + options['batch_size'], len(ids))}/{len(ids)} checked")
+            
+            self.stdout.write(self.style.SUCCESS(
+                f"{model.__name__}: featurized {featurized}, {len(ids) - featurized} up to date "
+                f"in {time.perf_counter() - start:.1f} s"
+            ))
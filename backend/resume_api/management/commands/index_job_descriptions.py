@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from resume_api import near_duplicates
+from resume_api.models import JobDescription
+
+
+class Command(BaseCommand):
+    help = 'Index stored job descriptions for near-duplicate detection and link them to their canonical copies'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-index job descriptions that already have a signature')
+    
+    def handle(self, *args, **options):
+        job_descriptions = JobDescription.objects.order_by('id')
+        if not options['all']:
+            job_descriptions = job_descriptions.filter(minhash__isnull=True)
+        
+        indexed = duplicates = 0
+        for job_description in job_descriptions.iterator():
+            if options['all']:
+                # Forget the stored signature so the bands and canonical link are rebuilt
+                job_description.minhash = None
+            if near_duplicates.index_job_description(job_description) is not None:
+                duplicates += 1
+            indexed += 1
+        
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} job descriptions, {duplicates} near-duplicates linked"))
@@ -0,0 +1,122 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from resume_api import model_registry
+
+
+# Skill pairs whose similarity scores drive resume and interview matching
+SKILL_PAIRS = [
+    ('python', 'python programming'),
+    ('javascript', 'typescript'),
+    ('react', 'react.js'),
+    ('machine learning', 'deep learning'),
+    ('aws', 'amazon web services'),
+    ('docker', 'kubernetes'),
+    ('sql', 'postgresql'),
+    ('rest api', 'restful services'),
+    ('project management', 'team leadership'),
+    ('communication skills', 'stakeholder communication'),
+    ('data analysis', 'data visualization'),
+    ('unit testing', 'test automation'),
+    ('java', 'javascript'),
+    ('accounting', 'kubernetes'),
+    ('customer service', 'machine learning'),
+    ('graphic design', 'database administration')
+]
+
+# Threshold used by the relevance and skill matching code
+MATCH_THRESHOLD = 0.8
+
+
+def _normalize(embeddings):
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+def _pair_similarities(encoder, pairs):
+    left = _normalize(encoder.embed([a for a, _ in pairs], pooling="cls", max_length=128))
+    right = _normalize(encoder.embed([b for _, b in pairs], pooling="cls", max_length=128))
+    return np.clip(np.sum(left * right, axis=1), 0, 1)
+
+
+def _measure_throughput(encoder, texts, repeat):
+    # One untimed pass so lazy initialization does not count
+    encoder.embed(texts[:1])
+    
+    single_timings = []
+    for text in texts:
+        start = time.perf_counter()
+        encoder.embed([text])
+        single_timings.append((time.perf_counter() - start) * 1000)
+    
+    batch_timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encoder.embed(texts)
+        batch_timings.append(time.perf_counter() - start)
+    
+    single_timings.sort()
+    return {
+        'p50_ms': single_timings[len(single_timings) // 2],
+        'p99_ms': single_timings[min(len(single_timings) - 1, int(0.99 * len(single_timings)))],
+        'texts_per_second': len(texts) / min(batch_timings)
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare fp32 and int8 BERT encoders on skill similarity agreement and throughput'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=model_registry.BERT_BASE_UNCASED, help='Encoder model name')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of timed batch runs per mode')
+    
+    def handle(self, *args, **options):
+        if not model_registry.TRANSFORMERS_AVAILABLE:
+            raise CommandError('transformers and torch are required for the quantization report')
+        
+        model_name = options['model']
+        texts = [text for pair in SKILL_PAIRS for text in pair]
+        
+        encoders = {}
+        for mode in ('fp32', 'int8'):
+            start = time.perf_counter()
+            encoders[mode] = model_registry.load_encoder(model_name, inference_mode=mode, use_scheduler=False)
+            self.stdout.write(f"Loaded {mode} encoder in {time.perf_counter() - start:.1f} s")
+        
+        reference = _normalize(encoders['fp32'].embed(texts))
+        quantized = _normalize(encoders['int8'].embed(texts))
+        embedding_agreement = np.sum(reference * quantized, axis=1)
+        
+        reference_scores = _pair_similarities(encoders['fp32'], SKILL_PAIRS)
+        quantized_scores = _pair_similarities(encoders['int8'], SKILL_PAIRS)
+        score_errors = np.abs(reference_scores - quantized_scores)
+        decision_flips = int(np.sum((reference_scores > MATCH_THRESHOLD) != (quantized_scores > MATCH_THRESHOLD)))
+        
+        self.stdout.write(f"\nAccuracy on {len(SKILL_PAIRS)} skill pairs ({model_name})")
+        self.stdout.write(f"  embedding cosine fp32 vs int8: mean {embedding_agreement.mean():.4f}, "
+                          f"min {embedding_agreement.min():.4f}")
+        self.stdout.write(f"  similarity score error: mean {score_errors.mean():.4f}, max {score_errors.max():.4f}")
+        self.stdout.write(f"  match decisions changed at {MATCH_THRESHOLD}: {decision_flips}")
+        
+        for (left, right), fp32_score, int8_score in zip(SKILL_PAIRS, reference_scores, quantized_scores):
+            self.stdout.write(f"    {left} / {right}: {fp32_score:.3f} -> {int8_score:.3f}")
+        
+        self.stdout.write("\nThroughput")
+        results = {}
+        for mode, encoder in encoders.items():
+            results[mode] = _measure_throughput(encoder, texts, options['repeat'])
+            self.stdout.write(f"  {mode:>4}: p50 {results[mode]['p50_ms']:.1f} ms, "
+                              f"p99 {results[mode]['p99_ms']:.1f} ms, "
+                              f"{results[mode]['texts_per_second']:.0f} texts/s batched")
+        
+        speedup = results['int8']['texts_per_second'] / max(results['fp32']['texts_per_second'], 1e-9)
+        self.stdout.write(f"  int8 batched speedup: {speedup:.2f}x")
+        
+        if decision_flips:
+            self.stdout.write(self.style.WARNING(
+                f"int8 changes {decision_flips} match decisions; review before setting ML_INFERENCE_MODE=int8"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("int8 preserves every match decision on the reference pairs"))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from resume_api import job_queue, model_registry
+
+
+class Command(BaseCommand):
+    help = 'Run background workers that process queued resume analysis jobs'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of worker threads')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls of an empty queue')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--no-warm-up', action='store_true', help='Load models on the first job instead of at start')
+    
+    def handle(self, *args, **options):
+        if not options['no_warm_up']:
+            self.stdout.write(f"Warming up models: {model_registry.warm_up()}")
+        
+        threads, stop_event = job_queue.start_workers(
+            options['workers'], poll_interval=options['poll_interval'], once=options['once']
+        )
+        self.stdout.write(self.style.SUCCESS(f"Started {len(threads)} analysis workers"))
+        
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers after their current jobs...")
+            stop_event.set()
+            for thread in threads:
+                thread.join()
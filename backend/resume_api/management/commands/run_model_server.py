@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from resume_api import model_server
+
+# Register the interview models (zero-shot classifier, keyword bank) as well
+import interviews.bert_analyzer  # noqa: F401
+
+
+class Command(BaseCommand):
+    help = 'Run the standalone model server that holds the transformer models for all web workers'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Interface to bind to')
+        parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+        parser.add_argument('--no-warmup', action='store_true', help='Load models on first request instead of at startup')
+    
+    def handle(self, *args, **options):
+        model_server.run_server(
+            host=options['host'],
+            port=options['port'],
+            warm_up=not options['no_warmup']
+        )
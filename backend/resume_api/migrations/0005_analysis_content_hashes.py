@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_api', '0004_analysisjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisjob',
+            name='force',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='jobdescription',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='analyzer_version',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='job_description_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='result',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='resume_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='resumeanalysis',
+            index=models.Index(fields=['resume_hash', 'job_description_hash', 'analyzer_version'], name='resume_api__resume__6373b6_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_api', '0005_analysis_content_hashes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentFeatures',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('analyzer_version', models.CharField(max_length=20)),
+                ('key_phrases', models.JSONField(default=list)),
+                ('technical_skills', models.JSONField(default=list)),
+                ('soft_skills', models.JSONField(default=list)),
+                ('skill_ids', models.JSONField(default=list)),
+                ('words', models.JSONField(default=list)),
+                ('sections', models.JSONField(default=list)),
+                ('embedding', models.BinaryField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job_description', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='features', to='resume_api.jobdescription')),
+                ('resume', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='features', to='resume_api.resume')),
+            ],
+            options={
+                'verbose_name_plural': 'Document Features',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_api', '0006_documentfeatures'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobdescription',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='resume_api.jobdescription'),
+        ),
+        migrations.AddField(
+            model_name='jobdescription',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='JobDescriptionBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.IntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('job_description', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='resume_api.jobdescription')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='resume_api__band_a30737_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_api', '0007_job_description_near_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentfeatures',
+            name='segments',
+            field=models.JSONField(default=list),
+        ),
+        migrations.CreateModel(
+            name='SegmentFeatures',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('analyzer_version', models.CharField(max_length=20)),
+                ('key_phrases', models.JSONField(default=list)),
+                ('sentiment', models.CharField(blank=True, default='', max_length=10)),
+                ('word_count', models.IntegerField(default=0)),
+                ('embedding', models.BinaryField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Segment Features',
+                'constraints': [models.UniqueConstraint(fields=('fingerprint', 'analyzer_version'), name='unique_segment_features')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_api', '0008_segment_features'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisjob',
+            name='tier',
+            field=models.CharField(default='full', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='tier',
+            field=models.CharField(default='full', max_length=10),
+        ),
+    ]
@@ -0,0 +1,23 @@
+import hashlib
+
+from django.db import migrations
+
+
+def backfill_content_hashes(apps, schema_editor):
+    """Key documents created without a hash by the SHA-256 of their text"""
+    for model_name in ('Resume', 'JobDescription'):
+        model = apps.get_model('resume_api', model_name)
+        for document in model.objects.filter(content_hash='').only('id', 'content').iterator():
+            document.content_hash = hashlib.sha256(document.content.encode('utf-8')).hexdigest()
+            document.save(update_fields=['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_api', '0010_analysis_degraded'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_content_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+from django.db.models import F
+
+
+def unlink_cross_user_duplicates(apps, schema_editor):
+    """Drop near-duplicate links to another user's job description"""
+    JobDescription = apps.get_model('resume_api', 'JobDescription')
+    JobDescription.objects.filter(canonical__isnull=False).exclude(canonical__user=F('user')).update(canonical=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_api', '0011_backfill_content_hashes'),
+    ]
+
+    operations = [
+        migrations.RunPython(unlink_cross_user_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,670 @@
+"""
+Process-wide registry for the transformer models used by the analyzers.
+
+Models are registered with a loader and only loaded on first use, so importing
+the analyzers (and therefore the URL configuration) stays cheap. Every module
+asking for the same model name shares one instance, and loading is guarded by
+a per-model lock so concurrent first requests load the weights only once.
+
+start_warm_up() loads the registered models ahead of traffic in a background
+thread; together with is_ready() it lets readiness be reported separately
+from liveness.
+
+When ML_MODEL_SERVER_URL is set, models registered with a remote_kind are
+served by the standalone model server instead, and only loaded in-process as
+a fallback while the server cannot be reached.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+
+from . import deadlines
+from . import model_server_client
+from .inference_scheduler import MicroBatchScheduler
+
+try:
+    import numpy as np
+    import torch
+    from transformers import AutoConfig, AutoTokenizer, AutoModel, AutoModelForSequenceClassification
+    from transformers import __version__ as transformers_version
+    TRANSFORMERS_AVAILABLE = True
+except ImportError as e:
+    TRANSFORMERS_AVAILABLE = False
+    print(f"Transformers not available, models will not be loaded: {str(e)}")
+
+BERT_BASE_UNCASED = "bert-base-uncased"
+
+# Only texts up to this many characters are kept in the token id cache; short
+# strings such as taxonomy skills and context phrases repeat across requests
+TOKEN_CACHE_MAX_CHARS = 64
+
+
+class TransformerEncoder:
+    """
+    A tokenizer and encoder model pair that turns texts into embeddings.
+    
+    Texts are tokenized in one batch call and the resulting token sequences are
+    run through the model in batches padded to their longest sequence. Token ids
+    of short texts are cached, since the same skills and phrases are embedded
+    over and over. When a micro-batching scheduler is attached, sequences from
+    concurrent callers are merged into shared forward passes.
+    """
+    
+    def __init__(self, name, tokenizer, model, token_cache_size=4096):
+        self.name = name
+        self.tokenizer = tokenizer
+        self.model = model
+        self.model.eval()
+        self.scheduler = None
+        
+        self.token_cache_size = token_cache_size
+        self._token_cache = OrderedDict()
+        self._token_cache_lock = threading.Lock()
+        self._token_cache_hits = 0
+        self._token_cache_misses = 0
+    
+    def tokenize(self, texts, max_length=128):
+        """
+        Turn texts into token id sequences, including special tokens, truncated to max_length.
+        
+        Cached sequences are reused and all remaining texts are tokenized in a
+        single batch call to the tokenizer.
+        """
+        texts = list(texts)
+        sequences = [None] * len(texts)
+        missing = []
+        
+        with self._token_cache_lock:
+            for index, text in enumerate(texts):
+                cached = self._token_cache.get((text, max_length))
+                if cached is None:
+                    missing.append(index)
+                else:
+                    self._token_cache.move_to_end((text, max_length))
+                    sequences[index] = cached
+            self._token_cache_hits += len(texts) - len(missing)
+            self._token_cache_misses += len(missing)
+        
+        if missing:
+            encoded = self.tokenizer([texts[index] for index in missing], truncation=True,
+                                     max_length=max_length)["input_ids"]
+            with self._token_cache_lock:
+                for index, token_ids in zip(missing, encoded):
+                    token_ids = tuple(token_ids)
+                    sequences[index] = token_ids
+                    if self.token_cache_size and len(texts[index]) <= TOKEN_CACHE_MAX_CHARS:
+                        self._token_cache[(texts[index], max_length)] = token_ids
+                while len(self._token_cache) > self.token_cache_size:
+                    self._token_cache.popitem(last=False)
+        
+        return sequences
+    
+    def token_cache_info(self):
+        """Return the size and hit counts of the token id cache"""
+        with self._token_cache_lock:
+            return {
+                "size": len(self._token_cache),
+                "max_size": self.token_cache_size,
+                "hits": self._token_cache_hits,
+                "misses": self._token_cache_misses
+            }
+    
+    def forward(self, sequences, pooling="cls"):
+        """
+        Pool the model output of several token sequences in one padded forward pass.
+        
+        Args:
+            sequences (list): Token id sequences
+            pooling (str or list): Pooling for all sequences, or one per sequence
+            
+        Returns:
+            numpy.ndarray: Matrix with one embedding row per sequence
+        """
+        poolings = [pooling] * len(sequences) if isinstance(pooling, str) else list(pooling)
+        input_ids, attention_mask = _pad(sequences, self.tokenizer.pad_token_id or 0)
+        
+        with torch.inference_mode():
+            hidden_state = self._encode(input_ids, attention_mask)
+        
+        cls_embeddings = _pool(hidden_state, attention_mask, "cls")
+        if all(item == "cls" for item in poolings):
+            return cls_embeddings.numpy()
+        
+        mean_embeddings = _pool(hidden_state, attention_mask, "mean")
+        use_cls = torch.tensor([item == "cls" for item in poolings]).unsqueeze(-1)
+        return torch.where(use_cls, cls_embeddings, mean_embeddings).numpy()
+    
+    def _encode(self, input_ids, attention_mask):
+        """Run the model and return the last hidden state"""
+        return self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+    
+    def _run(self, sequences, pooling):
+        """Run sequences through the scheduler when one is attached, otherwise directly"""
+        if self.scheduler is None:
+            return self.forward(sequences, pooling)
+        
+        futures = self.scheduler.submit_many([(sequence, pooling) for sequence in sequences])
+        
+        # Wait no longer than ML_INFERENCE_TIMEOUT or the request deadline, whichever ends first
+        deadline = deadlines.within(getattr(settings, 'ML_INFERENCE_TIMEOUT', 60))
+        try:
+            return np.stack([future.result(timeout=deadline.remaining()) for future in futures])
+        except FutureTimeoutError:
+            for future in futures:
+                future.cancel()
+            raise
+    
+    def embed(self, texts, pooling="cls", max_length=128):
+        """
+        Embed a batch of texts.
+        
+        Args:
+            texts (list): Texts to embed
+            pooling (str): "cls" for the [CLS] token embedding, "mean" for the
+                attention-masked mean of all token embeddings
+            max_length (int): Maximum number of tokens per text
+        
+        Returns:
+            numpy.ndarray: Matrix with one embedding row per input text
+        """
+        return self._run(self.tokenize(texts, max_length), pooling)
+    
+    def embed_long(self, text, max_length=512, stride=128):
+        """
+        Embed a text of any length by mean pooling overlapping token windows.
+        
+        The text is split into windows of at most max_length tokens that overlap
+        by stride tokens. All windows are encoded in one batched forward pass and
+        their mean-pooled embeddings are averaged, weighted by window length.
+        
+        Args:
+            text (str): Text to embed
+            max_length (int): Maximum number of tokens per window
+            stride (int): Number of tokens shared by consecutive windows
+            
+        Returns:
+            numpy.ndarray: Embedding vector of the whole text
+        """
+        token_ids = self.tokenizer(text, add_special_tokens=False, verbose=False)["input_ids"]
+        
+        # Room for the [CLS] and [SEP] tokens added to every window
+        body_length = max_length - 2
+        step = max(1, body_length - stride)
+        windows = [token_ids[start:start + body_length]
+                   for start in range(0, max(len(token_ids) - stride, 1), step)]
+        
+        sequences = [self.tokenizer.build_inputs_with_special_tokens(window) for window in windows]
+        window_embeddings = self._run(sequences, "mean")
+        
+        weights = np.array([len(sequence) for sequence in sequences], dtype=window_embeddings.dtype)
+        return (window_embeddings * weights[:, None]).sum(axis=0) / weights.sum()
+    
+    def attach_scheduler(self, max_batch_size=32, max_wait_ms=5):
+        """Merge sequences from concurrent callers into shared forward passes"""
+        self.scheduler = MicroBatchScheduler(
+            lambda items: list(self.forward([sequence for sequence, _ in items], [pooling for _, pooling in items])),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name=self.name
+        )
+
+
+class TracedEncoder(TransformerEncoder):
+    """
+    TransformerEncoder that runs TorchScript traces of the model.
+    
+    The model is traced once per sequence length bucket and every batch is
+    padded up to the smallest bucket that fits it, so only a handful of fixed
+    shapes are ever executed. Each trace is warmed up when it is built, which
+    moves the slow first passes of the JIT out of the first requests. Batches
+    longer than the largest bucket run the eager model.
+    """
+    
+    def __init__(self, name, tokenizer, model, buckets=(16, 32, 64, 128, 256, 512), warm_up_runs=2, **kwargs):
+        super().__init__(name, tokenizer, model, **kwargs)
+        # Traced models return tuples instead of output objects
+        self.model.config.torchscript = True
+        
+        max_positions = getattr(model.config, "max_position_embeddings", 512)
+        self.buckets = sorted(bucket for bucket in buckets if bucket <= max_positions)
+        self.traces = {}
+        for bucket in self.buckets:
+            self.traces[bucket] = self._trace(bucket, warm_up_runs)
+    
+    def _trace(self, length, warm_up_runs):
+        """Trace the model for one sequence length and run it a few times to warm it up"""
+        pad_id = self.tokenizer.pad_token_id or 0
+        input_ids = torch.full((2, length), pad_id, dtype=torch.long)
+        attention_mask = torch.ones((2, length), dtype=torch.long)
+        
+        with torch.inference_mode():
+            traced = torch.jit.trace(self.model, (input_ids, attention_mask), strict=False)
+            try:
+                traced = torch.jit.freeze(traced)
+            except Exception as e:
+                print(f"Could not freeze trace of '{self.name}' for length {length}: {str(e)}")
+            
+            for _ in range(warm_up_runs):
+                traced(input_ids, attention_mask)
+        return traced
+    
+    def _encode(self, input_ids, attention_mask):
+        length = input_ids.shape[1]
+        bucket = next((bucket for bucket in self.buckets if bucket >= length), None)
+        if bucket is None:
+            return super()._encode(input_ids, attention_mask)
+        
+        if bucket > length:
+            pad_id = self.tokenizer.pad_token_id or 0
+            input_ids = torch.nn.functional.pad(input_ids, (0, bucket - length), value=pad_id)
+            attention_mask = torch.nn.functional.pad(attention_mask, (0, bucket - length), value=0)
+        return self.traces[bucket](input_ids, attention_mask)[0]
+
+
+def _pad(sequences, pad_id):
+    """Pad token id sequences to the longest one in the batch and build the attention mask"""
+    longest = max(len(sequence) for sequence in sequences)
+    input_ids = np.full((len(sequences), longest), pad_id, dtype=np.int64)
+    attention_mask = np.zeros((len(sequences), longest), dtype=np.int64)
+    for row, sequence in enumerate(sequences):
+        input_ids[row, :len(sequence)] = sequence
+        attention_mask[row, :len(sequence)] = 1
+    return torch.from_numpy(input_ids), torch.from_numpy(attention_mask)
+
+
+def _pool(hidden_state, attention_mask, pooling):
+    """Pool token embeddings into one vector per sequence"""
+    if pooling == "cls":
+        return hidden_state[:, 0, :]
+    
+    mask = attention_mask.unsqueeze(-1).to(hidden_state.dtype)
+    return (hidden_state * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+
+
+class ZeroShotClassifier:
+    """
+    Zero-shot text classifier built on a natural language inference model.
+    
+    Each candidate label is turned into a hypothesis sentence that is tokenized
+    once and cached, so classifying a text only tokenizes the text itself and
+    scores all labels with a single batched forward pass.
+    """
+    
+    def __init__(self, name, tokenizer, model, hypothesis_template="This example is {}."):
+        self.name = name
+        self.tokenizer = tokenizer
+        self.model = model
+        self.model.eval()
+        self.hypothesis_template = hypothesis_template
+        self._hypothesis_ids = {}
+        
+        label2id = {label.lower(): index for label, index in model.config.label2id.items()}
+        self.entailment_id = next((index for label, index in label2id.items() if label.startswith("entail")), -1)
+    
+    def prepare_labels(self, labels):
+        """Tokenize and cache the hypothesis of every candidate label"""
+        for label in labels:
+            if label not in self._hypothesis_ids:
+                hypothesis = self.hypothesis_template.format(label)
+                self._hypothesis_ids[label] = self.tokenizer(hypothesis, add_special_tokens=False)["input_ids"]
+    
+    def classify(self, text, labels):
+        """
+        Score how well each candidate label describes a text.
+        
+        Args:
+            text (str): Text to classify
+            labels (list): Candidate labels
+            
+        Returns:
+            dict: Label mapped to its probability, highest first
+        """
+        self.prepare_labels(labels)
+        hypotheses = [self._hypothesis_ids[label] for label in labels]
+        
+        # Leave room for the longest hypothesis and the special tokens of the pair
+        max_premise_length = self.tokenizer.model_max_length - max(len(ids) for ids in hypotheses) - 4
+        premise = self.tokenizer(text, add_special_tokens=False, truncation=True,
+                                 max_length=max_premise_length)["input_ids"]
+        
+        pairs = [self.tokenizer.build_inputs_with_special_tokens(premise, hypothesis) for hypothesis in hypotheses]
+        input_ids, attention_mask = _pad(pairs, self.tokenizer.pad_token_id or 0)
+        
+        with torch.inference_mode():
+            logits = self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+        
+        # As in single-label zero-shot classification, the entailment logits of
+        # all candidate labels are normalized against each other
+        scores = torch.softmax(logits[:, self.entailment_id], dim=0).tolist()
+        return dict(sorted(zip(labels, scores), key=lambda item: item[1], reverse=True))
+
+
+def _load_quantized_model(model_name):
+    """
+    Load an encoder with its linear layers dynamically quantized to int8.
+    
+    The quantized weights are cached on disk as a state dict, keyed by the torch
+    and transformers versions. Later startups build the module from the model's
+    config alone, quantize it while its weights are still uninitialized and
+    restore the int8 weights from the cache, so the fp32 checkpoint is neither
+    loaded nor quantized again. The cache is loaded with weights_only so the
+    file cannot run code when unpickled.
+    """
+    cache_dir = getattr(settings, 'ML_MODEL_CACHE_DIR', None)
+    cache_path = None
+    if cache_dir:
+        safe_name = model_name.replace('/', '--')
+        cache_path = os.path.join(
+            cache_dir, f"{safe_name}-int8-state-torch{torch.__version__}-transformers{transformers_version}.pt"
+        )
+    
+    if cache_path and os.path.exists(cache_path):
+        try:
+            model = AutoModel.from_config(AutoConfig.from_pretrained(model_name))
+            model.eval()
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            model.load_state_dict(torch.load(cache_path, weights_only=True))
+            print(f"Loaded cached int8 weights from {cache_path}")
+            return model
+        except Exception as e:
+            print(f"Error loading cached int8 weights, caching them again: {str(e)}")
+    
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if not cache_path:
+        return model
+    
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        torch.save(model.state_dict(), temp_path)
+        os.replace(temp_path, cache_path)
+        print(f"Cached int8 weights at {cache_path}")
+    except Exception as e:
+        print(f"Error caching int8 weights: {str(e)}")
+    
+    return model
+
+
+def load_tokenizer(model_name):
+    """Load the Rust-backed fast tokenizer of a model"""
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    if not tokenizer.is_fast:
+        print(f"No fast tokenizer available for '{model_name}', using the slow Python tokenizer")
+    return tokenizer
+
+
+_threads_configured = False
+
+
+def configure_threads():
+    """
+    Size the torch intra-op thread pool for this worker process.
+    
+    Uses ML_TORCH_THREADS when set, otherwise splits the CPU cores evenly
+    between the ML_WORKERS_PER_HOST worker processes, so that several workers
+    do not oversubscribe the cores with one full-size thread pool each.
+    """
+    global _threads_configured
+    if _threads_configured:
+        return
+    _threads_configured = True
+    
+    threads = getattr(settings, 'ML_TORCH_THREADS', 0)
+    if not threads:
+        workers = max(1, getattr(settings, 'ML_WORKERS_PER_HOST', 1))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+    torch.set_num_threads(threads)
+    print(f"Using {threads} torch threads per worker")
+
+
+def execution_mode(model_name):
+    """Return the execution path of a model: "traced" if listed in ML_TRACED_MODELS, otherwise "eager"."""
+    return "traced" if model_name in getattr(settings, 'ML_TRACED_MODELS', []) else "eager"
+
+
+def load_encoder(model_name, inference_mode=None, use_scheduler=True, mode=None):
+    """
+    Load a pretrained tokenizer and encoder model as a TransformerEncoder.
+    
+    Args:
+        model_name (str): Hugging Face model name
+        inference_mode (str, optional): "fp32", or "int8" for dynamic int8
+            quantization of the linear layers. Defaults to ML_INFERENCE_MODE.
+        use_scheduler (bool): Attach the micro-batching scheduler when enabled
+        mode (str, optional): "eager", or "traced" to run TorchScript traces per
+            sequence length bucket. Defaults to execution_mode(model_name).
+    
+    Returns:
+        TransformerEncoder: The loaded encoder
+    """
+    if inference_mode is None:
+        inference_mode = getattr(settings, 'ML_INFERENCE_MODE', 'fp32')
+    if mode is None:
+        mode = execution_mode(model_name)
+    
+    configure_threads()
+    
+    tokenizer = load_tokenizer(model_name)
+    if inference_mode == 'int8':
+        model = _load_quantized_model(model_name)
+    else:
+        model = AutoModel.from_pretrained(model_name)
+    
+    token_cache_size = getattr(settings, 'ML_TOKEN_CACHE_SIZE', 4096)
+    encoder = None
+    if mode == 'traced':
+        try:
+            encoder = TracedEncoder(model_name, tokenizer, model,
+                                    buckets=getattr(settings, 'ML_TRACE_BUCKETS', (16, 32, 64, 128, 256, 512)),
+                                    token_cache_size=token_cache_size)
+        except Exception as e:
+            print(f"Error tracing '{model_name}', using eager execution: {str(e)}")
+            model.config.torchscript = False
+    if encoder is None:
+        encoder = TransformerEncoder(model_name, tokenizer, model, token_cache_size=token_cache_size)
+    
+    if use_scheduler and getattr(settings, 'ML_MICROBATCH_ENABLED', False):
+        encoder.attach_scheduler(
+            max_batch_size=getattr(settings, 'ML_MICROBATCH_MAX_SIZE', 32),
+            max_wait_ms=getattr(settings, 'ML_MICROBATCH_MAX_WAIT_MS', 5)
+        )
+    return encoder
+
+
+def load_zero_shot_classifier(model_name, hypothesis_template="This example is {}."):
+    """Load a pretrained natural language inference model as a ZeroShotClassifier"""
+    tokenizer = load_tokenizer(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    return ZeroShotClassifier(model_name, tokenizer, model, hypothesis_template)
+
+
+_loaders = {}
+_models = {}
+_failed = {}
+_locks = {}
+_remote_kinds = {}
+_remote_models = {}
+_registry_lock = threading.Lock()
+_serving_locally = False
+_warm_up_names = None
+
+
+def register(name, loader, remote_kind=None):
+    """
+    Register a model loader under a name.
+    
+    Args:
+        name (str): Name used to look the model up
+        loader (callable): Function without arguments that returns the loaded model
+        remote_kind (str, optional): "encoder" or "zero_shot" if the model can be
+            served by the model server
+    """
+    with _registry_lock:
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+        if remote_kind:
+            _remote_kinds[name] = remote_kind
+
+
+def serve_locally():
+    """Always load models in this process; used by the model server itself"""
+    global _serving_locally
+    _serving_locally = True
+
+
+def get(name):
+    """
+    Return the shared instance of a registered model, loading it on first use.
+    
+    If a model server is configured and serves this model, a remote proxy with
+    the same interface is returned instead of loading the weights here.
+    
+    Args:
+        name (str): Name of the registered model
+    
+    Returns:
+        The loaded model or its proxy, or None if it is unknown or failed to load
+    """
+    if name in _remote_kinds and not _serving_locally and model_server_client.is_configured():
+        proxy = _remote_models.get(name)
+        if proxy is None:
+            with _registry_lock:
+                proxy = _remote_models.get(name)
+                if proxy is None:
+                    proxy = model_server_client.create_proxy(name, _remote_kinds[name], get_local)
+                    _remote_models[name] = proxy
+        return proxy
+    
+    return get_local(name)
+
+
+def get_local(name):
+    """
+    Return the in-process instance of a registered model, loading it on first use.
+    
+    Args:
+        name (str): Name of the registered model
+    
+    Returns:
+        The loaded model, or None if it is unknown or failed to load
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+    
+    lock = _locks.get(name)
+    if lock is None:
+        print(f"Model '{name}' is not registered")
+        return None
+    
+    with lock:
+        # Another thread may have finished loading while we waited
+        if name in _models:
+            return _models[name]
+        if name in _failed:
+            return None
+        
+        try:
+            print(f"Loading model '{name}'...")
+            model = _loaders[name]()
+            _models[name] = model
+            print(f"Model '{name}' loaded successfully")
+            return model
+        except Exception as e:
+            print(f"Error loading model '{name}': {str(e)}")
+            _failed[name] = str(e)
+            return None
+
+
+def is_loaded(name):
+    """Check whether a model has already been loaded or proxied to the model server, without loading it"""
+    return name in _models or name in _remote_models
+
+
+def warm_up(names=None):
+    """
+    Load registered models ahead of the first request.
+    
+    Args:
+        names (list, optional): Models to load. Defaults to every registered model.
+    
+    Returns:
+        dict: Model name mapped to whether it is available
+    """
+    names = list(_loaders) if names is None else names
+    return {name: get(name) is not None for name in names}
+
+
+def start_warm_up(names=None):
+    """
+    Load registered models in a background thread, so the process can report
+    liveness right away and readiness once they are loaded.
+    
+    The models are chosen now rather than in the thread, so is_ready() only
+    waits for these, and not for models registered later and loaded on first use.
+    
+    Args:
+        names (list, optional): Models to load. Defaults to every registered model.
+    """
+    global _warm_up_names
+    _warm_up_names = list(_loaders) if names is None else list(names)
+    threading.Thread(target=warm_up, args=(_warm_up_names,), name='model-warmup', daemon=True).start()
+
+
+def is_ready(names=None):
+    """
+    Check whether models have finished loading, successfully or not.
+    
+    Args:
+        names (list, optional): Models to check. Defaults to the models loaded by
+            start_warm_up(), or none if it was not started, since the others are
+            only loaded on first use.
+    
+    Returns:
+        bool: True once no model is still waiting to be loaded
+    """
+    if names is None:
+        names = _warm_up_names or []
+    return all(name in _models or name in _failed or name in _remote_models for name in names)
+
+
+def status():
+    """Return the load state of every registered model"""
+    result = {}
+    for name in _loaders:
+        if name in _models:
+            result[name] = "loaded"
+        elif name in _remote_models:
+            result[name] = "remote"
+        elif name in _failed:
+            result[name] = f"failed: {_failed[name]}"
+        else:
+            result[name] = "not loaded"
+    return result
+
+
+def scheduler_stats():
+    """Return the micro-batching statistics of every loaded model that uses a scheduler"""
+    return {
+        name: model.scheduler.stats()
+        for name, model in list(_models.items())
+        if getattr(model, "scheduler", None) is not None
+    }
+
+
+def token_cache_stats():
+    """Return the token id cache statistics of every loaded encoder"""
+    return {
+        name: model.token_cache_info()
+        for name, model in list(_models.items())
+        if hasattr(model, "token_cache_info")
+    }
+
+
+if TRANSFORMERS_AVAILABLE:
+    register(BERT_BASE_UNCASED, lambda: load_encoder(BERT_BASE_UNCASED), remote_kind='encoder')
@@ -0,0 +1,119 @@
+"""
+Standalone model server shared by all web workers.
+
+The server process loads every registered model once and answers JSON requests
+over HTTP. Concurrent requests are merged into shared forward passes by the
+micro-batching scheduler when ML_MICROBATCH_ENABLED is set. Start it with the
+run_model_server management command and point ML_MODEL_SERVER_URL at it.
+
+Endpoints:
+    GET  /health      Model load state
+    POST /embed       {"model", "texts", "pooling", "max_length"} -> {"embeddings"}
+    POST /embed_long  {"model", "text", "max_length", "stride"} -> {"embedding"}
+    POST /classify    {"model", "text", "labels"} -> {"scores"}
+"""
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import model_registry
+
+
+class ModelServerHandler(BaseHTTPRequestHandler):
+    """Request handler dispatching JSON requests to the registered models"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/health':
+            self._send_json(200, {
+                'ready': model_registry.is_ready(),
+                'models': model_registry.status()
+            })
+        else:
+            self._send_json(404, {'error': f'Unknown endpoint: {self.path}'})
+
+    def do_POST(self):
+        handlers = {
+            '/embed': self._embed,
+            '/embed_long': self._embed_long,
+            '/classify': self._classify
+        }
+        handler = handlers.get(self.path.rstrip('/'))
+        if handler is None:
+            self._send_json(404, {'error': f'Unknown endpoint: {self.path}'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {'error': f'Invalid JSON body: {str(e)}'})
+            return
+
+        model = model_registry.get_local(payload.get('model', ''))
+        if model is None:
+            self._send_json(404, {'error': f"Model '{payload.get('model')}' is not available"})
+            return
+
+        try:
+            self._send_json(200, handler(model, payload))
+        except Exception as e:
+            print(f"Model server error on {self.path}: {str(e)}")
+            self._send_json(500, {'error': str(e)})
+
+    def _embed(self, model, payload):
+        embeddings = model.embed(
+            payload.get('texts', []),
+            pooling=payload.get('pooling', 'cls'),
+            max_length=payload.get('max_length', 128)
+        )
+        return {'embeddings': embeddings.tolist()}
+
+    def _embed_long(self, model, payload):
+        embedding = model.embed_long(
+            payload.get('text', ''),
+            max_length=payload.get('max_length', 512),
+            stride=payload.get('stride', 128)
+        )
+        return {'embedding': embedding.tolist()}
+
+    def _classify(self, model, payload):
+        return {'scores': model.classify(payload.get('text', ''), payload.get('labels', []))}
+
+    def _send_json(self, status_code, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Request logging is too noisy for an embedding server
+        pass
+
+
+def run_server(host='127.0.0.1', port=8765, warm_up=True):
+    """
+    Load the models and serve requests until interrupted.
+
+    Args:
+        host (str): Interface to bind to
+        port (int): Port to listen on
+        warm_up (bool): Load every registered model before accepting requests
+    """
+    model_registry.serve_locally()
+
+    if warm_up:
+        print(f"Warming up models: {model_registry.warm_up()}")
+
+    server = ThreadingHTTPServer((host, port), ModelServerHandler)
+    server.daemon_threads = True
+    print(f"Model server listening on http://{host}:{port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,185 @@
+"""
+Client for the optional out-of-process model server.
+
+When ML_MODEL_SERVER_URL is set, the model registry hands out remote proxies
+instead of loading transformer weights in every web worker. The proxies talk
+to the server over pooled HTTP connections and fall back to in-process
+inference whenever the server cannot be reached.
+"""
+import threading
+import time
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+
+class ModelServerUnavailable(Exception):
+    """Raised when the model server cannot be reached or returns an error"""
+
+
+class ModelServerClient:
+    """
+    Pooled HTTP client for the model server.
+    
+    After a failed request the server is considered down for retry_after
+    seconds, so callers go straight to their fallback instead of waiting on
+    connection timeouts for every request.
+    """
+    
+    def __init__(self, base_url, timeout=10, pool_size=10, retry_after=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    @property
+    def available(self):
+        """Whether requests should currently be sent to the server"""
+        return time.monotonic() >= self._down_until
+    
+    def post(self, path, payload):
+        """
+        Send a JSON request to the server.
+        
+        Args:
+            path (str): Endpoint path, such as "/embed"
+            payload (dict): JSON body
+        
+        Returns:
+            dict: Decoded JSON response
+        
+        Raises:
+            ModelServerUnavailable: If the server is down or the request failed
+        """
+        if not self.available:
+            raise ModelServerUnavailable("Model server marked unavailable")
+        
+        try:
+            response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            # Connection problems mean the server is down, so stop trying for a while
+            with self._lock:
+                self._down_until = time.monotonic() + self.retry_after
+            print(f"Model server unreachable, using in-process inference: {str(e)}")
+            raise ModelServerUnavailable(str(e))
+        
+        try:
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Model server request to {path} failed, using in-process inference: {str(e)}")
+            raise ModelServerUnavailable(str(e))
+
+
+class _RemoteModel:
+    """Base class for proxies that fall back to a locally loaded model"""
+    
+    def __init__(self, name, client, load_local):
+        self.name = name
+        self.client = client
+        self._load_local = load_local
+        self.scheduler = None
+    
+    def _local(self):
+        model = self._load_local(self.name)
+        if model is None:
+            raise RuntimeError(f"Model '{self.name}' is not available in-process")
+        return model
+
+
+class RemoteEncoder(_RemoteModel):
+    """Proxy with the TransformerEncoder interface, served by the model server"""
+    
+    def embed(self, texts, pooling="cls", max_length=128):
+        try:
+            result = self.client.post('/embed', {
+                'model': self.name,
+                'texts': list(texts),
+                'pooling': pooling,
+                'max_length': max_length
+            })
+            return np.array(result['embeddings'], dtype=np.float32)
+        except ModelServerUnavailable:
+            return self._local().embed(texts, pooling=pooling, max_length=max_length)
+    
+    def embed_long(self, text, max_length=512, stride=128):
+        try:
+            result = self.client.post('/embed_long', {
+                'model': self.name,
+                'text': text,
+                'max_length': max_length,
+                'stride': stride
+            })
+            return np.array(result['embedding'], dtype=np.float32)
+        except ModelServerUnavailable:
+            return self._local().embed_long(text, max_length=max_length, stride=stride)
+
+
+class RemoteZeroShotClassifier(_RemoteModel):
+    """Proxy with the ZeroShotClassifier interface, served by the model server"""
+    
+    def prepare_labels(self, labels):
+        # Hypotheses are tokenized and cached on the server
+        pass
+    
+    def classify(self, text, labels):
+        try:
+            result = self.client.post('/classify', {
+                'model': self.name,
+                'text': text,
+                'labels': list(labels)
+            })
+            return dict(sorted(result['scores'].items(), key=lambda item: item[1], reverse=True))
+        except ModelServerUnavailable:
+            return self._local().classify(text, labels)
+
+
+REMOTE_PROXIES = {
+    'encoder': RemoteEncoder,
+    'zero_shot': RemoteZeroShotClassifier
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def is_configured():
+    """Whether a model server URL has been configured"""
+    return bool(getattr(settings, 'ML_MODEL_SERVER_URL', ''))
+
+
+def get_client():
+    """Return the shared, pooled model server client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ModelServerClient(
+                    settings.ML_MODEL_SERVER_URL,
+                    timeout=getattr(settings, 'ML_MODEL_SERVER_TIMEOUT', 10),
+                    pool_size=getattr(settings, 'ML_MODEL_SERVER_POOL_SIZE', 10)
+                )
+    return _client
+
+
+def create_proxy(name, kind, load_local):
+    """
+    Create a remote proxy for a registered model.
+    
+    Args:
+        name (str): Registered model name
+        kind (str): "encoder" or "zero_shot"
+        load_local (callable): Loads the model in-process by name, used as fallback
+    
+    Returns:
+        A proxy exposing the same methods as the local model
+    """
+    return REMOTE_PROXIES[kind](name, get_client(), load_local)
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -8,6 +10,8 @@ class Resume(models.Model):
     file_name = models.CharField(max_length=255)
     content = models.TextField()
     file_type = models.CharField(max_length=10)  # pdf, docx, etc.
+    # SHA-256 of the uploaded file, or of the text once the content is edited
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -22,11 +26,27 @@ class JobDescription(models.Model):
     file_name = models.CharField(max_length=255, blank=True, null=True)
     content = models.TextField()
     file_type = models.CharField(max_length=10, blank=True, null=True)  # pdf, docx, txt, etc.
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)  # SHA-256 of the uploaded file
+    
+    # Near-duplicate detection: MinHash signature of the content and the copy this one duplicates
+    minhash = models.BinaryField(null=True, blank=True)
+    canonical = models.ForeignKey('self', on_delete=models.SET_NULL, related_name="duplicates", null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"{self.title} - {self.company or 'Unknown'}"
 
+class JobDescriptionBand(models.Model):
+    """Model to store the LSH band buckets of a job description's MinHash signature"""
+    job_description = models.ForeignKey(JobDescription, on_delete=models.CASCADE, related_name="bands")
+    band = models.IntegerField()
+    bucket = models.BigIntegerField()  # Hash of the signature rows in the band
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket']),
+        ]
+
 class ResumeAnalysis(models.Model):
     """Model to store the results of resume analysis"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="analyses")
@@ -37,14 +57,122 @@ class ResumeAnalysis(models.Model):
     format_suggestions = models.JSONField(default=list)
     content_suggestions = models.JSONField(default=list)
     match_score = models.IntegerField()
+    
+    # Inputs and analyzer version the result was computed from, used to serve repeat requests
+    resume_hash = models.CharField(max_length=64, blank=True, default='')
+    job_description_hash = models.CharField(max_length=64, blank=True, default='')
+    analyzer_version = models.CharField(max_length=20, blank=True, default='')
+    tier = models.CharField(max_length=10, default='full')  # Analysis tier that actually ran, see analysis_tiers
+    degraded = models.BooleanField(default=False)  # A stage fell back locally for lack of time, so it is not reused
+    result = models.JSONField(default=dict)  # Complete analysis response
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         verbose_name_plural = "Resume Analyses"
+        indexes = [
+            models.Index(fields=['resume_hash', 'job_description_hash', 'analyzer_version']),
+        ]
     
     def __str__(self):
         return f"Analysis for {self.resume.title} - {self.job_description.title}"
 
+class DocumentFeatures(models.Model):
+    """Model to store the extracted features of a resume or job description"""
+    resume = models.OneToOneField(Resume, on_delete=models.CASCADE, related_name="features", null=True, blank=True)
+    job_description = models.OneToOneField(JobDescription, on_delete=models.CASCADE, related_name="features",
+                                           null=True, blank=True)
+    
+    # Text and analyzer version the features were computed from; either changing makes them stale
+    content_hash = models.CharField(max_length=64, db_index=True)
+    analyzer_version = models.CharField(max_length=20)
+    
+    key_phrases = models.JSONField(default=list)
+    technical_skills = models.JSONField(default=list)
+    soft_skills = models.JSONField(default=list)
+    skill_ids = models.JSONField(default=list)  # Canonical keys of the technical skills
+    words = models.JSONField(default=list)  # Distinct lowercase words of the text
+    sections = models.JSONField(default=list)  # [section, header_start, start, end] character spans of the sections
+    segments = models.JSONField(default=list)  # [fingerprint, section, start, end] of the paragraphs
+    embedding = models.BinaryField(null=True, blank=True)  # float32 document embedding
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Document Features"
+    
+    def __str__(self):
+        document = self.resume or self.job_description
+        return f"Features for {document} ({self.analyzer_version})"
+
+class SegmentFeatures(models.Model):
+    """Model to store the extracted features of one paragraph, shared by every document containing it"""
+    fingerprint = models.CharField(max_length=64)  # SHA-256 of the whitespace-normalized paragraph
+    analyzer_version = models.CharField(max_length=20)
+    key_phrases = models.JSONField(default=list)
+    sentiment = models.CharField(max_length=10, blank=True, default='')  # Computed on first use
+    word_count = models.IntegerField(default=0)
+    embedding = models.BinaryField(null=True, blank=True)  # float32 mean-pooled paragraph embedding
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name_plural = "Segment Features"
+        constraints = [
+            models.UniqueConstraint(fields=['fingerprint', 'analyzer_version'], name='unique_segment_features'),
+        ]
+    
+    def __str__(self):
+        return f"Segment {self.fingerprint[:12]} ({self.analyzer_version})"
+
+class AnalysisJob(models.Model):
+    """Model to store a queued resume analysis, processed by the background workers"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="analysis_jobs")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    priority = models.IntegerField(default=0)  # Higher priorities are processed first
+    
+    # Uploaded files, stored until the job finishes
+    resume_file_name = models.CharField(max_length=255)
+    resume_file_path = models.CharField(max_length=255)
+    job_desc_file_name = models.CharField(max_length=255)
+    job_desc_file_path = models.CharField(max_length=255)
+    force = models.BooleanField(default=False)  # Recompute even if a stored analysis exists
+    tier = models.CharField(max_length=10, default='full')  # Requested analysis tier, see analysis_tiers
+    
+    # Retry and lease bookkeeping
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    available_at = models.DateTimeField()  # Not claimed before this time, used for retry backoff
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_until = models.DateTimeField(null=True, blank=True)  # Lease expiry of a running job
+    
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'available_at']),
+        ]
+    
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+    
+    def __str__(self):
+        return f"Analysis job {self.id} ({self.status})"
+
 class MockInterview(models.Model):
     """Model to store mock interview data and analysis results"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="mock_interviews")
@@ -68,7 +196,7 @@ class MockInterview(models.Model):
     
     def __str__(self):
         return f"Mock Interview: {self.title} - {self.user.username}"
-    
+
 class ChatMessage(models.Model):
     """Model to store chat messages for the interview preparation chatbot"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="chat_messages")
@@ -0,0 +1,172 @@
+"""
+Near-duplicate detection for job descriptions with MinHash and LSH.
+
+Users often save the same posting several times with small edits. Every job
+description gets a MinHash signature of its word shingles when it is saved.
+The signature is split into bands, and the hash of each band is stored as a
+JobDescriptionBand row. Two postings land in the same bucket of at least one
+band with high probability if their shingle sets are similar, so candidates
+are found with one indexed lookup instead of comparing against every stored
+posting. Candidates are confirmed by the Jaccard similarity estimated from
+the full signatures.
+
+A confirmed near-duplicate is linked to the canonical copy through
+JobDescription.canonical. Only job descriptions of the same user are
+candidates, so the link never exposes another user's posting. Its features and analyses are then reused from the
+canonical copy instead of running extraction and NLP again.
+
+With 16 bands of 8 rows, a pair with a Jaccard similarity of 0.8 becomes a
+candidate with a probability of about 95%, and one of 0.5 with about 6%.
+"""
+import hashlib
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import JobDescription, JobDescriptionBand
+
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Fixed seed, so signatures stay comparable across processes and restarts
+_generator = np.random.RandomState(1)
+PERMUTATION_A = _generator.randint(1, (1 << 61) - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+PERMUTATION_B = _generator.randint(0, (1 << 61) - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def _shingle_hashes(text):
+    """Hash the overlapping word shingles of a text to 32-bit values"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = {' '.join(words)}
+    else:
+        shingles = {' '.join(words[index:index + SHINGLE_SIZE]) for index in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.array([zlib.crc32(shingle.encode('utf-8')) for shingle in shingles], dtype=np.uint64)
+
+
+def signature(text):
+    """
+    Compute the MinHash signature of a text.
+    
+    Returns:
+        numpy.ndarray: NUM_PERMUTATIONS uint32 minimum hash values
+    """
+    hashes = _shingle_hashes(text)
+    # Every permutation is applied to all shingles at once; uint64 arithmetic wraps like the reference implementation
+    permuted = ((hashes[:, None] * PERMUTATION_A[None, :] + PERMUTATION_B[None, :]) % MERSENNE_PRIME) & MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_buckets(minhash):
+    """Hash every band of a signature to a signed 64-bit bucket id"""
+    return [
+        int.from_bytes(hashlib.blake2b(minhash[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes(),
+                                       digest_size=8).digest(), 'big', signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def estimated_similarity(minhash1, minhash2):
+    """Estimate the Jaccard similarity of two shingle sets from their signatures"""
+    return float(np.mean(minhash1 == minhash2))
+
+
+def _load_signature(value):
+    return np.frombuffer(bytes(value), dtype=np.uint32) if value else None
+
+
+def find_near_duplicates(job_description, minhash, threshold=None):
+    """
+    Find stored job descriptions that are near-duplicates of a signature.
+    
+    Args:
+        job_description (JobDescription): The job description the signature belongs to, excluded from results
+        minhash (numpy.ndarray): MinHash signature to look up
+        threshold (float, optional): Minimum estimated Jaccard similarity
+    
+    Returns:
+        list: (JobDescription, similarity) pairs of the same user's job descriptions, most similar first
+    """
+    if threshold is None:
+        threshold = getattr(settings, 'NEAR_DUPLICATE_THRESHOLD', 0.95)
+    
+    bucket_filter = Q()
+    for band, bucket in enumerate(band_buckets(minhash)):
+        bucket_filter |= Q(band=band, bucket=bucket)
+    
+    candidate_ids = set(JobDescriptionBand.objects.filter(bucket_filter)
+                        .filter(job_description__user_id=job_description.user_id)
+                        .exclude(job_description_id=job_description.pk)
+                        .values_list('job_description_id', flat=True))
+    
+    matches = []
+    for candidate in JobDescription.objects.filter(id__in=candidate_ids).only('id', 'minhash', 'canonical_id'):
+        candidate_minhash = _load_signature(candidate.minhash)
+        if candidate_minhash is None:
+            continue
+        similarity = estimated_similarity(minhash, candidate_minhash)
+        if similarity >= threshold:
+            matches.append((candidate, similarity))
+    
+    return sorted(matches, key=lambda match: (-match[1], match[0].id))
+
+
+def index_job_description(job_description):
+    """
+    Store the signature and band buckets of a job description and link it to its canonical copy.
+    
+    Args:
+        job_description (JobDescription): The job description to index
+    
+    Returns:
+        JobDescription: The canonical copy, or None if it has no near-duplicates
+    """
+    minhash = signature(job_description.content)
+    
+    # Unchanged content keeps its signature, bands and canonical copy
+    if job_description.minhash and np.array_equal(_load_signature(job_description.minhash), minhash):
+        return job_description.canonical
+    
+    JobDescriptionBand.objects.filter(job_description=job_description).delete()
+    JobDescriptionBand.objects.bulk_create([
+        JobDescriptionBand(job_description=job_description, band=band, bucket=bucket)
+        for band, bucket in enumerate(band_buckets(minhash))
+    ])
+    
+    # Link to the earliest copy, so all duplicates share one canonical job description
+    matches = find_near_duplicates(job_description, minhash)
+    canonical_id = None
+    if matches:
+        canonical_id = min(candidate.canonical_id or candidate.id for candidate, _ in matches)
+        if canonical_id == job_description.pk:
+            canonical_id = None
+    
+    # Queryset update, so the post_save receiver does not run again
+    JobDescription.objects.filter(pk=job_description.pk).update(minhash=minhash.tobytes(), canonical_id=canonical_id)
+    job_description.minhash = minhash.tobytes()
+    job_description.canonical_id = canonical_id
+    return job_description.canonical
+
+
+@receiver(post_save, sender=JobDescription)
+def index_on_save(sender, instance, raw=False, **kwargs):
+    """Index every saved job description for near-duplicate detection"""
+    if raw:
+        return
+    try:
+        index_job_description(instance)
+    except Exception as e:
+        # Duplicate detection is an optimization, so the save must not fail
+        print(f"Error indexing job description {instance.pk} for near-duplicates: {str(e)}")
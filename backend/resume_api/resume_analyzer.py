@@ -1,23 +1,42 @@
 import os
 import json
 import re
-from difflib import SequenceMatcher
 import PyPDF2
 import docx
 import tempfile
+import numpy as np
+
+from django.conf import settings
 
 # Import Azure services clients
 from . import azure_language_client
 from . import azure_vision_client
+from . import analysis_tiers
+from . import deadlines
+from . import kwic_index
+from . import section_index
+from . import skill_taxonomy
+from . import tfidf_index
+
+# Map free-form key phrases to taxonomy skills through the taxonomy embedding index
+SEMANTIC_SKILLS_ENABLED = getattr(settings, 'ML_SEMANTIC_SKILLS_ENABLED', False)
+
+# Bump whenever a change alters analysis results; stored analyses of other versions are recomputed
+ANALYZER_VERSION = "2.4"
 
 class ResumeAnalyzer:
     """
     A class to analyze resumes in comparison with job descriptions
     and provide tailoring suggestions using Azure AI services.
+    
+    Args:
+        tier (str, optional): Analysis tier, full by default; run the analysis within
+            analysis_tiers.tier_deadline() to bound it by the tier's budget
     """
     
-    def __init__(self):
+    def __init__(self, tier=None):
         self.similarity_threshold = 0.6  # Threshold for considering keywords similar
+        self.tier_run = analysis_tiers.TierRun(tier or analysis_tiers.FULL)
     
     def extract_text_from_file(self, file_content, file_type):
         """
@@ -34,6 +53,8 @@ class ResumeAnalyzer:
         
         # For PDF files, use Azure Computer Vision if we can, otherwise fall back to PyPDF2
         if file_type == 'pdf':
+            if not self.tier_run.allows(analysis_tiers.FULL, 'ocr'):
+                return self._extract_text_from_pdf_with_pypdf2(file_content)
             try:
                 # Try using Azure Computer Vision first
                 extracted_text = azure_vision_client.extract_text_from_pdf(file_content)
@@ -59,6 +80,9 @@ class ResumeAnalyzer:
         
         # For image files, use Azure Computer Vision
         elif file_type in ['jpg', 'jpeg', 'png', 'bmp', 'gif']:
+            # Images have no local alternative to OCR
+            if not self.tier_run.allows(analysis_tiers.FULL, 'ocr'):
+                return "Error: Could not extract text from the provided image file."
             try:
                 return azure_vision_client.extract_text_from_image(file_content)
             except Exception as e:
@@ -119,13 +143,38 @@ class ResumeAnalyzer:
             print(f"DOCX extraction error: {str(e)}")
             return "Error: Could not extract text from the provided DOCX file."
     
-    def analyze_resume_and_job_description(self, resume_text, job_desc_text):
+    def featurize(self, text, key_phrases=None):
+        """
+        Extract the features of a document that do not depend on the document it is compared with.
+        
+        Args:
+            text (str): The text content of a resume or job description
+            key_phrases (list, optional): Key phrases of the document, if already extracted
+        
+        Returns:
+            dict: The key phrases, technical skills and soft skills of the document
+        """
+        # Extract key phrases using Azure Language Service, in the full tier only
+        if key_phrases is None:
+            key_phrases = (azure_language_client.extract_key_phrases(text)
+                           if self.tier_run.allows(analysis_tiers.FULL, 'key phrases') else [])
+        
+        return {
+            "key_phrases": key_phrases,
+            "technical_skills": self._extract_technical_skills(key_phrases, text),
+            "soft_skills": self._extract_soft_skills(text)
+        }
+    
+    def analyze_resume_and_job_description(self, resume_text, job_desc_text, resume_features=None, job_features=None):
         """
         Analyze a resume against a job description and provide tailoring suggestions.
         
         Args:
             resume_text (str): The text content of the resume
             job_desc_text (str): The text content of the job description
+            resume_features (dict, optional): Precomputed featurize() output for the resume,
+                optionally with its "sentiment" analysis
+            job_features (dict, optional): Precomputed featurize() output for the job description
             
         Returns:
             dict: A dictionary containing analysis results and suggestions
@@ -134,28 +183,37 @@ class ResumeAnalyzer:
         if resume_text.startswith("Error:") or job_desc_text.startswith("Error:"):
             return self._generate_error_response(resume_text, job_desc_text)
         
-        # Extract key phrases from both documents using Azure Language Service
-        resume_key_phrases = azure_language_client.extract_key_phrases(resume_text)
-        job_key_phrases = azure_language_client.extract_key_phrases(job_desc_text)
+        # Extract key phrases and skills from both documents unless they are already known
+        if resume_features is None:
+            resume_features = self.featurize(resume_text)
+        if job_features is None:
+            job_features = self.featurize(job_desc_text)
         
-        # Analyze the extracted key phrases for technical skills, qualifications, etc.
-        technical_skills_in_job = self._extract_technical_skills(job_key_phrases, job_desc_text)
-        technical_skills_in_resume = self._extract_technical_skills(resume_key_phrases, resume_text)
+        technical_skills_in_job = job_features["technical_skills"]
+        technical_skills_in_resume = resume_features["technical_skills"]
+        soft_skills_in_job = job_features["soft_skills"]
+        soft_skills_in_resume = resume_features["soft_skills"]
         
-        # Identify soft skills in both documents
-        soft_skills_in_job = self._extract_soft_skills(job_desc_text)
-        soft_skills_in_resume = self._extract_soft_skills(resume_text)
+        # Compare every job skill with every resume skill once; the matches are
+        # symmetric, so the same matrices also give the resume skills without a match
+        tech_matches = self._find_similar_terms(technical_skills_in_job, technical_skills_in_resume)
+        soft_matches = self._find_similar_terms(soft_skills_in_job, soft_skills_in_resume)
         
         # Find keywords missing from the resume but present in the job description
-        missing_technical_skills = [skill for skill in technical_skills_in_job 
-                                    if not self._has_similar_term(skill, technical_skills_in_resume)]
+        missing_technical_skills = [skill for skill, matches in zip(technical_skills_in_job, tech_matches)
+                                    if not matches.any()]
+        
+        missing_soft_skills = [skill for skill, matches in zip(soft_skills_in_job, soft_matches)
+                               if not matches.any()]
         
-        missing_soft_skills = [skill for skill in soft_skills_in_job 
-                               if not self._has_similar_term(skill, soft_skills_in_resume)]
+        # Quote the job description sentence of every job skill, matched or missing, from one index of its text
+        keyword_contexts = kwic_index.build(job_desc_text).snippets(technical_skills_in_job + soft_skills_in_job)
         
         # Analyze resume sentiment using Azure Text Analytics
-        sentiment_analysis = azure_language_client.analyze_sentiment(resume_text)
-        print("Sentiment Analysis Result from Azure:", sentiment_analysis)
+        sentiment_analysis = resume_features.get("sentiment")
+        if sentiment_analysis is None and self.tier_run.allows(analysis_tiers.FULL, 'sentiment'):
+            sentiment_analysis = azure_language_client.analyze_sentiment(resume_text)
+            print("Sentiment Analysis Result from Azure:", sentiment_analysis)
         
         # Ensure the sentiment analysis object has the expected structure
         if not sentiment_analysis or not isinstance(sentiment_analysis, dict):
@@ -167,21 +225,24 @@ class ResumeAnalyzer:
         keywords_to_add = missing_technical_skills + missing_soft_skills
         
         # Find keywords in the resume that are not relevant to the job description
-        keywords_to_remove = [skill for skill in technical_skills_in_resume 
-                              if not self._has_similar_term(skill, technical_skills_in_job)]
+        keywords_to_remove = [skill for skill, matches in zip(technical_skills_in_resume, tech_matches.T)
+                              if not matches.any()]
         
-        # Generate content suggestions based on analysis
+        # Generate content suggestions based on analysis, reading sections from the resume's section index
         content_suggestions = self._generate_content_suggestions(
             resume_text, job_desc_text, 
             technical_skills_in_resume, technical_skills_in_job,
-            keywords_to_add
+            keywords_to_add,
+            resume_sections=section_index.from_features(resume_features, resume_text),
+            keyword_contexts=keyword_contexts
         )
         
         # Calculate match score
         match_score = self._calculate_match_score(
             resume_text, job_desc_text,
             technical_skills_in_resume, technical_skills_in_job,
-            soft_skills_in_resume, soft_skills_in_job
+            soft_skills_in_resume, soft_skills_in_job,
+            tech_matches=tech_matches, soft_matches=soft_matches
         )
         
         # Return the analysis results
@@ -200,7 +261,10 @@ class ResumeAnalyzer:
                 "inResume": soft_skills_in_resume,
                 "missing": missing_soft_skills
             },
-            "sentimentAnalysis": sentiment_analysis
+            "keywordContexts": keyword_contexts,
+            "sentimentAnalysis": sentiment_analysis,
+            "tier": self.tier_run.tier,
+            "degraded": deadlines.degraded()
         }
     
     def _generate_error_response(self, resume_text, job_desc_text):
@@ -218,9 +282,12 @@ class ResumeAnalyzer:
             "matchScore": 0,
             "technicalSkillsMatch": {"inJob": [], "inResume": [], "missing": []},
             "softSkillsMatch": {"inJob": [], "inResume": [], "missing": []},
+            "keywordContexts": {},
             "sentimentAnalysis": {
                 "sentiment": "neutral"
-            }
+            },
+            "tier": self.tier_run.tier,
+            "degraded": deadlines.degraded()
         }
     
     def _extract_technical_skills(self, key_phrases, full_text):
@@ -234,83 +301,9 @@ class ResumeAnalyzer:
         Returns:
             list: A list of identified technical skills
         """
-        # Expanded list of common technical skills by domain/category
-        tech_skills_database = {
-            "programming_languages": [
-                'python', 'java', 'javascript', 'js', 'typescript', 'ts', 'c#', 'c++', 'c', 'go', 'golang',
-                'ruby', 'scala', 'kotlin', 'swift', 'objective-c', 'php', 'perl', 'r', 'matlab', 'rust', 
-                'dart', 'haskell', 'groovy', 'bash', 'powershell', 'lua', 'cobol', 'fortran'
-            ],
-            
-            "web_tech": [
-                'html', 'css', 'sass', 'less', 'bootstrap', 'tailwind', 'material ui', 'responsive design',
-                'rest', 'restful', 'graphql', 'soap', 'ajax', 'json', 'xml', 'jwt', 'oauth', 'ssr', 'webpack',
-                'babel', 'styled-components', 'css modules', 'cors', 'grpc', 'http', 'https', 'sse', 'websocket'
-            ],
-            
-            "frontend_frameworks": [
-                'react', 'reactjs', 'angular', 'angularjs', 'vue', 'vuejs', 'redux', 'svelte', 'next.js',
-                'nuxt.js', 'gatsby', 'ember', 'jquery', 'backbone.js', 'lit', 'solid.js'
-            ],
-            
-            "backend_frameworks": [
-                'express', 'django', 'flask', 'spring', 'spring boot', 'rails', 'ruby on rails', 'asp.net',
-                'laravel', 'symfony', 'fastapi', 'nest.js', 'gin', 'phoenix', 'play', 'quarkus', 'sails.js',
-                'strapi', 'meteor'
-            ],
-            
-            "mobile": [
-                'android', 'ios', 'swift', 'flutter', 'react native', 'xamarin', 'ionic', 'kotlin', 'swiftui',
-                'uikit', 'jetpack compose', 'android studio', 'xcode', 'objective-c', 'mobile development'
-            ],
-            
-            "databases": [
-                'sql', 'mysql', 'postgresql', 'oracle', 'mongodb', 'cassandra', 'redis', 'sqlite',
-                'dynamodb', 'couchdb', 'firebase', 'neo4j', 'elasticsearch', 'mariadb', 'cosmosdb',
-                'nosql', 'rdbms', 'sql server', 'mssql', 'oledb', 'jdbc', 'odbc', 'erd'
-            ],
-            
-            "cloud_providers": [
-                'aws', 'amazon web services', 'azure', 'microsoft azure', 'gcp', 'google cloud', 'heroku',
-                'digital ocean', 'ibm cloud', 'openstack', 'alibaba cloud', 'tencent cloud', 'oracle cloud',
-                'linode', 'cloudflare'
-            ],
-            
-            "devops": [
-                'docker', 'kubernetes', 'k8s', 'terraform', 'jenkins', 'github actions', 'gitlab ci',
-                'circleci', 'travis ci', 'ansible', 'puppet', 'chef', 'ci/cd', 'github', 'gitlab',
-                'bitbucket', 'prometheus', 'grafana', 'elk', 'istio', 'helm', 'openshift'
-            ],
-            
-            "data_science": [
-                'pandas', 'numpy', 'scikit-learn', 'scipy', 'matplotlib', 'tensorflow', 'pytorch', 'keras',
-                'machine learning', 'ml', 'deep learning', 'dl', 'neural networks', 'cnn', 'rnn', 'lstm',
-                'computer vision', 'cv', 'nlp', 'natural language processing', 'ai', 'artificial intelligence',
-                'data mining', 'big data', 'spark', 'hadoop', 'mapreduce', 'tableau', 'power bi'
-            ],
-            
-            "version_control": [
-                'git', 'github', 'gitlab', 'bitbucket', 'svn', 'subversion', 'mercurial', 'git flow',
-                'version control'
-            ],
-            
-            "methodologies": [
-                'agile', 'scrum', 'kanban', 'waterfall', 'tdd', 'bdd', 'xp', 'lean', 'devops',
-                'ci/cd', 'sre', 'site reliability engineering', 'itil'
-            ],
-            
-            "tools": [
-                'vscode', 'visual studio', 'intellij', 'pycharm', 'eclipse', 'atom', 'sublime text',
-                'notepad++', 'postman', 'insomnia', 'jira', 'confluence', 'slack', 'trello', 'notion',
-                'figma', 'sketch', 'adobe xd', 'photoshop', 'illustrator'
-            ]
-        }
+        # Common technical skills from the shared taxonomy
+        common_tech_skills = skill_taxonomy.COMMON_TECH_SKILLS
         
-        # Combine all categories for a flat list
-        common_tech_skills = []
-        for category, skills in tech_skills_database.items():
-            common_tech_skills.extend(skills)
-
         # Extract potential technical skills from key phrases
         tech_skills = []
         
@@ -339,6 +332,13 @@ class ResumeAnalyzer:
                 if phrase not in tech_skills:
                     tech_skills.append(phrase)
         
+        # Map the remaining key phrases to canonical taxonomy skills by embedding similarity
+        if (SEMANTIC_SKILLS_ENABLED and key_phrases
+                and self.tier_run.allows(analysis_tiers.STANDARD, 'semantic skills')):
+            for skill in skill_taxonomy.map_phrases_to_skills(key_phrases).values():
+                if skill not in tech_skills:
+                    tech_skills.append(skill)
+        
         # Look for common technology patterns
         tech_patterns = [
             # Databases with specific versions or contexts
@@ -410,31 +410,50 @@ class ResumeAnalyzer:
         Returns:
             bool: True if a similar term is found, False otherwise
         """
+        return bool(self._find_similar_terms([term], term_list, threshold, is_tech_skill).any())
+    
+    def _find_similar_terms(self, terms, term_list, threshold=None, is_tech_skill=True):
+        """
+        Check every term against every term in the list using contextual similarity.
+        
+        Args:
+            terms (list): The terms to check
+            term_list (list): The list of terms to check against
+            threshold (float, optional): The similarity threshold. Defaults to the class threshold.
+            is_tech_skill (bool): Whether this is a technical skill comparison
+            
+        Returns:
+            numpy.ndarray: Boolean matrix, True where terms[i] is similar to term_list[j]
+        """
         if threshold is None:
             threshold = self.similarity_threshold
         
-        term_lower = term.lower()
-        
-        # Check for exact matches first (fastest check)
-        if term_lower in [t.lower() for t in term_list]:
-            return True
-        
-        # Check if the term is a substring of any term in the list (still fast)
-        for list_term in term_list:
-            list_term_lower = list_term.lower()
-            if term_lower in list_term_lower or list_term_lower in term_lower:
-                # If one is a substring of the other, check if they're close enough in length
-                if len(min(term_lower, list_term_lower, key=len)) / len(max(term_lower, list_term_lower, key=len)) > threshold:
-                    return True
-        
-        # Use enhanced similarity check for technical skills
-        for list_term in term_list:
-            # Calculate contextual similarity using improved method
-            similarity = azure_language_client.calculate_text_similarity(term, list_term, is_tech_skill=is_tech_skill)
-            if similarity > threshold:
-                return True
-        
-        return False
+        matches = np.zeros((len(terms), len(term_list)), dtype=bool)
+        if not terms or not term_list:
+            return matches
+        
+        terms_lower = [term.lower() for term in terms]
+        list_terms_lower = [list_term.lower() for list_term in term_list]
+        
+        # Exact and substring matches need no embeddings; if one term is a
+        # substring of the other, they must be close enough in length
+        for row, term_lower in enumerate(terms_lower):
+            for column, list_term_lower in enumerate(list_terms_lower):
+                if term_lower == list_term_lower:
+                    matches[row, column] = True
+                elif term_lower in list_term_lower or list_term_lower in term_lower:
+                    shorter, longer = sorted((len(term_lower), len(list_term_lower)))
+                    matches[row, column] = shorter / longer > threshold
+        
+        # Contextual similarity of all pairs from one batched similarity matrix; below
+        # the standard tier, only acronyms and variants from the canonicalization tables
+        if self.tier_run.allows(analysis_tiers.STANDARD, 'skill matching'):
+            similarity = azure_language_client.calculate_similarity_matrix(terms, term_list, is_tech_skill=is_tech_skill,
+                                                                           threshold=threshold)
+        else:
+            similarity = azure_language_client.calculate_lexical_similarity_matrix(terms, term_list,
+                                                                                   is_tech_skill=is_tech_skill)
+        return matches | (similarity > threshold)
     
     def _identify_irrelevant_keywords(self, resume_skills, job_skills, job_desc_text):
         """
@@ -472,7 +491,8 @@ class ResumeAnalyzer:
         
         return irrelevant_keywords
     
-    def _generate_content_suggestions(self, resume_text, job_desc_text, resume_skills, job_skills, keywords_to_add):
+    def _generate_content_suggestions(self, resume_text, job_desc_text, resume_skills, job_skills, keywords_to_add,
+                                      resume_sections=None, keyword_contexts=None):
         """
         Generate content suggestions for the resume using pretrained language models.
         
@@ -482,46 +502,45 @@ class ResumeAnalyzer:
             resume_skills (list): The skills found in the resume
             job_skills (list): The skills found in the job description
             keywords_to_add (list): The keywords to add to the resume
-            
+            resume_sections (SectionIndex, optional): Sections of the resume, built from its text if not given
+            keyword_contexts (dict, optional): Job description sentence of each keyword, looked up if not given
+        
         Returns:
             list: A list of content suggestions
         """
+        if not deadlines.check('content suggestions'):
+            return self._fallback_suggestions(keywords_to_add)
+        
         suggestions = []
         
         try:
             # Use Azure Language Service to generate more sophisticated content suggestions
             # This now leverages the pre-trained models through Azure services
             
-            # First, analyze the resume and job description for key information
-            resume_phrases = azure_language_client.extract_key_phrases(resume_text)
-            job_phrases = azure_language_client.extract_key_phrases(job_desc_text)
-            
             # Use text similarity to find missing important content
             relevant_achievements = []
             achievements_context = "achievements accomplishments results impact outcomes success metrics"
             
+            # Semantic checks need BERT, which the fast tier skips
+            semantic = self.tier_run.allows(analysis_tiers.STANDARD, 'suggestions')
+            
             # Check if resume seems achievement-oriented using semantic analysis
-            has_achievements = azure_language_client.calculate_text_similarity(resume_text, achievements_context) > 0.3
+            has_achievements = (not semantic or
+                                azure_language_client.calculate_text_similarity(resume_text, achievements_context) > 0.3)
             
             if not has_achievements:
                 suggestions.append("Your resume lacks achievement-oriented language. Add quantifiable results and outcomes for your experiences.")
             
-            # Add specific suggestions based on missing keywords
+            # Add specific suggestions for every missing keyword the job description mentions
             if keywords_to_add:
-                # Get top 3 most important missing keywords for detailed suggestions
-                top_keywords = keywords_to_add[:3]
+                if keyword_contexts is None:
+                    keyword_contexts = kwic_index.build(job_desc_text).snippets(keywords_to_add)
                 
-                for keyword in top_keywords:
-                    # Generate a context-aware suggestion using content from both resume and job description
-                    if keyword in job_desc_text.lower():
-                        # Find surrounding context for this keyword in job description
-                        keyword_index = job_desc_text.lower().find(keyword.lower())
-                        start_index = max(0, keyword_index - 100)
-                        end_index = min(len(job_desc_text), keyword_index + 100)
-                        keyword_context = job_desc_text[start_index:end_index]
-                        
-                        # Use language model to generate personalized suggestion
-                        suggestions.append(f"Add details about your experience with '{keyword}'. The job description specifically mentions this skill in the context of: '{keyword_context.strip()}'")
+                for keyword in keywords_to_add:
+                    # Generate a context-aware suggestion quoting the sentence of the job description that mentions it
+                    keyword_context = keyword_contexts.get(keyword)
+                    if keyword_context:
+                        suggestions.append(f"Add details about your experience with '{keyword}'. The job description specifically mentions this skill in the context of: '{keyword_context}'")
             
             # Check for active vs. passive voice using language analysis
             result = azure_language_client.analyze_text_quality(resume_text)
@@ -537,8 +556,10 @@ class ResumeAnalyzer:
                         suggestions.append(f"Replace passive phrase '{example['original']}' with active alternative like '{example['suggestion']}'")
             
             # Suggest more impactful statements for experience sections
-            experience_section = self._extract_section(resume_text, ["experience", "work experience", "employment"])
-            if experience_section:
+            if resume_sections is None:
+                resume_sections = section_index.build(resume_text)
+            experience_section = resume_sections.text(resume_text, "experience")
+            if experience_section and semantic:
                 impact_score = azure_language_client.calculate_text_similarity(experience_section, "achieved improved increased decreased launched created managed led")
                 if impact_score < 0.4:
                     suggestions.append("Enhance your experience descriptions with more impactful action verbs like 'achieved', 'improved', 'increased', 'launched' or 'led'.")
@@ -561,45 +582,24 @@ class ResumeAnalyzer:
         except Exception as e:
             print(f"Error generating content suggestions with Azure ML models: {str(e)}")
             # Fallback to basic suggestions if there's an error
-            suggestions = [
-                "Tailor your resume to highlight skills and experiences relevant to the job description.",
-                "Use numbers and metrics to quantify your achievements and responsibilities.",
-                "Focus on results and accomplishments rather than just listing duties."
-            ]
-            
-            if keywords_to_add:
-                suggestions.append(f"Add relevant keywords such as: {', '.join(keywords_to_add[:5])}.")
+            suggestions = self._fallback_suggestions(keywords_to_add)
         
         return suggestions
     
-    def _extract_section(self, text, section_names):
-        """
-        Extract a specific section from resume text.
-        
-        Args:
-            text (str): The resume text
-            section_names (list): Possible names of the section to extract
-            
-        Returns:
-            str: The extracted section text, or empty string if not found
-        """
-        for section_name in section_names:
-            # Various formatting patterns for section headers
-            patterns = [
-                fr'\b{section_name}\s*:?\s*\n(.*?)(?:\n\s*\n|\n\s*[A-Z]|\Z)',
-                fr'\b{section_name.upper()}\s*:?\s*\n(.*?)(?:\n\s*\n|\n\s*[A-Z]|\Z)',
-                fr'\b{section_name.title()}\s*:?\s*\n(.*?)(?:\n\s*\n|\n\s*[A-Z]|\Z)'
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-                if match:
-                    return match.group(1).strip()
+    def _fallback_suggestions(self, keywords_to_add):
+        """Basic content suggestions, used when the tailored ones cannot be generated"""
+        suggestions = [
+            "Tailor your resume to highlight skills and experiences relevant to the job description.",
+            "Use numbers and metrics to quantify your achievements and responsibilities.",
+            "Focus on results and accomplishments rather than just listing duties."
+        ]
         
-        return ""
+        if keywords_to_add:
+            suggestions.append(f"Add relevant keywords such as: {', '.join(keywords_to_add[:5])}.")
+        return suggestions
     
     def _calculate_match_score(self, resume_text, job_desc_text, resume_tech_skills, job_tech_skills, 
-                             resume_soft_skills, job_soft_skills):
+                             resume_soft_skills, job_soft_skills, tech_matches=None, soft_matches=None):
         """
         Calculate a match score between resume and job description.
         
@@ -610,6 +610,8 @@ class ResumeAnalyzer:
             job_tech_skills (list): Technical skills from the job description
             resume_soft_skills (list): Soft skills from the resume
             job_soft_skills (list): Soft skills from the job description
+            tech_matches (numpy.ndarray, optional): Precomputed job x resume technical skill matches
+            soft_matches (numpy.ndarray, optional): Precomputed job x resume soft skill matches
             
         Returns:
             int: A match score from 0-100
@@ -618,35 +620,28 @@ class ResumeAnalyzer:
         
         # 1. Technical skills match (50% of total score)
         if job_tech_skills:
-            tech_matches = sum(1 for skill in job_tech_skills 
-                             if self._has_similar_term(skill, resume_tech_skills))
-            tech_score = min(100, int((tech_matches / len(job_tech_skills)) * 100))
+            if tech_matches is None:
+                tech_matches = self._find_similar_terms(job_tech_skills, resume_tech_skills)
+            tech_match_count = int(tech_matches.any(axis=1).sum())
+            tech_score = min(100, int((tech_match_count / len(job_tech_skills)) * 100))
             score_components.append(tech_score * 0.5)
         else:
             score_components.append(50)  # Default if no tech skills found
         
         # 2. Soft skills match (20% of total score)
         if job_soft_skills:
-            soft_matches = sum(1 for skill in job_soft_skills 
-                             if self._has_similar_term(skill, resume_soft_skills))
-            soft_score = min(100, int((soft_matches / len(job_soft_skills)) * 100))
+            if soft_matches is None:
+                soft_matches = self._find_similar_terms(job_soft_skills, resume_soft_skills)
+            soft_match_count = int(soft_matches.any(axis=1).sum())
+            soft_score = min(100, int((soft_match_count / len(job_soft_skills)) * 100))
             score_components.append(soft_score * 0.2)
         else:
             score_components.append(20)  # Default if no soft skills found
         
         # 3. Overall text similarity (30% of total score)
-        # Calculate Jaccard similarity between the job description and resume
-        job_words = set(re.findall(r'\b\w+\b', job_desc_text.lower()))
-        resume_words = set(re.findall(r'\b\w+\b', resume_text.lower()))
-        
-        intersection = len(job_words.intersection(resume_words))
-        union = len(job_words.union(resume_words))
-        
-        if union > 0:
-            jaccard_similarity = (intersection / union) * 100
-            score_components.append(min(100, int(jaccard_similarity)) * 0.3)
-        else:
-            score_components.append(0)
+        # Cosine similarity of the TF-IDF vectors, weighted by the stored resume and job corpus
+        text_similarity = tfidf_index.similarity_matrix([job_desc_text], [resume_text])[0, 0] * 100
+        score_components.append(min(100, int(text_similarity)) * 0.3)
         
         # Calculate the final score and ensure it's between 0 and 100
         final_score = min(100, max(0, int(sum(score_components))))
@@ -0,0 +1,261 @@
+"""
+Index of all stored resumes for screening them against a job description.
+
+Per-pair analysis compares skills with BERT and string similarity, which is
+far too slow for a pool of thousands of resumes. The index instead keys every
+resume skill by its canonical form and keeps:
+
+- A sparse resume x skill matrix. Its columns are the inverted index from a
+  canonical skill to the resumes that list it, and the number of a job's
+  skills each resume covers is one sparse matrix-vector product.
+- A sparse resume x term count matrix, weighted with the current corpus IDF
+  when scoring, so the TF-IDF similarity of every resume to the job is one
+  sparse matrix-vector product. This is the text similarity the analyzer and
+  the job ranking use.
+
+The index lives in process memory and is refreshed lazily: rows of resumes
+created or edited since the last use are rebuilt and deleted ones dropped,
+while unchanged rows are kept. Skills are read from the feature store and
+never computed with Azure or BERT here, since the ranking runs inside a
+request; the featurize_documents command fills the store. A resume without
+current stored features gets a row with its locally extracted skills, and is
+rebuilt on the first refresh after its features are stored.
+"""
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from . import analysis_tiers
+from . import canonicalization
+from . import document_features
+from . import tfidf_index
+from .models import Resume, DocumentFeatures
+from .resume_analyzer import ResumeAnalyzer, ANALYZER_VERSION
+
+TECH_WEIGHT = 0.5
+SOFT_WEIGHT = 0.2
+TEXT_WEIGHT = 0.3
+
+
+class ResumeIndex:
+    """
+    Skill and term count matrices of a set of resumes, one row per resume.
+    
+    Args:
+        resume_ids (list): Resume ids, in row order
+        versions (dict): Resume id mapped to the updated_at its row was built from,
+            for rows built from current stored features
+        pending (dict): Resume id mapped to the (updated_at, content hash) its row was
+            built from, for rows built without stored features
+        rows (dict): Resume id mapped to its (technical skill keys, soft skill keys, term counts)
+    """
+    
+    def __init__(self, resume_ids, versions, pending, rows):
+        self.resume_ids = np.array(resume_ids, dtype=np.int64)
+        self.versions = versions
+        self.pending = pending
+        self.rows = rows
+        
+        self.tech_vocabulary = {}
+        self.soft_vocabulary = {}
+        self.tech_matrix = self._skill_matrix(resume_ids, 0, self.tech_vocabulary)
+        self.soft_matrix = self._skill_matrix(resume_ids, 1, self.soft_vocabulary)
+        
+        if resume_ids:
+            self.term_counts = sparse.vstack([rows[resume_id][2] for resume_id in resume_ids], format='csr')
+        else:
+            self.term_counts = sparse.csr_matrix((0, tfidf_index.N_FEATURES))
+    
+    def _skill_matrix(self, resume_ids, field, vocabulary):
+        """Build the sparse resume x skill indicator matrix of one kind of skills"""
+        row_indices, column_indices = [], []
+        for row, resume_id in enumerate(resume_ids):
+            for key in self.rows[resume_id][field]:
+                row_indices.append(row)
+                column_indices.append(vocabulary.setdefault(key, len(vocabulary)))
+        
+        # Column-compressed, so a column slice is the posting list of a skill
+        return sparse.csc_matrix(
+            (np.ones(len(row_indices), dtype=np.float32), (row_indices, column_indices)),
+            shape=(len(resume_ids), len(vocabulary))
+        )
+    
+    def __len__(self):
+        return len(self.resume_ids)
+    
+    def _coverage(self, matrix, vocabulary, job_keys):
+        """Percentage of the job's skills each resume lists, or None if the job lists none"""
+        if not job_keys:
+            return None
+        
+        # Skills no resume lists have no column but still count for the job
+        columns = [vocabulary[key] for key in job_keys if key in vocabulary]
+        query = np.zeros(matrix.shape[1], dtype=np.float32)
+        query[columns] = 1
+        return np.floor(100 * (matrix @ query) / len(job_keys))
+    
+    def score(self, job_features, job_text):
+        """
+        Score every resume in the index against a job description.
+        
+        Args:
+            job_features (dict): document_features output for the job description
+            job_text (str): Text of the job description
+        
+        Returns:
+            dict: "total" scores from 0-100 and the "technicalSkills", "softSkills"
+                and "textSimilarity" components, one entry per row
+        """
+        tech_keys = set(job_features["skill_ids"])
+        soft_keys = set(canonicalization.canonical_skill(skill) for skill in job_features["soft_skills"])
+        
+        tech = self._coverage(self.tech_matrix, self.tech_vocabulary, tech_keys)
+        soft = self._coverage(self.soft_matrix, self.soft_vocabulary, soft_keys)
+        
+        statistics = tfidf_index.get_statistics()
+        similarity = statistics.weight(self.term_counts) @ statistics.transform([job_text]).T
+        text = np.floor(np.clip(similarity.toarray()[:, 0], 0.0, 1.0) * 100)
+        
+        # Jobs without skills of a kind give every resume the full weight for it, like the analyzer
+        total = (
+            (tech * TECH_WEIGHT if tech is not None else 100 * TECH_WEIGHT) +
+            (soft * SOFT_WEIGHT if soft is not None else 100 * SOFT_WEIGHT) +
+            text * TEXT_WEIGHT
+        )
+        return {
+            "total": np.clip(total.astype(int), 0, 100),
+            "technicalSkills": tech,
+            "softSkills": soft,
+            "textSimilarity": text
+        }
+
+
+class RankedResumes:
+    """
+    Resumes ordered by score, materialized lazily so a paginator only builds the requested page.
+    """
+    
+    def __init__(self, index, scores):
+        self.index = index
+        self.scores = scores
+        # Stable sort keeps equal scores in resume id order
+        self.order = np.argsort(-scores["total"], kind='stable')
+    
+    def __len__(self):
+        return len(self.order)
+    
+    def count(self):
+        return len(self.order)
+    
+    def _entry(self, row):
+        def component(name):
+            values = self.scores[name]
+            return int(values[row]) if values is not None else None
+        
+        return {
+            "resumeId": int(self.index.resume_ids[row]),
+            "matchScore": int(self.scores["total"][row]),
+            "scoreBreakdown": {
+                "technicalSkills": component("technicalSkills"),
+                "softSkills": component("softSkills"),
+                "textSimilarity": component("textSimilarity")
+            }
+        }
+    
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._entry(row) for row in self.order[item]]
+        return self._entry(self.order[item])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _index_row(features, term_counts):
+    return (
+        set(features["skill_ids"]),
+        set(canonicalization.canonical_skill(skill) for skill in features["soft_skills"]),
+        term_counts
+    )
+
+
+def get_index():
+    """
+    Get the resume index, refreshing the rows of resumes changed since it was built.
+    
+    Returns:
+        ResumeIndex: The index of all stored resumes
+    """
+    global _index
+    
+    with _index_lock:
+        current = dict(Resume.objects.values_list('id', 'updated_at'))
+        previous_versions = _index.versions if _index is not None else {}
+        previous_pending = _index.pending if _index is not None else {}
+        previous_rows = _index.rows if _index is not None else {}
+        
+        # Rows built without stored features are rebuilt once their features are stored
+        stored_hashes = {}
+        if previous_pending:
+            stored_hashes = dict(DocumentFeatures.objects.filter(
+                resume__isnull=False, analyzer_version=ANALYZER_VERSION).values_list('resume_id', 'content_hash'))
+        
+        def is_current(resume_id, updated_at):
+            if resume_id in previous_versions:
+                return previous_versions[resume_id] == updated_at
+            if resume_id in previous_pending:
+                pending_updated_at, text_hash = previous_pending[resume_id]
+                return pending_updated_at == updated_at and stored_hashes.get(resume_id) != text_hash
+            return False
+        
+        changed_ids = [resume_id for resume_id, updated_at in current.items() if not is_current(resume_id, updated_at)]
+        if _index is not None and not changed_ids and len(current) == len(_index):
+            return _index
+        
+        rows = {resume_id: row for resume_id, row in previous_rows.items() if resume_id in current}
+        unchanged = set(current) - set(changed_ids)
+        versions = {resume_id: updated_at for resume_id, updated_at in previous_versions.items()
+                    if resume_id in unchanged}
+        pending = {resume_id: version for resume_id, version in previous_pending.items() if resume_id in unchanged}
+        
+        resumes = list(Resume.objects.filter(id__in=changed_ids).only('id', 'content', 'updated_at'))
+        records = {record.resume_id: record for record in DocumentFeatures.objects.filter(
+            resume__in=resumes, analyzer_version=ANALYZER_VERSION)}
+        term_counts = tfidf_index.get_statistics().count_terms([resume.content for resume in resumes])
+        
+        # Resumes without current stored features get their skills from the local lexical pass only
+        local_analyzer = ResumeAnalyzer(tier=analysis_tiers.FAST)
+        local_count = 0
+        for row, resume in enumerate(resumes):
+            record = records.get(resume.id)
+            text_hash = document_features.content_hash(resume.content)
+            if record is not None and record.content_hash == text_hash:
+                features = document_features._record_to_features(record)
+                versions[resume.id] = resume.updated_at
+            else:
+                features = document_features.local_features(resume.content, local_analyzer)
+                pending[resume.id] = (resume.updated_at, text_hash)
+                local_count += 1
+            rows[resume.id] = _index_row(features, term_counts[row])
+        print(f"Resume index: indexed {len(resumes)} resumes, {local_count} without stored features, "
+              f"reused {len(rows) - len(resumes)}")
+        
+        _index = ResumeIndex(sorted(current), versions, pending, rows)
+        return _index
+
+
+def rank_resumes(job_description):
+    """
+    Rank all stored resumes against a job description.
+    
+    Args:
+        job_description (JobDescription): The job to screen resumes for
+    
+    Returns:
+        RankedResumes: Lazily built ranking, best match first
+    """
+    index = get_index()
+    job_features = document_features.features_for_document(job_description)
+    return RankedResumes(index, index.score(job_features, job_description.content))
@@ -0,0 +1,137 @@
+"""
+Single-pass section segmentation of resumes and job descriptions.
+
+Section headers are recognized from a configurable vocabulary: every header
+name maps to the canonical section it opens, so "Work Experience",
+"EMPLOYMENT" and "Professional experience:" all start the experience
+section. All header names are compiled into one case-insensitive pattern,
+built once per vocabulary, and a single scan of the text finds every header
+line.
+
+The resulting SectionIndex holds the header and body span of every section.
+It is computed once per document and stored with the document features, and
+content suggestions and paragraph segmentation for incremental re-analysis
+read sections from it instead of searching the text again.
+"""
+import bisect
+import re
+from functools import lru_cache
+
+from django.conf import settings
+
+# Canonical section names mapped to the header names that open them
+DEFAULT_SECTION_HEADERS = {
+    'summary': ['summary', 'professional summary', 'profile', 'objective', 'about me'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history'],
+    'education': ['education', 'academic background'],
+    'skills': ['skills', 'technical skills', 'core competencies'],
+    'projects': ['projects', 'personal projects'],
+    'certifications': ['certifications', 'certificates', 'licenses'],
+    'publications': ['publications'],
+    'awards': ['awards', 'honors'],
+    'responsibilities': ['responsibilities', 'what you will do'],
+    'requirements': ['requirements', 'qualifications', 'what we are looking for'],
+}
+
+
+def _normalize(name):
+    return ' '.join(name.lower().split())
+
+
+def header_vocabulary():
+    """
+    Get the header names of every section, extended by the SECTION_HEADERS_EXTRA setting.
+    
+    Returns:
+        dict: Normalized header name mapped to its canonical section name
+    """
+    vocabulary = {}
+    extra = getattr(settings, 'SECTION_HEADERS_EXTRA', {})
+    for section in list(DEFAULT_SECTION_HEADERS) + [name for name in extra if name not in DEFAULT_SECTION_HEADERS]:
+        for name in DEFAULT_SECTION_HEADERS.get(section, []) + extra.get(section, []):
+            vocabulary.setdefault(_normalize(name), section)
+    return vocabulary
+
+
+@lru_cache(maxsize=4)
+def _header_pattern(names):
+    # A header is a known name alone on its line, optionally followed by a colon;
+    # longer names come first so "work experience" is not cut short at "work"
+    alternatives = sorted(names, key=len, reverse=True)
+    return re.compile(
+        r'^[ \t]*(' + '|'.join(r'[ \t]+'.join(re.escape(word) for word in name.split()) for name in alternatives)
+        + r')[ \t]*:?[ \t]*$',
+        re.IGNORECASE | re.MULTILINE
+    )
+
+
+class SectionIndex:
+    """
+    The sections of one document, in document order.
+    
+    Args:
+        spans (list): [section, header_start, start, end] of every section, where
+            the header line runs from header_start to start and the body from start to end
+        length (int): Length of the document text
+    """
+    
+    def __init__(self, spans, length):
+        self.spans = [list(span) for span in spans]
+        self.length = length
+        self._header_starts = [span[1] for span in self.spans]
+    
+    def __len__(self):
+        return len(self.spans)
+    
+    @property
+    def preamble_end(self):
+        """End of the text before the first section header, such as a name and contact details"""
+        return self.spans[0][1] if self.spans else self.length
+    
+    def bodies(self, section):
+        """Get the (start, end) body spans of every section with a canonical name"""
+        return [(start, end) for name, _, start, end in self.spans if name == section]
+    
+    def text(self, document_text, section):
+        """
+        Get the text of a section.
+        
+        Args:
+            document_text (str): The text the index was built from
+            section (str): Canonical section name
+        
+        Returns:
+            str: The bodies of all sections with that name, or an empty string if there are none
+        """
+        return '\n'.join(document_text[start:end].strip() for start, end in self.bodies(section)).strip()
+    
+    def section_at(self, offset):
+        """Get the canonical name of the section containing a character offset, None before the first header"""
+        position = bisect.bisect_right(self._header_starts, offset) - 1
+        return self.spans[position][0] if position >= 0 else None
+
+
+def build(text):
+    """
+    Segment a document into sections with one scan of its text.
+    
+    Args:
+        text (str): The text content of a resume or job description
+    
+    Returns:
+        SectionIndex: The sections of the text
+    """
+    vocabulary = header_vocabulary()
+    headers = list(_header_pattern(tuple(vocabulary)).finditer(text))
+    return SectionIndex([
+        [vocabulary[_normalize(header.group(1))], header.start(), header.end(),
+         headers[position + 1].start() if position + 1 < len(headers) else len(text)]
+        for position, header in enumerate(headers)
+    ], len(text))
+
+
+def from_features(features, text):
+    """Get the section index stored in document features, or build it if they have none"""
+    spans = (features or {}).get("sections")
+    return SectionIndex(spans, len(text)) if spans is not None else build(text)
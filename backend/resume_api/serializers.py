@@ -1,19 +1,25 @@
 from rest_framework import serializers
-from .models import Resume, JobDescription, ResumeAnalysis, MockInterview, ChatMessage
+from .models import Resume, JobDescription, ResumeAnalysis, MockInterview, ChatMessage, AnalysisJob
 
 class ResumeSerializer(serializers.ModelSerializer):
-    """Serializer for Resume model"""
+    """Serializer for Resume model; the content can be written but is left out of lists"""
     class Meta:
         model = Resume
-        fields = ['id', 'title', 'file_name', 'file_type', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'file_name', 'file_type', 'content', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
+        extra_kwargs = {'content': {'write_only': True, 'required': False}}
+
+class ResumeDetailSerializer(ResumeSerializer):
+    """Serializer for a single Resume, including its content"""
+    class Meta(ResumeSerializer.Meta):
+        extra_kwargs = {'content': {'required': False}}
 
 class JobDescriptionSerializer(serializers.ModelSerializer):
     """Serializer for JobDescription model"""
     class Meta:
         model = JobDescription
-        fields = ['id', 'title', 'company', 'file_name', 'file_type', 'created_at']
-        read_only_fields = ['created_at']
+        fields = ['id', 'title', 'company', 'file_name', 'file_type', 'canonical', 'created_at']
+        read_only_fields = ['canonical', 'created_at']
 
 class ResumeAnalysisSerializer(serializers.ModelSerializer):
     """Serializer for ResumeAnalysis model"""
@@ -22,10 +28,20 @@ class ResumeAnalysisSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'resume', 'job_description', 'keywords_to_add', 
             'keywords_to_remove', 'format_suggestions', 
-            'content_suggestions', 'match_score', 'created_at'
+            'content_suggestions', 'match_score', 'analyzer_version', 'result', 'created_at'
         ]
         read_only_fields = ['created_at']
 
+class AnalysisJobSerializer(serializers.ModelSerializer):
+    """Serializer for AnalysisJob model"""
+    class Meta:
+        model = AnalysisJob
+        fields = [
+            'id', 'status', 'priority', 'attempts', 'max_attempts', 'result', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
 class ResumeAnalysisResultSerializer(serializers.Serializer):
     """Serializer for resume analysis results"""
     keywordsToAdd = serializers.ListField(child=serializers.CharField())
@@ -35,6 +51,9 @@ class ResumeAnalysisResultSerializer(serializers.Serializer):
     matchScore = serializers.IntegerField()
     technicalSkillsMatch = serializers.DictField(required=False)
     softSkillsMatch = serializers.DictField(required=False)
+    keywordContexts = serializers.DictField(child=serializers.CharField(), required=False)
+    tier = serializers.CharField(required=False)
+    degraded = serializers.ListField(child=serializers.CharField(), required=False)
 
 class MockInterviewSerializer(serializers.ModelSerializer):
     """Serializer for MockInterview model"""
@@ -0,0 +1,353 @@
+"""
+Technical skill taxonomy and its precomputed embedding index.
+
+The taxonomy lists common technical skills by category, and TECH_VARIANTS maps
+canonical technology names to their common spellings and abbreviations. Every
+skill and variant is embedded once into an L2-normalized float32 matrix that is
+saved as a .npy file next to the other model artifacts and memory-mapped on
+load, so worker processes share the pages instead of each holding a copy.
+When the taxonomy changes, only the added entries are embedded again.
+
+Raw BERT embeddings share a large common component, so any two short phrases
+score a cosine similarity of 0.8 or more. The index therefore subtracts the
+mean taxonomy embedding from every row and from every looked-up phrase before
+normalizing, which spreads the similarities out so that a threshold separates
+related skills from unrelated ones. ML_SEMANTIC_SKILLS_THRESHOLD is that
+threshold; calibrate it with the calibrate_skill_threshold command.
+
+nearest_skills() maps any phrase to its closest canonical skills with a single
+matrix-vector product against that index.
+"""
+import json
+import os
+
+import numpy as np
+from django.conf import settings
+
+from . import model_registry
+
+# Common technical skills by domain/category
+TECH_SKILLS_DATABASE = {
+    "programming_languages": [
+        'python', 'java', 'javascript', 'js', 'typescript', 'ts', 'c#', 'c++', 'c', 'go', 'golang',
+        'ruby', 'scala', 'kotlin', 'swift', 'objective-c', 'php', 'perl', 'r', 'matlab', 'rust',
+        'dart', 'haskell', 'groovy', 'bash', 'powershell', 'lua', 'cobol', 'fortran'
+    ],
+    
+    "web_tech": [
+        'html', 'css', 'sass', 'less', 'bootstrap', 'tailwind', 'material ui', 'responsive design',
+        'rest', 'restful', 'graphql', 'soap', 'ajax', 'json', 'xml', 'jwt', 'oauth', 'ssr', 'webpack',
+        'babel', 'styled-components', 'css modules', 'cors', 'grpc', 'http', 'https', 'sse', 'websocket'
+    ],
+    
+    "frontend_frameworks": [
+        'react', 'reactjs', 'angular', 'angularjs', 'vue', 'vuejs', 'redux', 'svelte', 'next.js',
+        'nuxt.js', 'gatsby', 'ember', 'jquery', 'backbone.js', 'lit', 'solid.js'
+    ],
+    
+    "backend_frameworks": [
+        'express', 'django', 'flask', 'spring', 'spring boot', 'rails', 'ruby on rails', 'asp.net',
+        'laravel', 'symfony', 'fastapi', 'nest.js', 'gin', 'phoenix', 'play', 'quarkus', 'sails.js',
+        'strapi', 'meteor'
+    ],
+    
+    "mobile": [
+        'android', 'ios', 'swift', 'flutter', 'react native', 'xamarin', 'ionic', 'kotlin', 'swiftui',
+        'uikit', 'jetpack compose', 'android studio', 'xcode', 'objective-c', 'mobile development'
+    ],
+    
+    "databases": [
+        'sql', 'mysql', 'postgresql', 'oracle', 'mongodb', 'cassandra', 'redis', 'sqlite',
+        'dynamodb', 'couchdb', 'firebase', 'neo4j', 'elasticsearch', 'mariadb', 'cosmosdb',
+        'nosql', 'rdbms', 'sql server', 'mssql', 'oledb', 'jdbc', 'odbc', 'erd'
+    ],
+    
+    "cloud_providers": [
+        'aws', 'amazon web services', 'azure', 'microsoft azure', 'gcp', 'google cloud', 'heroku',
+        'digital ocean', 'ibm cloud', 'openstack', 'alibaba cloud', 'tencent cloud', 'oracle cloud',
+        'linode', 'cloudflare'
+    ],
+    
+    "devops": [
+        'docker', 'kubernetes', 'k8s', 'terraform', 'jenkins', 'github actions', 'gitlab ci',
+        'circleci', 'travis ci', 'ansible', 'puppet', 'chef', 'ci/cd', 'github', 'gitlab',
+        'bitbucket', 'prometheus', 'grafana', 'elk', 'istio', 'helm', 'openshift'
+    ],
+    
+    "data_science": [
+        'pandas', 'numpy', 'scikit-learn', 'scipy', 'matplotlib', 'tensorflow', 'pytorch', 'keras',
+        'machine learning', 'ml', 'deep learning', 'dl', 'neural networks', 'cnn', 'rnn', 'lstm',
+        'computer vision', 'cv', 'nlp', 'natural language processing', 'ai', 'artificial intelligence',
+        'data mining', 'big data', 'spark', 'hadoop', 'mapreduce', 'tableau', 'power bi'
+    ],
+    
+    "version_control": [
+        'git', 'github', 'gitlab', 'bitbucket', 'svn', 'subversion', 'mercurial', 'git flow',
+        'version control'
+    ],
+    
+    "methodologies": [
+        'agile', 'scrum', 'kanban', 'waterfall', 'tdd', 'bdd', 'xp', 'lean', 'devops',
+        'ci/cd', 'sre', 'site reliability engineering', 'itil'
+    ],
+    
+    "tools": [
+        'vscode', 'visual studio', 'intellij', 'pycharm', 'eclipse', 'atom', 'sublime text',
+        'notepad++', 'postman', 'insomnia', 'jira', 'confluence', 'slack', 'trello', 'notion',
+        'figma', 'sketch', 'adobe xd', 'photoshop', 'illustrator'
+    ]
+}
+
+# All taxonomy skills as one flat list, in category order
+COMMON_TECH_SKILLS = [skill for skills in TECH_SKILLS_DATABASE.values() for skill in skills]
+
+# Technology name variants, keyed by canonical name
+TECH_VARIANTS = {
+    'javascript': ['js'],
+    'typescript': ['ts'],
+    'python': ['py'],
+    'react': ['reactjs', 'react.js'],
+    'node': ['nodejs', 'node.js'],
+    'angular': ['angularjs', 'angular.js'],
+    'vue': ['vuejs', 'vue.js'],
+    'dotnet': ['dot net', '.net', 'net framework'],
+    'csharp': ['c#', 'c sharp'],
+    'cplusplus': ['c++', 'cpp'],
+    'objective-c': ['objective c', 'objectivec'],
+    'machine learning': ['ml'],
+    'artificial intelligence': ['ai'],
+    'natural language processing': ['nlp'],
+    'kubernetes': ['k8s'],
+    'database': ['db'],
+}
+
+# Registry name of the taxonomy embedding index
+TAXONOMY_INDEX_NAME = "skill-taxonomy-index"
+
+# Minimum centred similarity for mapping a phrase to a skill, unless calibrated
+DEFAULT_SEMANTIC_SKILLS_THRESHOLD = 0.5
+
+
+def taxonomy_entries():
+    """
+    List every taxonomy skill and variant with the canonical skill it stands for.
+    
+    Returns:
+        dict: Entry text mapped to its canonical skill name
+    """
+    entries = {}
+    for skill in COMMON_TECH_SKILLS:
+        entries.setdefault(skill, skill)
+    
+    for base, variants in TECH_VARIANTS.items():
+        # A variant group resolves to its first spelling used in the taxonomy,
+        # so "csharp" and "c sharp" both map to "c#"
+        group = [base] + variants
+        canonical = next((text for text in group if text in entries), base)
+        for text in group:
+            entries[text] = canonical
+    return entries
+
+
+class TaxonomyIndex:
+    """
+    Centred, normalized embeddings of the taxonomy entries, one row per entry.
+    
+    Args:
+        texts (list): Entry texts, in row order
+        canonical (list): Canonical skill name of every row
+        embeddings (numpy.ndarray): Centred, L2-normalized float32 matrix, usually memory-mapped
+        mean (numpy.ndarray): Mean of the normalized entry embeddings, subtracted from every row
+    """
+    
+    def __init__(self, texts, canonical, embeddings, mean):
+        self.texts = texts
+        self.canonical = canonical
+        self.embeddings = embeddings
+        self.mean = mean
+    
+    def __len__(self):
+        return len(self.texts)
+    
+    def centre(self, embeddings):
+        """Centre normalized phrase embeddings on the taxonomy mean and normalize them again"""
+        return _normalize(embeddings - self.mean)
+    
+    def nearest(self, vector, top_k=5):
+        """
+        Find the canonical skills closest to a centred, normalized embedding vector.
+        
+        Returns:
+            list: (canonical skill, similarity) pairs, best first, one per skill
+        """
+        scores = self.embeddings @ vector
+        
+        # Several rows can share a canonical skill, so take a few extra
+        # candidates before collapsing them
+        candidate_count = min(len(scores), top_k * 3)
+        candidates = np.argpartition(-scores, candidate_count - 1)[:candidate_count]
+        
+        results = {}
+        for row in candidates[np.argsort(-scores[candidates])]:
+            skill = self.canonical[row]
+            if skill not in results:
+                results[skill] = float(scores[row])
+                if len(results) == top_k:
+                    break
+        return list(results.items())
+
+
+def _index_paths():
+    """Return the centred embedding, raw embedding and metadata paths of the persisted index"""
+    cache_dir = getattr(settings, 'ML_MODEL_CACHE_DIR', None) or os.path.join(settings.BASE_DIR, 'model_cache')
+    model_tag = model_registry.BERT_BASE_UNCASED.replace('/', '--')
+    inference_mode = getattr(settings, 'ML_INFERENCE_MODE', 'fp32')
+    base = os.path.join(cache_dir, f"{TAXONOMY_INDEX_NAME}-{model_tag}-{inference_mode}")
+    return f"{base}.npy", f"{base}-raw.npy", f"{base}.json"
+
+
+def _normalize(embeddings):
+    """L2-normalize the rows of a matrix"""
+    return (embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)).astype(np.float32)
+
+
+def _embed_entries(texts):
+    """Embed entry texts with the shared BERT encoder and L2-normalize the rows"""
+    encoder = model_registry.get(model_registry.BERT_BASE_UNCASED)
+    if encoder is None:
+        raise RuntimeError(f"{model_registry.BERT_BASE_UNCASED} is not available")
+    
+    return _normalize(encoder.embed(texts, pooling="mean", max_length=32).astype(np.float32))
+
+
+def build_index(entries=None):
+    """
+    Build or update the persisted taxonomy index and memory-map it.
+    
+    Rows of entries that were embedded before are reused from the raw
+    embeddings file. Only new entries go through the encoder, and removed
+    entries are dropped. The mean is then recomputed over the current entries
+    and every row centred on it again, which takes a single matrix operation.
+    The files are rewritten only when the taxonomy changed.
+    
+    Args:
+        entries (dict, optional): Entry text mapped to canonical skill.
+            Defaults to taxonomy_entries().
+    
+    Returns:
+        TaxonomyIndex: The index, backed by a read-only memory map
+    """
+    entries = taxonomy_entries() if entries is None else entries
+    embeddings_path, raw_embeddings_path, metadata_path = _index_paths()
+    
+    previous_rows = {}
+    previous = None
+    if all(os.path.exists(path) for path in (embeddings_path, raw_embeddings_path, metadata_path)):
+        try:
+            with open(metadata_path) as metadata_file:
+                metadata = json.load(metadata_file)
+            previous = np.load(raw_embeddings_path, mmap_mode='r')
+            previous_rows = {text: row for row, text in enumerate(metadata['texts'])}
+            if metadata['canonical'] == [entries.get(text) for text in metadata['texts']] and \
+                    set(metadata['texts']) == set(entries):
+                return TaxonomyIndex(metadata['texts'], metadata['canonical'],
+                                     np.load(embeddings_path, mmap_mode='r'),
+                                     np.asarray(metadata['mean'], dtype=np.float32))
+        except Exception as e:
+            print(f"Error reading taxonomy index, rebuilding it: {str(e)}")
+            previous, previous_rows = None, {}
+    
+    texts = list(entries)
+    new_texts = [text for text in texts if text not in previous_rows]
+    print(f"Embedding {len(new_texts)} new taxonomy entries, reusing {len(texts) - len(new_texts)}")
+    
+    new_embeddings = _embed_entries(new_texts) if new_texts else None
+    new_rows = {text: row for row, text in enumerate(new_texts)}
+    
+    raw_embeddings = np.empty((len(texts), (previous if previous is not None else new_embeddings).shape[1]),
+                              dtype=np.float32)
+    for row, text in enumerate(texts):
+        if text in new_rows:
+            raw_embeddings[row] = new_embeddings[new_rows[text]]
+        else:
+            raw_embeddings[row] = previous[previous_rows[text]]
+    
+    mean = raw_embeddings.mean(axis=0)
+    embeddings = _normalize(raw_embeddings - mean)
+    
+    # Write to temporary files first so readers never see a half-written index
+    os.makedirs(os.path.dirname(embeddings_path), exist_ok=True)
+    temp_suffix = f".{os.getpid()}.tmp"
+    with open(embeddings_path + temp_suffix, 'wb') as embeddings_file:
+        np.save(embeddings_file, embeddings)
+    with open(raw_embeddings_path + temp_suffix, 'wb') as raw_embeddings_file:
+        np.save(raw_embeddings_file, raw_embeddings)
+    with open(metadata_path + temp_suffix, 'w') as metadata_file:
+        json.dump({'texts': texts, 'canonical': [entries[text] for text in texts], 'mean': mean.tolist()},
+                  metadata_file)
+    os.replace(embeddings_path + temp_suffix, embeddings_path)
+    os.replace(raw_embeddings_path + temp_suffix, raw_embeddings_path)
+    os.replace(metadata_path + temp_suffix, metadata_path)
+    
+    return TaxonomyIndex(texts, [entries[text] for text in texts], np.load(embeddings_path, mmap_mode='r'), mean)
+
+
+if model_registry.TRANSFORMERS_AVAILABLE:
+    model_registry.register(TAXONOMY_INDEX_NAME, build_index)
+
+
+def nearest_skills(phrase, top_k=5):
+    """
+    Map a free-form phrase to its closest canonical skills in the taxonomy.
+    
+    Args:
+        phrase (str): Phrase to look up, such as an extracted key phrase
+        top_k (int): Number of canonical skills to return
+    
+    Returns:
+        list: (canonical skill, similarity) pairs, best first. Empty if the
+            index is not available.
+    """
+    if not phrase.strip():
+        return []
+    index = model_registry.get(TAXONOMY_INDEX_NAME)
+    if index is None:
+        return []
+    
+    vector = index.centre(_embed_entries([phrase]))[0]
+    return index.nearest(vector, top_k)
+
+
+def map_phrases_to_skills(phrases, threshold=None):
+    """
+    Map several phrases to their best canonical skill, keeping confident matches only.
+    
+    Args:
+        phrases (list): Phrases to look up
+        threshold (float, optional): Minimum centred similarity of a match.
+            Defaults to ML_SEMANTIC_SKILLS_THRESHOLD.
+    
+    Returns:
+        dict: Phrase mapped to its canonical skill, for phrases above the threshold
+    """
+    # Without phrases, the index and its encoder are not loaded at all
+    phrases = [phrase for phrase in phrases if phrase.strip()]
+    if not phrases:
+        return {}
+    
+    index = model_registry.get(TAXONOMY_INDEX_NAME)
+    if index is None:
+        return {}
+    
+    if threshold is None:
+        threshold = getattr(settings, 'ML_SEMANTIC_SKILLS_THRESHOLD', DEFAULT_SEMANTIC_SKILLS_THRESHOLD)
+    
+    # One batched forward pass for the phrases and one matrix product for all lookups
+    scores = index.centre(_embed_entries(phrases)) @ index.embeddings.T
+    best_rows = scores.argmax(axis=1)
+    
+    return {
+        phrase: index.canonical[row]
+        for phrase, row, score in zip(phrases, best_rows, scores[np.arange(len(phrases)), best_rows])
+        if score >= threshold
+    }
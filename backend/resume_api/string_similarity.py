@@ -0,0 +1,151 @@
+"""
+Batched string similarity for technical term matching.
+
+partial_match_matrix() scores every pair of terms from two lists at once: pairs
+where one term contains the other get a fixed high score, all other pairs get
+their Levenshtein ratio. The edit distances come from a single rapidfuzz cdist
+call when it is installed (python-Levenshtein depends on it), from
+python-Levenshtein pair by pair otherwise, and from a numpy dynamic program
+over all pairs at once as a last resort.
+
+Since the edit distance of two strings is at least their length difference,
+the ratio can never exceed the ratio of their lengths. Callers that only need
+scores above a minimum pass it in, and pairs whose length bound already falls
+short are skipped without computing their distance.
+"""
+import numpy as np
+
+try:
+    from rapidfuzz.distance import Levenshtein as rapidfuzz_levenshtein
+    from rapidfuzz.process import cdist
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    import Levenshtein
+    LEVENSHTEIN_AVAILABLE = True
+except ImportError:
+    LEVENSHTEIN_AVAILABLE = False
+
+# Score given to a pair where one term contains the other
+SUBSTRING_SCORE = 0.85
+
+
+def _numpy_edit_distances(texts1, texts2):
+    """
+    Compute the Levenshtein distance of many string pairs at once.
+    
+    The Wagner-Fischer table is filled row by row for all pairs in parallel,
+    so the Python loop runs over string positions instead of over pairs.
+    """
+    pair_count = len(texts1)
+    lengths1 = np.array([len(text) for text in texts1])
+    lengths2 = np.array([len(text) for text in texts2])
+    longest1 = int(lengths1.max(initial=0))
+    longest2 = int(lengths2.max(initial=0))
+    
+    # Different padding values, so padding never matches padding
+    codes1 = np.full((pair_count, longest1), -1, dtype=np.int64)
+    codes2 = np.full((pair_count, longest2), -2, dtype=np.int64)
+    for index, (text1, text2) in enumerate(zip(texts1, texts2)):
+        codes1[index, :len(text1)] = [ord(char) for char in text1]
+        codes2[index, :len(text2)] = [ord(char) for char in text2]
+    
+    distances = lengths2.copy()
+    previous = np.tile(np.arange(longest2 + 1), (pair_count, 1))
+    for row in range(1, longest1 + 1):
+        substitution_cost = (codes1[:, row - 1:row] != codes2).astype(np.int64)
+        best_diagonal_or_above = np.minimum(previous[:, 1:] + 1, previous[:, :-1] + substitution_cost)
+        
+        current = np.empty_like(previous)
+        current[:, 0] = row
+        for column in range(1, longest2 + 1):
+            current[:, column] = np.minimum(best_diagonal_or_above[:, column - 1], current[:, column - 1] + 1)
+        
+        finished = lengths1 == row
+        distances[finished] = current[finished, lengths2[finished]]
+        previous = current
+    
+    return distances
+
+
+def edit_distance_matrix(texts1, texts2, mask=None):
+    """
+    Compute the Levenshtein distance of every pair of strings from two lists.
+    
+    Args:
+        texts1 (list): Strings for the rows
+        texts2 (list): Strings for the columns
+        mask (numpy.ndarray, optional): Boolean matrix of the pairs that are
+            needed. Other pairs may be left at -1.
+    
+    Returns:
+        numpy.ndarray: Integer distance matrix with one row per string in texts1
+    """
+    if not texts1 or not texts2:
+        return np.zeros((len(texts1), len(texts2)), dtype=np.int64)
+    
+    if RAPIDFUZZ_AVAILABLE:
+        # One call into C for the whole matrix is faster than selecting pairs
+        return cdist(texts1, texts2, scorer=rapidfuzz_levenshtein.distance, dtype=np.int64)
+    
+    distances = np.full((len(texts1), len(texts2)), -1, dtype=np.int64)
+    rows, columns = np.nonzero(mask) if mask is not None else np.indices(distances.shape).reshape(2, -1)
+    if len(rows) == 0:
+        return distances
+    
+    if LEVENSHTEIN_AVAILABLE:
+        distances[rows, columns] = [Levenshtein.distance(texts1[row], texts2[column])
+                                    for row, column in zip(rows, columns)]
+    else:
+        distances[rows, columns] = _numpy_edit_distances([texts1[row] for row in rows],
+                                                         [texts2[column] for column in columns])
+    return distances
+
+
+def partial_match_matrix(texts1, texts2, min_scores=None):
+    """
+    Score partial string matches of every pair of terms from two lists.
+    
+    Args:
+        texts1 (list): Terms for the rows
+        texts2 (list): Terms for the columns
+        min_scores (numpy.ndarray, optional): Per-pair scores below which the
+            exact value is not needed. Pairs that cannot reach it are left at 0.
+    
+    Returns:
+        numpy.ndarray: Scores between 0 and 1, one row per term in texts1
+    """
+    lowered1 = [text.lower() for text in texts1]
+    lowered2 = [text.lower() for text in texts2]
+    scores = np.zeros((len(lowered1), len(lowered2)))
+    if not lowered1 or not lowered2:
+        return scores
+    
+    is_substring = np.array([[text1 in text2 or text2 in text1 for text2 in lowered2] for text1 in lowered1])
+    
+    lengths1 = np.array([len(text) for text in lowered1])[:, None]
+    lengths2 = np.array([len(text) for text in lowered2])[None, :]
+    max_lengths = np.maximum(lengths1, lengths2)
+    
+    # Early exit: the ratio is at most the ratio of the lengths
+    needed = ~is_substring & (max_lengths > 0)
+    if min_scores is not None:
+        upper_bounds = np.minimum(lengths1, lengths2) / np.maximum(max_lengths, 1)
+        needed &= upper_bounds >= min_scores
+    
+    if needed.any():
+        distances = edit_distance_matrix(lowered1, lowered2, mask=needed)
+        ratios = 1.0 - distances / np.maximum(max_lengths, 1)
+        scores[needed] = ratios[needed]
+    
+    scores[is_substring] = SUBSTRING_SCORE
+    return scores
+
+
+def partial_match_score(text1, text2):
+    """
+    Calculate a score based on partial string matching, useful for technical terms.
+    """
+    return float(partial_match_matrix([text1], [text2])[0, 0])
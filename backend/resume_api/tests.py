@@ -1,3 +1,354 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import (analysis_store, analysis_tiers, deadlines, document_features, job_queue, kwic_index,
+               near_duplicates, resume_analyzer, skill_taxonomy, string_similarity)
+from .models import Resume, JobDescription, ResumeAnalysis, AnalysisJob
+from .inference_scheduler import MicroBatchScheduler
+
+
+def reference_levenshtein(text1, text2):
+    """Textbook Wagner-Fischer edit distance of two strings"""
+    previous = list(range(len(text2) + 1))
+    for row, char1 in enumerate(text1, 1):
+        current = [row]
+        for column, char2 in enumerate(text2, 1):
+            current.append(min(previous[column] + 1, current[column - 1] + 1,
+                               previous[column - 1] + (char1 != char2)))
+        previous = current
+    return previous[-1]
+
+
+class EditDistanceMatrixTests(SimpleTestCase):
+    """Every edit distance backend agrees with the reference implementation"""
+    
+    TEXTS1 = ['python', 'javascript', 'c++', '', 'kubernetes', 'postgresql', 'node.js', 'résumé', 'aaaa']
+    TEXTS2 = ['pyhton', 'java', 'c#', 'k8s', '', 'postgres', 'nodejs', 'resume', 'typescript', 'a']
+    
+    def expected(self):
+        return np.array([[reference_levenshtein(text1, text2) for text2 in self.TEXTS2] for text1 in self.TEXTS1])
+    
+    def distances(self, rapidfuzz, levenshtein, mask=None):
+        with mock.patch.object(string_similarity, 'RAPIDFUZZ_AVAILABLE', rapidfuzz), \
+                mock.patch.object(string_similarity, 'LEVENSHTEIN_AVAILABLE', levenshtein):
+            return string_similarity.edit_distance_matrix(self.TEXTS1, self.TEXTS2, mask=mask)
+    
+    @skipUnless(string_similarity.RAPIDFUZZ_AVAILABLE, 'rapidfuzz is not installed')
+    def test_rapidfuzz_cdist(self):
+        np.testing.assert_array_equal(self.distances(True, False), self.expected())
+    
+    @skipUnless(string_similarity.LEVENSHTEIN_AVAILABLE, 'python-Levenshtein is not installed')
+    def test_python_levenshtein(self):
+        np.testing.assert_array_equal(self.distances(False, True), self.expected())
+    
+    def test_numpy_wagner_fischer(self):
+        np.testing.assert_array_equal(self.distances(False, False), self.expected())
+    
+    def test_masked_pairs(self):
+        mask = np.zeros((len(self.TEXTS1), len(self.TEXTS2)), dtype=bool)
+        mask[::2, 1::2] = True
+        for levenshtein in ([True, False] if string_similarity.LEVENSHTEIN_AVAILABLE else [False]):
+            distances = self.distances(False, levenshtein, mask=mask)
+            np.testing.assert_array_equal(distances[mask], self.expected()[mask])
+            self.assertTrue((distances[~mask] == -1).all())
+    
+    def test_partial_match_score(self):
+        self.assertEqual(string_similarity.partial_match_score('React', 'react.js'), string_similarity.SUBSTRING_SCORE)
+        self.assertAlmostEqual(string_similarity.partial_match_score('python', 'pyhton'), 1 - 2 / 6)
+
+
+class KeywordIndexTests(SimpleTestCase):
+    """Keywords find the sentences that mention them, and only those"""
+    
+    TEXT = "We use Node.js and C++ daily. Some C experience helps. Also C# and node tooling. Knows Python."
+    
+    def test_symbols_are_required(self):
+        index = kwic_index.build(self.TEXT)
+        self.assertEqual(index.snippet('C++'), "We use Node.js and C++ daily.")
+        self.assertEqual(index.snippet('c#'), "Also C# and node tooling.")
+    
+    def test_plain_keyword_skips_symbol_names(self):
+        index = kwic_index.build(self.TEXT)
+        self.assertEqual(index.snippet('c'), "Some C experience helps.")
+        self.assertEqual(index.snippet('node'), "Also C# and node tooling.")
+        self.assertEqual(index.snippet('python'), "Knows Python.")
+        self.assertIsNone(kwic_index.build("Node.js and C++ required").snippet('c'))
+
+
+class RescoreTests(TestCase):
+    """Stored analyses are only reused for the documents they were computed from"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('candidate', password='secret')
+        self.resume = Resume.objects.create(user=self.user, title='Backend', file_name='a.txt', file_type='txt',
+                                            content='Python and Django developer.')
+        self.other_resume = Resume.objects.create(user=self.user, title='Frontend', file_name='b.txt',
+                                                  file_type='txt', content='React and TypeScript developer.')
+        self.job_description = JobDescription.objects.create(user=self.user, title='Engineer',
+                                                             content='We need a Python developer.')
+    
+    def rescore(self, resume):
+        with mock.patch.object(document_features, 'features_for_document', return_value={"segments": []}), \
+                mock.patch.object(analysis_store, '_analyze_documents',
+                                  return_value={'matchScore': len(resume.content), 'tier': 'full'}):
+            return analysis_store.rescore(self.user, resume, self.job_description)
+    
+    def test_documents_without_hash_do_not_share_analyses(self):
+        result, _, cached, _ = self.rescore(self.resume)
+        self.assertFalse(cached)
+        self.assertEqual(self.resume.content_hash, document_features.content_hash(self.resume.content))
+        self.assertEqual(self.job_description.content_hash,
+                         document_features.content_hash(self.job_description.content))
+        
+        other_result, _, cached, _ = self.rescore(self.other_resume)
+        self.assertFalse(cached)
+        self.assertNotEqual(other_result, result)
+        
+        cached_result, _, cached, _ = self.rescore(self.resume)
+        self.assertTrue(cached)
+        self.assertEqual(cached_result, result)
+    
+    def test_blank_hashes_find_nothing(self):
+        ResumeAnalysis.objects.create(user=self.user, resume=self.resume, job_description=self.job_description,
+                                      match_score=50, analyzer_version=analysis_store.ANALYZER_VERSION)
+        self.assertIsNone(analysis_store.find_analysis('', '', user=self.user))
+
+
+class FindAnalysisTests(TestCase):
+    """Stored analyses are reused only for the same files, owner, analyzer version and tier"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('candidate')
+        self.resume = Resume.objects.create(user=self.user, title='Backend', file_name='a.txt', file_type='txt',
+                                            content='Python developer.', content_hash='r' * 64)
+        self.job_description = JobDescription.objects.create(user=self.user, title='Engineer',
+                                                             content='Python wanted.', content_hash='j' * 64)
+    
+    def store(self, **fields):
+        return ResumeAnalysis.objects.create(**{
+            'user': self.user, 'resume': self.resume, 'job_description': self.job_description, 'match_score': 50,
+            'resume_hash': 'r' * 64, 'job_description_hash': 'j' * 64,
+            'analyzer_version': analysis_store.ANALYZER_VERSION, **fields
+        })
+    
+    def find(self, **kwargs):
+        return analysis_store.find_analysis('r' * 64, 'j' * 64, **kwargs)
+    
+    def test_finds_latest_matching_analysis(self):
+        earlier = self.store()
+        ResumeAnalysis.objects.filter(id=earlier.id).update(created_at=timezone.now() - timedelta(minutes=1))
+        latest = self.store(match_score=60)
+        self.assertEqual(self.find(user=self.user), latest)
+        self.assertIsNone(analysis_store.find_analysis('r' * 64, 'x' * 64, user=self.user))
+    
+    def test_other_users_and_versions_are_ignored(self):
+        self.store(user=User.objects.create_user('other'))
+        self.store(analyzer_version='0')
+        self.assertIsNone(self.find(user=self.user))
+    
+    def test_cheaper_tiers_and_degraded_analyses_are_ignored(self):
+        fast = self.store(tier=analysis_tiers.FAST)
+        self.store(degraded=True)
+        self.assertIsNone(self.find(user=self.user))
+        self.assertEqual(self.find(user=self.user, tier=analysis_tiers.FAST), fast)
+
+
+class DocumentApiTests(TestCase):
+    """Documents created and edited through the API are keyed by their text"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('candidate', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_resume_content_is_optional_and_hashed(self):
+        response = self.client.post('/api/resume/resumes/', {'title': 'Empty', 'file_name': 'a.txt',
+                                                             'file_type': 'txt'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        
+        response = self.client.post('/api/resume/resumes/', {'title': 'Backend', 'file_name': 'b.txt',
+                                                             'file_type': 'txt', 'content': 'Python developer.'},
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+        resume = Resume.objects.get(id=response.data['id'])
+        self.assertEqual(resume.content_hash, document_features.content_hash('Python developer.'))
+        
+        response = self.client.patch(f'/api/resume/resumes/{resume.id}/', {'content': 'Go developer.'},
+                                     format='json')
+        self.assertEqual(response.data['content'], 'Go developer.')
+        resume.refresh_from_db()
+        self.assertEqual(resume.content_hash, document_features.content_hash('Go developer.'))
+    
+    def test_resume_list_leaves_out_content(self):
+        Resume.objects.create(user=self.user, title='Backend', file_name='a.txt', file_type='txt',
+                              content='Python developer.')
+        response = self.client.get('/api/resume/resumes/')
+        self.assertNotIn('content', response.data[0])
+    
+    def test_job_description_is_hashed(self):
+        response = self.client.post('/api/resume/job-descriptions/', {'title': 'Engineer'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        job_description = JobDescription.objects.get(id=response.data['id'])
+        self.assertEqual(job_description.content_hash, document_features.content_hash(''))
+
+
+class AnalysisTierTests(SimpleTestCase):
+    """Stages that need a model or Azure only run at the tiers that include them"""
+    
+    def test_fast_tier_skips_semantic_skills(self):
+        with mock.patch.object(resume_analyzer, 'SEMANTIC_SKILLS_ENABLED', True), \
+                mock.patch.object(resume_analyzer.skill_taxonomy, 'map_phrases_to_skills', return_value={}) as mapping:
+            analyzer = resume_analyzer.ResumeAnalyzer(tier=analysis_tiers.FAST)
+            analyzer._extract_technical_skills(['container orchestration'], 'Python developer')
+            self.assertFalse(mapping.called)
+            
+            analyzer = resume_analyzer.ResumeAnalyzer(tier=analysis_tiers.STANDARD)
+            analyzer._extract_technical_skills(['container orchestration'], 'Python developer')
+            mapping.assert_called_once_with(['container orchestration'])
+    
+    def test_fast_tier_skips_ocr(self):
+        with mock.patch.object(resume_analyzer.azure_vision_client, 'extract_text_from_image') as ocr:
+            text = resume_analyzer.ResumeAnalyzer(tier=analysis_tiers.FAST).extract_text_from_file(b'image', 'png')
+            self.assertFalse(ocr.called)
+            self.assertTrue(text.startswith('Error'))
+    
+    def test_requested_stage_is_reported_as_degraded(self):
+        with analysis_tiers.tier_deadline(analysis_tiers.FULL):
+            tier_run = analysis_tiers.TierRun(analysis_tiers.FULL, deadline=deadlines.Deadline(0))
+            self.assertFalse(tier_run.allows(analysis_tiers.FULL, 'ocr'))
+            self.assertEqual(tier_run.tier, analysis_tiers.FAST)
+            self.assertEqual(deadlines.degraded(), ['ocr'])
+
+
+class SkillTaxonomyTests(SimpleTestCase):
+    """Looking up no phrases does not load the taxonomy index"""
+    
+    def test_empty_input_skips_the_index(self):
+        with mock.patch.object(skill_taxonomy.model_registry, 'get') as get:
+            self.assertEqual(skill_taxonomy.map_phrases_to_skills(['', '  ']), {})
+            self.assertEqual(skill_taxonomy.nearest_skills(' '), [])
+            self.assertFalse(get.called)
+
+
+class NearDuplicateTests(TestCase):
+    """Job descriptions are only linked to near-duplicates of the same user"""
+    
+    POSTING = ("We are hiring a senior backend engineer to design and build scalable REST APIs in Python and "
+               "Django, run PostgreSQL in production and mentor junior developers on the team.")
+    
+    def test_links_own_copies_only(self):
+        owner = User.objects.create_user('owner')
+        other = User.objects.create_user('other')
+        original = JobDescription.objects.create(user=owner, title='Backend', content=self.POSTING)
+        foreign_copy = JobDescription.objects.create(user=other, title='Backend', content=self.POSTING)
+        own_copy = JobDescription.objects.create(user=owner, title='Backend', content=self.POSTING + ' Remote.')
+        
+        foreign_copy.refresh_from_db()
+        own_copy.refresh_from_db()
+        self.assertIsNone(foreign_copy.canonical_id)
+        self.assertEqual(own_copy.canonical_id, original.id)
+
+
+@override_settings(ANALYSIS_JOB_VISIBILITY_TIMEOUT=300, ANALYSIS_JOB_RETRY_BACKOFF=10,
+                   ANALYSIS_JOB_RETRY_BACKOFF_MAX=600)
+class JobQueueTests(TestCase):
+    """Workers claim each job once, take over expired leases and give up after max_attempts"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('candidate')
+    
+    def create_job(self, max_attempts=3):
+        return AnalysisJob.objects.create(
+            user=self.user, resume_file_name='resume.txt', resume_file_path='missing/resume.txt',
+            job_desc_file_name='job.txt', job_desc_file_path='missing/job.txt',
+            max_attempts=max_attempts, available_at=timezone.now()
+        )
+    
+    def expire_lease(self, job):
+        AnalysisJob.objects.filter(id=job.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+    
+    def test_job_is_claimed_once(self):
+        job = self.create_job()
+        claimed = job_queue.claim_job('worker-a')
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual((claimed.status, claimed.attempts, claimed.locked_by),
+                         (AnalysisJob.STATUS_RUNNING, 1, 'worker-a'))
+        self.assertIsNone(job_queue.claim_job('worker-b'))
+    
+    def test_expired_lease_is_reclaimed_and_the_old_result_discarded(self):
+        job = self.create_job()
+        first = job_queue.claim_job('worker-a')
+        self.expire_lease(job)
+        
+        second = job_queue.claim_job('worker-b')
+        self.assertEqual(second.id, job.id)
+        self.assertEqual((second.attempts, second.locked_by), (2, 'worker-b'))
+        
+        self.assertFalse(job_queue.extend_lease(first, 'worker-a'))
+        self.assertFalse(job_queue.complete_job(first, 'worker-a', {'matchScore': 1}))
+        self.assertFalse(job_queue.fail_job(first, 'worker-a', 'late failure'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (AnalysisJob.STATUS_RUNNING, 'worker-b'))
+        
+        self.assertTrue(job_queue.extend_lease(second, 'worker-b'))
+        self.assertTrue(job_queue.complete_job(second, 'worker-b', {'matchScore': 2}))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (AnalysisJob.STATUS_SUCCEEDED, {'matchScore': 2}))
+    
+    def test_expired_last_attempt_fails_the_job(self):
+        job = self.create_job(max_attempts=1)
+        job_queue.claim_job('worker-a')
+        self.expire_lease(job)
+        
+        self.assertIsNone(job_queue.claim_job('worker-b'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.STATUS_FAILED)
+        self.assertIn('lease expired', job.error)
+    
+    def test_failed_attempts_back_off_until_exhausted(self):
+        job = self.create_job(max_attempts=2)
+        
+        claimed = job_queue.claim_job('worker-a')
+        before = timezone.now()
+        self.assertTrue(job_queue.fail_job(claimed, 'worker-a', 'first failure'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.STATUS_QUEUED)
+        self.assertGreaterEqual(job.available_at, before + timedelta(seconds=10))
+        self.assertIsNone(job_queue.claim_job('worker-b'))
+        
+        AnalysisJob.objects.filter(id=job.id).update(available_at=timezone.now())
+        claimed = job_queue.claim_job('worker-b')
+        self.assertEqual(claimed.attempts, 2)
+        self.assertFalse(job_queue.fail_job(claimed, 'worker-b', 'second failure'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (AnalysisJob.STATUS_FAILED, 'second failure'))
+
+
+class MicroBatchSchedulerTests(SimpleTestCase):
+    """Every submitted item resolves, even when the batch function misbehaves"""
+    
+    def test_results_are_scattered_in_order(self):
+        scheduler = MicroBatchScheduler(lambda items: [item * 2 for item in items], max_wait_ms=20)
+        futures = scheduler.submit_many([1, 2, 3])
+        self.assertEqual([future.result(timeout=5) for future in futures], [2, 4, 6])
+    
+    def test_missing_results_fail_the_batch(self):
+        scheduler = MicroBatchScheduler(lambda items: items[:-1], max_wait_ms=20)
+        futures = scheduler.submit_many([1, 2, 3])
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=5)
+    
+    def test_cancelled_items_are_not_run(self):
+        batches = []
+        scheduler = MicroBatchScheduler(lambda items: batches.append(list(items)) or items, max_wait_ms=200)
+        cancelled, kept = scheduler.submit_many(['cancelled', 'kept'])
+        self.assertTrue(cancelled.cancel())
+        self.assertEqual(kept.result(timeout=5), 'kept')
+        self.assertEqual(batches, [['kept']])
@@ -0,0 +1,299 @@
+"""
+Corpus-aware TF-IDF text similarity.
+
+Raw word overlap is dominated by words that appear in every resume and job
+posting. This module weights terms by their inverse document frequency over
+the stored resumes and job descriptions, and compares documents by the
+cosine of their TF-IDF vectors.
+
+Terms are mapped to columns with a HashingVectorizer, so the vocabulary never
+has to be refitted: new documents only increment the document frequencies of
+their columns. The frequencies are counted by the build_tfidf_statistics
+management command, never inside a request, and persisted in
+ML_MODEL_CACHE_DIR. The file also keeps the content hash and term columns of
+every counted document, so the command counts only new and edited documents
+on later runs, and subtracts the old terms of edited and deleted ones. Web
+processes load only the frequencies, and reload them when the command has
+written a newer file. Documents are vectorized once into sparse rows, and
+comparing one document with many is a single sparse matrix product.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from .models import Resume, JobDescription
+
+STATISTICS_NAME = "tfidf-statistics"
+N_FEATURES = 2 ** 18
+
+# Document kinds as stored in the statistics file
+DOCUMENT_KINDS = {'resume': Resume, 'job_description': JobDescription}
+
+# Term counts of recently seen texts, which do not change when the IDF does
+TERM_COUNT_CACHE_SIZE = 1024
+
+
+class CorpusStatistics:
+    """
+    Document frequencies of the hashed terms of a corpus.
+    
+    Args:
+        document_frequencies (numpy.ndarray): Number of documents containing each hashed term
+        document_count (int): Number of documents counted
+        documents (dict, optional): (kind, id) of every counted document mapped to
+            its content hash and term columns; only needed to update the counts
+    """
+    
+    def __init__(self, document_frequencies=None, document_count=0, documents=None):
+        self.document_frequencies = (document_frequencies if document_frequencies is not None
+                                     else np.zeros(N_FEATURES, dtype=np.int64))
+        self.document_count = document_count
+        self.documents = documents
+        self.vectorizer = HashingVectorizer(
+            n_features=N_FEATURES, token_pattern=r'(?u)\b\w+\b', alternate_sign=False, norm=None
+        )
+        self._term_counts = OrderedDict()
+        self._lock = threading.Lock()
+        self._idf = None
+    
+    def update_documents(self, documents):
+        """
+        Count new and edited documents into the document frequencies.
+        
+        Args:
+            documents (list): (key, text) pairs, where key is a (kind, id) tuple
+        
+        Returns:
+            int: Number of documents whose counts changed
+        """
+        hashes = [hashlib.sha256(text.encode('utf-8')).hexdigest() for _, text in documents]
+        changed = [index for index, ((key, _), text_hash) in enumerate(zip(documents, hashes))
+                   if self.documents.get(key, (None,))[0] != text_hash]
+        if not changed:
+            return 0
+        
+        counts = self.vectorizer.transform([documents[index][1] for index in changed])
+        for row, index in enumerate(changed):
+            key = documents[index][0]
+            self.remove_document(key)
+            columns = counts.indices[counts.indptr[row]:counts.indptr[row + 1]].astype(np.int32)
+            self.document_frequencies[columns] += 1
+            self.document_count += 1
+            self.documents[key] = (hashes[index], columns)
+        self._idf = None
+        return len(changed)
+    
+    def remove_document(self, key):
+        """Subtract the terms of a counted document from the document frequencies"""
+        previous = self.documents.pop(key, None)
+        if previous is not None:
+            self.document_frequencies[previous[1]] -= 1
+            self.document_count -= 1
+            self._idf = None
+    
+    def idf(self):
+        """Smoothed inverse document frequencies, as in scikit-learn's TfidfTransformer"""
+        if self._idf is None:
+            self._idf = np.log((1 + self.document_count) / (1 + self.document_frequencies)) + 1
+        return self._idf
+    
+    def _counts(self, texts):
+        """Sparse term count rows of texts, reusing the counts of recently seen texts"""
+        rows = [None] * len(texts)
+        missing = []
+        with self._lock:
+            for index, text in enumerate(texts):
+                cached = self._term_counts.get(text)
+                if cached is not None:
+                    self._term_counts.move_to_end(text)
+                    rows[index] = cached
+                else:
+                    missing.append(index)
+        
+        if missing:
+            counts = self.vectorizer.transform([texts[index] for index in missing])
+            with self._lock:
+                for row, index in enumerate(missing):
+                    rows[index] = counts[row]
+                    self._term_counts[texts[index]] = counts[row]
+                while len(self._term_counts) > TERM_COUNT_CACHE_SIZE:
+                    self._term_counts.popitem(last=False)
+        
+        return sparse.vstack(rows, format='csr')
+    
+    def count_terms(self, texts):
+        """Sparse term count rows of texts, which stay valid when the IDF changes"""
+        return self.vectorizer.transform(texts)
+    
+    def weight(self, counts):
+        """
+        Weight term count rows into L2-normalized TF-IDF rows with the current IDF.
+        
+        Returns:
+            scipy.sparse.csr_matrix: One row per count row
+        """
+        counts = counts.astype(np.float64)
+        # Sublinear term frequency, so repeating a word has diminishing returns
+        counts.data = 1 + np.log(counts.data)
+        return normalize(counts @ sparse.diags(self.idf()), copy=False)
+    
+    def transform(self, texts):
+        """
+        Vectorize texts into L2-normalized TF-IDF rows.
+        
+        Returns:
+            scipy.sparse.csr_matrix: One row per text
+        """
+        return self.weight(self._counts(texts))
+
+
+_statistics = None
+_statistics_mtime = None
+_last_check = 0.0
+_statistics_lock = threading.Lock()
+
+
+def _statistics_path():
+    cache_dir = getattr(settings, 'ML_MODEL_CACHE_DIR', None) or os.path.join(settings.BASE_DIR, 'model_cache')
+    return os.path.join(cache_dir, f"{STATISTICS_NAME}.npz")
+
+
+def _load_statistics(with_documents=False):
+    """Read the persisted statistics, with the per-document terms only if they are to be updated"""
+    path = _statistics_path()
+    if os.path.exists(path):
+        try:
+            with np.load(path) as data:
+                documents = None
+                if with_documents:
+                    kinds = list(DOCUMENT_KINDS)
+                    offsets = data['term_offsets']
+                    terms = data['terms']
+                    documents = {
+                        (kinds[kind], int(document_id)): (str(text_hash), terms[offsets[row]:offsets[row + 1]].copy())
+                        for row, (kind, document_id, text_hash) in enumerate(
+                            zip(data['document_kinds'], data['document_ids'], data['document_hashes']))
+                    }
+                return CorpusStatistics(
+                    data['document_frequencies'].astype(np.int64), int(data['document_count']), documents
+                )
+        except Exception as e:
+            print(f"Error reading TF-IDF statistics, starting from empty ones: {str(e)}")
+    return CorpusStatistics(documents={} if with_documents else None)
+
+
+def _save_statistics(statistics):
+    # Write to a temporary file first so readers never see a half-written file
+    path = _statistics_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp.npz"
+    
+    kinds = list(DOCUMENT_KINDS)
+    keys = sorted(statistics.documents)
+    columns = [statistics.documents[key][1] for key in keys]
+    np.savez_compressed(
+        temp_path,
+        document_frequencies=statistics.document_frequencies.astype(np.int32),
+        document_count=statistics.document_count,
+        document_kinds=np.array([kinds.index(kind) for kind, _ in keys], dtype=np.int8),
+        document_ids=np.array([document_id for _, document_id in keys], dtype=np.int64),
+        document_hashes=np.array([statistics.documents[key][0] for key in keys], dtype='U64'),
+        term_offsets=np.concatenate([[0], np.cumsum([len(terms) for terms in columns])]).astype(np.int64),
+        terms=np.concatenate(columns).astype(np.int32) if columns else np.zeros(0, dtype=np.int32)
+    )
+    os.replace(temp_path, path)
+
+
+def refresh(batch_size=500):
+    """
+    Bring the persisted statistics up to date with the stored resumes and job descriptions.
+    
+    Reads every document once to compare its content hash, counts new and
+    edited documents and subtracts edited and deleted ones. Run by the
+    build_tfidf_statistics command, not within requests.
+    
+    Returns:
+        tuple: The refreshed CorpusStatistics and the number of documents
+            counted and removed
+    """
+    global _statistics, _statistics_mtime
+    
+    with _statistics_lock:
+        statistics = _load_statistics(with_documents=True)
+        counted = removed = 0
+        
+        for kind, model in DOCUMENT_KINDS.items():
+            seen = set()
+            batch = []
+            for document_id, content in model.objects.order_by('id').values_list('id', 'content').iterator(
+                    chunk_size=batch_size):
+                seen.add(document_id)
+                batch.append(((kind, document_id), content))
+                if len(batch) == batch_size:
+                    counted += statistics.update_documents(batch)
+                    batch = []
+            counted += statistics.update_documents(batch)
+            
+            for key in [key for key in statistics.documents if key[0] == kind and key[1] not in seen]:
+                statistics.remove_document(key)
+                removed += 1
+        
+        if counted or removed or not os.path.exists(_statistics_path()):
+            _save_statistics(statistics)
+        
+        statistics.documents = None
+        _statistics = statistics
+        _statistics_mtime = os.path.getmtime(_statistics_path())
+        return statistics, counted, removed
+
+
+def get_statistics():
+    """
+    Get the corpus statistics, reloading them at most every TFIDF_REFRESH_INTERVAL
+    seconds if build_tfidf_statistics has written newer ones.
+    
+    Without a statistics file every term has the same IDF, so the similarity is
+    the cosine of the term frequencies.
+    """
+    global _statistics, _statistics_mtime, _last_check
+    
+    interval = getattr(settings, 'TFIDF_REFRESH_INTERVAL', 300)
+    if _statistics is not None and time.monotonic() - _last_check <= interval:
+        return _statistics
+    
+    with _statistics_lock:
+        _last_check = time.monotonic()
+        path = _statistics_path()
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        if _statistics is None or mtime != _statistics_mtime:
+            if mtime is None:
+                print("TF-IDF statistics not built yet, run: python manage.py build_tfidf_statistics")
+            _statistics = _load_statistics()
+            _statistics_mtime = mtime
+        return _statistics
+
+
+def similarity_matrix(texts1, texts2):
+    """
+    Calculate the TF-IDF cosine similarity of every pair of texts from two lists.
+    
+    Args:
+        texts1 (list): Texts for the rows
+        texts2 (list): Texts for the columns
+    
+    Returns:
+        numpy.ndarray: Similarity scores between 0 and 1, one row per text in texts1
+    """
+    if not texts1 or not texts2:
+        return np.zeros((len(texts1), len(texts2)))
+    
+    statistics = get_statistics()
+    return (statistics.transform(texts1) @ statistics.transform(texts2).T).toarray()
@@ -13,6 +13,8 @@ router.register(r'mock-interviews', views.MockInterviewViewSet, basename='mockin
 urlpatterns = [
     path('', include(router.urls)),
     path('analyze/', views.analyze_resume, name='analyze-resume'),
+    path('rank-jobs/', views.rank_jobs, name='rank-jobs'),
+    path('analysis-jobs/<uuid:job_id>/', views.analysis_job_status, name='analysis-job-status'),
     path('test-sentiment/', views.test_sentiment_analysis, name='test_sentiment_analysis'),
     
     #Mock Interview
@@ -24,4 +26,9 @@ urlpatterns = [
     path('interview/history/', views.get_chat_history, name='chat-history'),
     path('interview/sessions/', views.get_chat_sessions, name='chat-sessions'),
     path('interview/faq-topics/', views.get_faq_topics, name='faq-topics'),
+
+    # Health checks
+    path('health/live/', views.health_live, name='health-live'),
+    path('health/ready/', views.health_ready, name='health-ready'),
+    path('health/inference/', views.inference_stats, name='inference-stats'),
 ] 
@@ -1,9 +1,11 @@
 from django.shortcuts import render
 from rest_framework import status, viewsets
-from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.decorators import action, api_view, parser_classes, permission_classes
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from django.urls import reverse
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django.conf import settings
 from django.contrib.auth.models import User
 import os
@@ -11,12 +13,14 @@ import json
 import tempfile
 import uuid
 
-from .models import Resume, JobDescription, ResumeAnalysis, ChatMessage, MockInterview
+from .models import Resume, JobDescription, ResumeAnalysis, ChatMessage, MockInterview, AnalysisJob
 from .serializers import (
     ResumeSerializer, 
+    ResumeDetailSerializer,
     JobDescriptionSerializer, 
     ResumeAnalysisSerializer,
     ResumeAnalysisResultSerializer,
+    AnalysisJobSerializer,
     MockInterviewSerializer,
     InterviewAnalysisResultSerializer,
     InterviewFeedbackSerializer,
@@ -28,6 +32,14 @@ from . import azure_language_client
 from . import azure_speech_client
 from . import azure_language_client
 from .groq_client import InterviewChatbot
+from . import model_registry
+from . import job_queue
+from . import analysis_store
+from . import analysis_tiers
+from . import deadlines
+from . import job_ranking
+from . import resume_index
+from . import document_features
 import json
 
 # Initialize the resume analyzer and interview chatbot
@@ -37,9 +49,21 @@ interview_analyzer = InterviewAnalyzer()
 
 @api_view(['POST'])
 @parser_classes([MultiPartParser, FormParser])
+@deadlines.bounded
 def analyze_resume(request):
     """
     Analyze a resume against a job description and provide tailoring suggestions.
+    
+    Analyses are stored, and a repeat request for the same files is answered
+    from the stored result unless force=true is passed.
+    
+    With async=true the analysis is queued for the background workers and the
+    response contains the job id instead of the result; poll the job status
+    endpoint for it, honouring the Retry-After header.
+    
+    The tier option (fast, standard or full) chooses how much of the pipeline
+    runs, see analysis_tiers; the result reports the tier that actually ran.
+    Stages that did not fit the request deadline are listed under degraded.
     """
     resume_file = request.FILES.get('resume_file')
     job_desc_file = request.FILES.get('job_desc_file')
@@ -49,23 +73,56 @@ def analyze_resume(request):
             'error': 'Both resume and job description files are required.'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    analyzer = ResumeAnalyzer()
-    
-    # Extract text from files
-    resume_text = analyzer.extract_text_from_file(
-        resume_file.read(), 
-        resume_file.name.split('.')[-1]
-    )
-    
-    job_desc_text = analyzer.extract_text_from_file(
-        job_desc_file.read(), 
-        job_desc_file.name.split('.')[-1]
-    )
+    tier = str(request.data.get('tier', request.query_params.get(
+        'tier', getattr(settings, 'ANALYSIS_DEFAULT_TIER', analysis_tiers.FULL)))).lower()
+    if tier not in analysis_tiers.TIERS:
+        return Response({
+            'error': f"Tier must be one of: {', '.join(analysis_tiers.TIERS)}."
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Analyze the resume against the job description
-    analysis_result = analyzer.analyze_resume_and_job_description(
-        resume_text, 
-        job_desc_text
+    force = _flag(request, 'force')
+    resume_content = resume_file.read()
+    job_desc_content = job_desc_file.read()
+    
+    if _flag(request, 'async'):
+        if not force:
+            analysis = analysis_store.get_stored_analysis(
+                request.user,
+                resume_file.name, analysis_store.content_hash(resume_content),
+                job_desc_file.name, analysis_store.content_hash(job_desc_content),
+                tier=tier
+            )
+            if analysis is not None:
+                return Response(_stored_analysis_response(analysis.result, analysis, True), status=status.HTTP_200_OK)
+        
+        try:
+            priority = int(request.data.get('priority', 0))
+        except (TypeError, ValueError):
+            return Response({
+                'error': 'Priority must be an integer.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Only staff can push their jobs ahead of the normal queue
+        if not request.user.is_staff:
+            priority = min(priority, 0)
+        
+        job = job_queue.enqueue_analysis(request.user, resume_file, job_desc_file, priority=priority, force=force,
+                                       tier=tier)
+        return Response({
+            'job_id': str(job.id),
+            'status': job.status,
+            'status_url': request.build_absolute_uri(reverse('analysis-job-status', args=[job.id]))
+        }, status=status.HTTP_202_ACCEPTED, headers={
+            'Retry-After': str(getattr(settings, 'ANALYSIS_JOB_POLL_INTERVAL', 2))
+        })
+    
+    # Extract text from the files and analyze the resume against the job description
+    analysis_result, analysis, cached = analysis_store.analyze_and_store(
+        request.user,
+        resume_content, resume_file.name,
+        job_desc_content, job_desc_file.name,
+        force=force,
+        tier=tier
     )
     
     # Log the complete results for debugging
@@ -75,9 +132,111 @@ def analyze_resume(request):
     sentiment_data = analysis_result.get('sentimentAnalysis', {})
     print("Sentiment Analysis data:", json.dumps(sentiment_data, default=str, indent=2))
     
-    return Response(analysis_result, status=status.HTTP_200_OK)
+    return Response(_stored_analysis_response(analysis_result, analysis, cached), status=status.HTTP_200_OK)
 
 @api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser, JSONParser])
+@deadlines.bounded
+def rank_jobs(request):
+    """
+    Rank saved job descriptions by how well a resume matches them.
+    
+    The resume is given as an uploaded resume_file or the resume_id of a saved
+    resume, the jobs as a list of job_ids. Every job gets a score breakdown
+    and the top_k best matches also get a full analysis.
+    """
+    resume_file = request.FILES.get('resume_file')
+    resume_id = request.data.get('resume_id')
+    resume_features = None
+    
+    if resume_file:
+        resume_text = resume_analyzer.extract_text_from_file(resume_file.read(), resume_file.name.split('.')[-1])
+        if resume_text.startswith("Error:"):
+            return Response({'error': resume_text}, status=status.HTTP_400_BAD_REQUEST)
+    elif resume_id:
+        try:
+            resume = Resume.objects.get(id=resume_id, user=request.user)
+        except (Resume.DoesNotExist, ValueError):
+            return Response({
+                'error': 'Resume not found.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        resume_text = resume.content
+        resume_features = document_features.features_for_document(resume)
+    else:
+        return Response({
+            'error': 'A resume file or resume id is required.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Job ids come as a JSON list, repeated form fields or a comma-separated string
+    if hasattr(request.data, 'getlist'):
+        job_ids = [job_id for value in request.data.getlist('job_ids') for job_id in str(value).split(',')]
+    else:
+        job_ids = request.data.get('job_ids') or []
+    
+    try:
+        job_ids = list(dict.fromkeys(int(job_id) for job_id in job_ids if str(job_id).strip()))
+        top_k = int(request.data.get('top_k', getattr(settings, 'RANKING_DEFAULT_TOP_K', 5)))
+    except (TypeError, ValueError):
+        return Response({
+            'error': 'Job ids and top_k must be integers.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    max_jobs = getattr(settings, 'RANKING_MAX_JOBS', 100)
+    if not job_ids:
+        return Response({
+            'error': 'At least one job id is required.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(job_ids) > max_jobs:
+        return Response({
+            'error': f'At most {max_jobs} jobs can be ranked at once.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    jobs_by_id = JobDescription.objects.filter(user=request.user, id__in=job_ids).in_bulk()
+    missing_ids = [job_id for job_id in job_ids if job_id not in jobs_by_id]
+    if missing_ids:
+        return Response({
+            'error': 'Job descriptions not found.',
+            'missingJobIds': missing_ids
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    ranking = job_ranking.rank_jobs(resume_text, [jobs_by_id[job_id] for job_id in job_ids], top_k=max(0, top_k),
+                                    resume_features=resume_features)
+    return Response({'rankedJobs': ranking}, status=status.HTTP_200_OK)
+
+def _flag(request, name):
+    """Read a boolean option from the form data or the query string"""
+    return str(request.data.get(name, request.query_params.get(name, ''))).lower() == 'true'
+
+def _stored_analysis_response(result, analysis, cached):
+    """Add the id of the stored analysis and whether it was reused to an analysis result"""
+    return {
+        **result,
+        'analysisId': analysis.id if analysis is not None else None,
+        'cached': cached
+    }
+
+@api_view(['GET'])
+def analysis_job_status(request, job_id):
+    """
+    Get the status of a queued resume analysis, with its result once finished.
+    
+    While the job is queued or running, the Retry-After header tells clients
+    how many seconds to wait before polling again.
+    """
+    try:
+        job = AnalysisJob.objects.get(id=job_id, user=request.user)
+    except AnalysisJob.DoesNotExist:
+        return Response({
+            'error': 'Analysis job not found.'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    response = Response(AnalysisJobSerializer(job).data, status=status.HTTP_200_OK)
+    if not job.is_finished:
+        response['Retry-After'] = str(getattr(settings, 'ANALYSIS_JOB_POLL_INTERVAL', 2))
+    return response
+
+@api_view(['POST'])
+@deadlines.bounded
 def test_sentiment_analysis(request):
     """
     Debug endpoint to test sentiment analysis functionality.
@@ -93,6 +252,7 @@ def test_sentiment_analysis(request):
 
 @api_view(['POST'])
 @parser_classes([MultiPartParser, FormParser])
+@deadlines.bounded
 def analyze_interview(request):
     """
     Analyze a mock interview recording and provide feedback.
@@ -179,9 +339,10 @@ def get_interview_feedback(request, interview_id):
         return Response({
             'error': 'Mock interview not found.'
         }, status=status.HTTP_404_NOT_FOUND)
-    
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@deadlines.bounded
 def interview_chat(request):
     """
     Process a user message to the interview preparation chatbot and get a response.
@@ -317,6 +478,42 @@ def get_faq_topics(request):
         'topics': faq_topics
     }, status=status.HTTP_200_OK)
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def health_live(request):
+    """
+    Liveness probe: the process is up and serving requests.
+    """
+    return Response({'status': 'alive'}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def health_ready(request):
+    """
+    Readiness probe: the ML models loaded at startup have finished warming up.
+    
+    Without ML_WARMUP_ON_STARTUP the models are loaded on first use, so the
+    process is ready right away.
+    """
+    ready = model_registry.is_ready()
+    return Response({
+        'status': 'ready' if ready else 'warming_up',
+        'models': model_registry.status()
+    }, status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def inference_stats(request):
+    """
+    Report micro-batching queue depth, batch sizes and latency per model,
+    along with the token id cache of each encoder.
+    """
+    return Response({
+        'models': model_registry.status(),
+        'schedulers': model_registry.scheduler_stats(),
+        'token_caches': model_registry.token_cache_stats()
+    }, status=status.HTTP_200_OK)
+
 class ResumeViewSet(viewsets.ModelViewSet):
     """ViewSet for viewing and editing Resume instances"""
     serializer_class = ResumeSerializer
@@ -328,9 +525,55 @@ class ResumeViewSet(viewsets.ModelViewSet):
             return Resume.objects.filter(user=user).order_by('-created_at')
         return Resume.objects.none()
     
+    def get_serializer_class(self):
+        """Leave the resume texts out of lists"""
+        return ResumeSerializer if self.action == 'list' else ResumeDetailSerializer
+    
     def perform_create(self, serializer):
-        """Set the user when creating a new resume"""
-        serializer.save(user=self.request.user)
+        """Set the user and the hash of the text when creating a new resume"""
+        serializer.save(
+            user=self.request.user,
+            content_hash=document_features.content_hash(serializer.validated_data.get('content', ''))
+        )
+    
+    def perform_update(self, serializer):
+        """Key an edited resume by the hash of its text, since it no longer matches the uploaded file"""
+        if 'content' in serializer.validated_data:
+            serializer.save(content_hash=document_features.content_hash(serializer.validated_data['content']))
+        else:
+            serializer.save()
+    
+    @action(detail=True, methods=['post'])
+    @deadlines.bounded
+    def rescore(self, request, pk=None):
+        """
+        Analyze this resume against a job description, optionally replacing its content first.
+        
+        Only the paragraphs changed since the resume was last analyzed are sent to
+        Azure and BERT, so edit-and-rescore loops stay fast. The response reports
+        which paragraphs and sections changed.
+        """
+        resume = self.get_object()
+        try:
+            job_description = JobDescription.objects.get(id=request.data.get('job_description_id'), user=request.user)
+        except (JobDescription.DoesNotExist, TypeError, ValueError):
+            return Response({
+                'error': 'Job description not found.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        content = request.data.get('content')
+        if content is not None and content != resume.content:
+            resume.content = content
+            resume.content_hash = document_features.content_hash(content)
+            resume.save(update_fields=['content', 'content_hash', 'updated_at'])
+        
+        result, analysis, cached, changes = analysis_store.rescore(
+            request.user, resume, job_description, force=_flag(request, 'force')
+        )
+        return Response({
+            **_stored_analysis_response(result, analysis, cached),
+            'changes': changes
+        }, status=status.HTTP_200_OK)
 
 class JobDescriptionViewSet(viewsets.ModelViewSet):
     """ViewSet for viewing and editing JobDescription instances"""
@@ -344,8 +587,43 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
         return JobDescription.objects.none()
     
     def perform_create(self, serializer):
-        """Set the user when creating a new job description"""
-        serializer.save(user=self.request.user)
+        """Set the user and the hash of the text when creating a new job description"""
+        serializer.save(
+            user=self.request.user,
+            content_hash=document_features.content_hash(serializer.validated_data.get('content', ''))
+        )
+    
+    def perform_update(self, serializer):
+        """Key an edited job description by the hash of its text, since it no longer matches the uploaded file"""
+        if 'content' in serializer.validated_data:
+            serializer.save(content_hash=document_features.content_hash(serializer.validated_data['content']))
+        else:
+            serializer.save()
+    
+    @action(detail=True, methods=['get'], permission_classes=[IsAdminUser], url_path='rank-resumes')
+    @deadlines.bounded
+    def rank_resumes(self, request, pk=None):
+        """Rank all stored resumes against this job description, best match first"""
+        job_description = self.get_object()
+        ranking = resume_index.rank_resumes(job_description)
+        
+        paginator = ResumeRankingPagination()
+        page = paginator.paginate_queryset(ranking, request, view=self)
+        
+        # Only the resumes on this page are loaded from the database
+        resumes = Resume.objects.select_related('user').in_bulk([entry['resumeId'] for entry in page])
+        for entry in page:
+            resume = resumes.get(entry['resumeId'])
+            entry['title'] = resume.title if resume else None
+            entry['username'] = resume.user.username if resume else None
+        
+        return paginator.get_paginated_response(page)
+
+class ResumeRankingPagination(PageNumberPagination):
+    """Pagination of resume rankings"""
+    page_size = getattr(settings, 'RECRUITER_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = 500
 
 class ResumeAnalysisViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for viewing ResumeAnalysis instances"""